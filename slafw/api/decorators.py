@@ -6,14 +6,17 @@
 
 import functools
 import logging
+import weakref
 from enum import Enum
+from threading import Lock
 from time import monotonic
-from typing import Union, List, Any, Dict, get_type_hints
+from typing import Union, List, Any, Dict, Optional, get_type_hints
 
 from gi.repository import GLib
 from pydbus import Variant
 from pydbus.generic import signal
 
+from slafw import defines
 from slafw.configs.unit import Nm, Ustep
 from slafw.errors.errors import NotAvailableInState, DBusMappingException
 
@@ -113,6 +116,70 @@ def cached(validity_s: float = None):
     return decor
 
 
+class PropertiesChangedBatcher:
+    """
+    Collects changed properties of a DBus object and emits them in a single PropertiesChanged signal
+
+    Changes can be marked from any thread, the signal is emitted from the GLib main loop once per main loop iteration
+    or once per window. Properties changed without a value are read when the signal is emitted, so a property changed
+    several times in a row is read and sent once.
+    """
+
+    _READ = object()
+
+    def __init__(self, api, interface: str, window_ms: Optional[int] = None):
+        self._logger = logging.getLogger(__name__)
+        # Do not keep the DBus object alive
+        self._api = weakref.ref(api)
+        self._interface = interface
+        self._window_ms = defines.dbus_properties_changed_window_ms if window_ms is None else window_ms
+        self._lock = Lock()
+        self._changed: Dict[str, Any] = {}
+        self._scheduled = False
+
+    def changed(self, name: str, value: Any = _READ) -> None:
+        """
+        Mark property changed
+
+        :param name: Property name
+        :param value: New property value, property is read before emitting the signal if not passed
+        """
+        with self._lock:
+            self._changed[name] = value
+            if self._scheduled:
+                return
+            self._scheduled = True
+        if self._window_ms:
+            GLib.timeout_add(self._window_ms, self.flush)
+        else:
+            GLib.idle_add(self.flush)
+
+    def flush(self) -> bool:
+        """
+        Emit PropertiesChanged with all the properties changed so far
+
+        :return: False to be removed from the GLib main loop sources
+        """
+        with self._lock:
+            changed, self._changed = self._changed, {}
+            self._scheduled = False
+        api = self._api()
+        if api is None:
+            return False
+        values = {}
+        for name, value in changed.items():
+            if value is self._READ:
+                try:
+                    value = getattr(api, name)
+                except Exception:  # pylint: disable = broad-except
+                    self._logger.exception("Failed to read changed property %s", name)
+                    continue
+            values[name] = value
+        if values:
+            api.PropertiesChanged(self._interface, values, [])
+        return False
+
+
 def dbus_api(cls):
     records: List[str] = []
     for var in vars(cls):
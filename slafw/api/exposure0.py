@@ -21,6 +21,7 @@ from slafw.api.decorators import (
     range_checked,
     wrap_dict_data,
     auto_dbus_signal,
+    PropertiesChangedBatcher,
 )
 from slafw.errors.errors import (
     PrinterException,
@@ -126,6 +127,7 @@ class Exposure0:
     def __init__(self, exposure: Exposure):
         self.exposure = exposure
         self.logger = logging.getLogger(__name__)
+        self._properties = PropertiesChangedBatcher(self, self.__INTERFACE__)
 
         # Do not use lambdas as handlers. These would keep references to Exposure0
         if self.exposure.change:
@@ -328,7 +330,7 @@ class Exposure0:
 
         :return: Layer position in nanometers
         """
-        return int(self.exposure.hw.tower.position)
+        return int(self.exposure.hw.recent_value("tower_position", lambda: self.exposure.hw.tower.position))
 
     @auto_dbus
     @property
@@ -371,6 +373,16 @@ class Exposure0:
         # TODO: In new API revision report progress as 0-1
         return 100 * self.exposure.progress
 
+    @auto_dbus
+    @property
+    def project_copy_progress(self) -> float:
+        """
+        Progress of the project copy and integrity check
+
+        :return: Percentage 0 - 100
+        """
+        return 100 * self.exposure.project_copy_progress
+
     @auto_dbus
     @property
     def resin_used_ml(self) -> float:
@@ -417,6 +429,18 @@ class Exposure0:
         """
         return self.exposure.project.used_material_nl / 1e6 + defines.resinMinVolume
 
+    @auto_dbus
+    @property
+    def remaining_resin_required_ml(self) -> float:
+        """
+        Resin required to finish the layers not printed yet
+
+        This is resin consumed by the remaining layers plus minimal amount of resin required for the printer to work
+
+        :return: Required resin in milliliters
+        """
+        return self.exposure.estimate_remain_resin_ml() + defines.resinMinVolume
+
     @auto_dbus
     @property
     def total_resin_required_percent(self) -> float:
@@ -635,7 +659,9 @@ class Exposure0:
             "time_remain_ms",
             "position_nm",
             "expected_finish_timestamp",
+            "remaining_resin_required_ml",
         },
+        "project_copy_progress": {"project_copy_progress"},
         "resin_count": {"resin_used_ml"},
         "remain_resin_ml": {"resin_remaining_ml"},
         "warn_resin": {"resin_warn"},
@@ -665,20 +691,20 @@ class Exposure0:
     def _handle_change(self, key: str, _: Any):
         if key in self._CHANGE_MAP:
             for changed in self._CHANGE_MAP[key]:
-                self.PropertiesChanged(self.__INTERFACE__, {changed: getattr(self, changed)}, [])
+                self._properties.changed(changed)
         if key in self._SIGNAL_MAP:
             for signal_name, get_change in self._SIGNAL_MAP[key].items():
                 getattr(self, signal_name)(getattr(self, get_change))
 
     def _handle_cover_change(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"close_cover_warning": self.close_cover_warning}, [])
+        self._properties.changed("close_cover_warning")
 
     def _handle_config_change(self, name: str, _: Any):
         if name == "coverCheck":
             self._handle_cover_change()
 
     def _handle_path_changed_param(self, _):
-        self.PropertiesChanged(self.__INTERFACE__, {"project_file": self.project_file}, [])
+        self._properties.changed("project_file")
 
     def _handle_cover_change_param(self, _):
         self._handle_cover_change()
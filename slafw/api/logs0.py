@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 
+import json
 import logging
 from typing import Optional, Dict, Any
 
@@ -15,6 +16,7 @@ from slafw.hardware.base.hardware import BaseHardware
 from slafw.state_actions.data_export import DataExport
 from slafw.state_actions.logs import UsbExportLogs, ServerUploadLogs
 from slafw.states.data_export import ExportState, StoreType
+from slafw.utils.span_recorder import print_trace
 
 
 @dbus_api
@@ -134,6 +136,15 @@ class Logs0:
 
         return self._exporter.data_upload_identifier
 
+    @auto_dbus
+    def print_trace(self) -> str:
+        """
+        Timing of the recent print loop phases
+
+        :return: JSON in the Chrome trace event format, load it in chrome://tracing or Perfetto
+        """
+        return json.dumps(print_trace.chrome_trace())
+
     @auto_dbus
     def last_log_upload_identifier(self) -> str:
         if not self._exporter:
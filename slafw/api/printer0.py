@@ -27,7 +27,9 @@ from slafw.api.decorators import (
     auto_dbus,
     DBusObjectPath,
     wrap_dict_data,
+    wrap_dict_data_recursive,
     auto_dbus_signal,
+    PropertiesChangedBatcher,
 )
 from slafw.api.examples0 import Examples0
 from slafw.api.exposure0 import Exposure0
@@ -35,7 +37,6 @@ from slafw.configs.stats import TomlConfigStats
 from slafw.configs.unit import Nm, Ustep
 from slafw.errors import tests
 from slafw.errors.errors import ReprintWithoutHistory, PrinterException
-from slafw.functions.files import get_all_supported_files
 from slafw.functions.system import shut_down
 from slafw.hardware.base.fan import Fan
 from slafw.hardware.power_led_action import WarningAction
@@ -89,6 +90,7 @@ class Printer0:
         self._unpacking = None
         self._wizard = None
         self._calibration = None
+        self._properties = PropertiesChangedBatcher(self, self.__INTERFACE__)
 
         self.printer.state_changed.connect(self._on_state_changed)
         self.printer.http_digest_changed.connect(self._on_http_digest_changed)
@@ -125,89 +127,86 @@ class Printer0:
             self.printer.hw.tilt_position_changed.connect(self._on_tilt_position_changed)
 
     def _on_state_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"state": self.state}, [])
+        self._properties.changed("state")
 
     def _on_exception(self, exception: Exception):
         self.exception(wrap_dict_data(PrinterException.as_dict(exception)))
 
     def _on_fatal_error(self, exception: Exception):
-        self.PropertiesChanged(
-            self.__INTERFACE__, {"failure_reason": wrap_dict_data(PrinterException.as_dict(exception))}, []
-        )
+        self._properties.changed("failure_reason", wrap_dict_data(PrinterException.as_dict(exception)))
 
     def _on_http_digest_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"http_digest": self.http_digest}, [])
+        self._properties.changed("http_digest")
 
     def _on_api_key_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"api_key": self.api_key}, [])
+        self._properties.changed("api_key")
 
     def _on_data_privacy_changed(self):
-        self.PropertiesChanged(
-            self.__INTERFACE__, {"data_privacy": self.data_privacy, "help_page_url": self.help_page_url}, []
-        )
+        self._properties.changed("data_privacy")
+        self._properties.changed("help_page_url")
 
     def _on_uv_led_fan_changed(self, _):
-        self.PropertiesChanged(self.__INTERFACE__, {"uv_led_fan": self.uv_led_fan}, [])
+        self._properties.changed("uv_led_fan")
 
     def _on_blower_fan_changed(self, _):
-        self.PropertiesChanged(self.__INTERFACE__, {"blower_fan": self.blower_fan}, [])
+        self._properties.changed("blower_fan")
 
     def _on_rear_fan_changed(self, _):
-        self.PropertiesChanged(self.__INTERFACE__, {"rear_fan": self.rear_fan}, [])
+        self._properties.changed("rear_fan")
 
     def _on_uv_temp_changed(self, uv_temp: float):
-        self.PropertiesChanged(self.__INTERFACE__, {"uv_led_temp": uv_temp}, [])
+        self._properties.changed("uv_led_temp", uv_temp)
 
     def _on_ambient_temp_changed(self, ambient_temp: float):
-        self.PropertiesChanged(self.__INTERFACE__, {"ambient_temp": ambient_temp}, [])
+        self._properties.changed("ambient_temp", ambient_temp)
 
     def _on_cpu_temp_changed(self, cpu_temp: float):
-        self.PropertiesChanged(self.__INTERFACE__, {"cpu_temp": cpu_temp}, [])
+        self._properties.changed("cpu_temp", cpu_temp)
 
     def _on_resin_sensor_changed(self, value: bool):
-        self.PropertiesChanged(self.__INTERFACE__, {"resin_sensor_state": value}, [])
+        self._properties.changed("resin_sensor_state", value)
 
     def _on_cover_state_changed(self, value):
-        self.PropertiesChanged(self.__INTERFACE__, {"cover_state": value}, [])
+        self._properties.changed("cover_state", value)
 
     def _on_power_switch_state_changed(self, value):
-        self.PropertiesChanged(self.__INTERFACE__, {"power_switch_state": value}, [])
+        self._properties.changed("power_switch_state", value)
 
     def _on_exposure_change(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"current_exposure": self.current_exposure}, [])
+        self._properties.changed("current_exposure")
 
     def _on_controller_sw_version_change(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"controller_sw_version": self.controller_sw_version}, [])
+        self._properties.changed("controller_sw_version")
 
     def _on_uv_usage_changed(self, usage_s: int):
-        self.PropertiesChanged(self.__INTERFACE__, {"uv_led_usage_s": self._limit_to_32bit(usage_s)}, [])
+        self._properties.changed("uv_led_usage_s", self._limit_to_32bit(usage_s))
 
     def _on_display_usage_changed(self, usage_s: int):
-        self.PropertiesChanged(self.__INTERFACE__, {"display_usage_s": self._limit_to_32bit(usage_s)}, [])
+        self._properties.changed("display_usage_s", self._limit_to_32bit(usage_s))
 
     def _on_factory_mode_changed(self, value):
-        self.PropertiesChanged(self.__INTERFACE__, {"factory_mode": value}, [])
+        self._properties.changed("factory_mode", value)
 
     def _on_admin_enabled_changed(self, value):
-        self.PropertiesChanged(self.__INTERFACE__, {"admin_enabled": value}, [])
+        self._properties.changed("admin_enabled", value)
 
     def _on_tower_position_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"tower_position_nm": self.tower_position_nm}, [])
+        self._properties.changed("tower_position_nm")
 
     def _on_tilt_position_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"tilt_position": self.tilt_position}, [])
+        self._properties.changed("tilt_position")
 
     def _on_unboxed_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"unboxed": self.unboxed}, [])
+        self._properties.changed("unboxed")
 
     def _on_self_tested_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"self_tested": self.self_tested}, [])
+        self._properties.changed("self_tested")
 
     def _on_mechanically_calibrated_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"mechanically_calibrated": self.mechanically_calibrated}, [])
+        self._properties.changed("mechanically_calibrated")
 
     def _on_uv_calibrated_changed(self):
-        self.PropertiesChanged(self.__INTERFACE__, {"uv_calibrated": self.uv_calibrated}, [])
+        self._properties.changed("uv_calibrated")
 
     @auto_dbus
     @property
@@ -353,7 +352,7 @@ class Printer0:
         """
         Read or set tower position in nm
         """
-        return int(self.printer.hw.tower.position)
+        return int(self.printer.hw.recent_value("tower_position", lambda: self.printer.hw.tower.position))
 
     @auto_dbus
     @tower_position_nm.setter
@@ -366,7 +365,7 @@ class Printer0:
         """
         Read or set tilt position in micro-steps
         """
-        return int(self.printer.hw.tilt.position)
+        return int(self.printer.hw.recent_value("tilt_position", lambda: self.printer.hw.tilt.position))
 
     @auto_dbus
     @tilt_position.setter
@@ -552,36 +551,33 @@ class Printer0:
 
     @auto_dbus
     @property
-    @cached(validity_s=0.5)
     def resin_sensor_state(self) -> bool:
         """
         Get resin sensor state
 
         :return: True if enabled, False otherwise
         """
-        return self.printer.hw.getResinSensorState()
+        return self.printer.hw.recent_value("resin_sensor_state", self.printer.hw.getResinSensorState)
 
     @auto_dbus
     @property
-    @cached(validity_s=0.5)
     def cover_state(self) -> bool:
         """
         Get cover state
 
         :return: True of closed, False otherwise
         """
-        return self.printer.hw.isCoverClosed()
+        return self.printer.hw.recent_value("cover_closed", self.printer.hw.isCoverClosed)
 
     @auto_dbus
     @property
-    @cached(validity_s=0.5)
     def power_switch_state(self) -> bool:
         """
         Get power switch state
 
         :return: True if pressed, False otherwise
         """
-        return self.printer.hw.getPowerswitchState()
+        return self.printer.hw.recent_value("power_switch", self.printer.hw.getPowerswitchState)
 
     @auto_dbus
     @property
@@ -726,10 +722,21 @@ class Printer0:
         :return: List of project files with path as list of strings
         """
         sources = [Path(defines.internalProjectPath), Path(defines.mediaRootPath)]
-        projects = []
-        for directory in sources:
-            projects.extend(get_all_supported_files(self.printer.model, directory))
-        return [str(project) for project in projects]
+        return [str(project) for project in self.printer.project_index.paths(sources, self.printer.model.extensions)]
+
+    @auto_dbus
+    def list_projects(self) -> Dict[str, Dict[str, Any]]:
+        """
+        List available projects with their summaries
+
+        Served from the persistent project index, it is refreshed in the background and only new or changed files
+        are read. Changes made since the last refresh show up in the next call.
+
+        :return: Dictionary mapping project path to its summary (size, mtime, valid, name, layers, print_time_s,
+                 exposure_time_ms, material, printer_model)
+        """
+        sources = [Path(defines.internalProjectPath), Path(defines.mediaRootPath)]
+        return wrap_dict_data_recursive(self.printer.project_index.query(sources, self.printer.model.extensions))
 
     @auto_dbus
     @property
@@ -384,7 +384,7 @@ class Standard0:
         """
         return wrap_dict_data(
             {
-                "cover_closed": self._printer.hw.isCoverClosed(),
+                "cover_closed": self._printer.hw.recent_value("cover_closed", self._printer.hw.isCoverClosed),
                 "temperatures": self.getTemperaturesDict(),
                 "fans": self.getFansRpmDict(),
                 "state": self._state.value,
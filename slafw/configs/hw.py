@@ -48,6 +48,9 @@ class HwConfig(Config):
     resinSensor = BoolValue(True, doc="If True the the resin sensor will be used to measure resin level before print.")
     autoOff = BoolValue(True, doc="If True the printer will be shut down after print.")
     mute = BoolValue(False, doc="Mute motion controller speaker if set to True.")
+    telemetryMaxAge = FloatValue(1.0, minimum=0.0, maximum=60.0,
+                                 doc="Maximal age of polled values served by the API, older are read again. "
+                                     "Values polled less often are served up to their poll interval. [seconds]")
     screwMm = IntValue(4, doc="Pitch of the tower/platform screw. [mm]")
 
     @property
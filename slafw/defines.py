@@ -50,6 +50,8 @@ lastProjectHwConfig = os.path.join(previousPrints, hwConfigFileName)
 lastProjectFactoryFile = os.path.join(previousPrints, os.path.basename(hwConfigPathFactory))
 lastProjectConfigFile = os.path.join(previousPrints, configFile)
 lastProjectPickler = os.path.join(previousPrints, "last_project.pck")
+projectAnalysisSuffix = ".analysis.json"    # sidecar file with results of Project.analyze()
+layerCacheSuffix = ".layers"    # directory with decoded layers of a project printed from previousPrints
 statsData = os.path.join(persistentStorage, "stats.toml")
 serviceData = os.path.join(persistentStorage, "service.toml")
 counterLogFilename = "counters-log.toml"
@@ -118,6 +120,7 @@ uv_temp_hysteresis = 10  # 10 deg C hysteresis
 internalReservedSpace = 110 * 1024 * 1024
 
 internalProjectPath = os.path.join(persistentStorage, "projects")
+projectIndexFile = Path(persistentStorage) / "project_index.json"
 internalProjectGroup = "projects"
 internalProjectMode = stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IROTH
 internalProjectDirMode = stat.S_IRWXU | stat.S_IRWXG | stat.S_IROTH
@@ -139,6 +142,17 @@ exposure_time_calibrate_max_ms = 5000
 exposure_time_first_extra_layers = 2    # first layer always have exposure_time_first
 exposure_safe_delay_before = 30         # [tenths of a second] applied when user selects ExposureUserProfile.SAFE
 exposure_slow_move_delay_before = 10    # [tenths of a second] applied when slow move of ExposureUserProfile.DEFAULT
+preloader_depth = 3                     # preloader ring buffer slots, layers preloaded ahead = preloader_depth - 1
+layer_cache_enabled = False             # keep decoded layers of projects in previousPrints for reprints
+layer_cache_max_size = 512 * 1024 * 1024  # all layer caches together
+project_background_verification = True  # check integrity of later layers while printing
+project_verify_foreground_layers = 10   # layers checked before the print starts in the background mode
+dbus_properties_changed_window_ms = 0   # PropertiesChanged batching window, 0 emits once per main loop iteration
+print_trace_spans = 8192                # print loop timing spans kept for the trace export
+log_rate_limit_interval_s = 10          # window of the repeated log message rate limit
+log_rate_limit_burst = 20               # same debug/info messages passed in the window, the rest is suppressed
+log_export_spool_size = 64 * 1024 * 1024  # exported journal kept in RAM, larger spills to a temporary file
+log_upload_part_size = None             # upload logs in resumable parts of this size (server support needed)
 
 fan_check_override = test_runtime.testing
 default_hostname = "prusa-"
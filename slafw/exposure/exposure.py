@@ -20,6 +20,7 @@ import asyncio
 import glob
 import logging
 import os
+import shutil
 import weakref
 from abc import abstractmethod
 from asyncio import CancelledError, Task
@@ -61,9 +62,12 @@ from slafw.hardware.base.hardware import BaseHardware
 from slafw.hardware.power_led_action import WarningAction, ErrorAction
 from slafw.hardware.sl1.tower import TowerProfile
 from slafw.image.exposure_image import ExposureImage
+from slafw.logger_config import LazyValue
 from slafw.project.functions import check_ready_to_print
 from slafw.project.project import Project, ExposureUserProfile
 from slafw.states.exposure import ExposureState, ExposureCheck, ExposureCheckResult
+from slafw.utils.main_loop_signal import MainLoopSignal
+from slafw.utils.span_recorder import print_trace
 from slafw.utils.traceable_collections import TraceableDict
 
 
@@ -151,7 +155,10 @@ class ProjectDataCheck(ExposureCheckRunner):
         self.expo.check_and_clean_last_data()
         await asyncio.sleep(0)
         self.logger.debug("Running project copy and check")
-        self.expo.project.copy_and_check()
+        self.expo.project.copy_and_check(
+            progress=lambda fraction: setattr(self.expo, "project_copy_progress", fraction),
+            background=defines.project_background_verification,
+        )
         self.logger.info("Project after copy and check: %s", str(self.expo.project))
         await asyncio.sleep(0)
         self.logger.debug("Initiating project in ExposureImage")
@@ -277,6 +284,8 @@ class StirringCheck(ExposureCheckRunner):
 
 
 class Exposure:
+    CHANGE_EVENTS = ("warning",)  # change keys delivered without coalescing
+
     def __init__(
         self,
         job_id: int,
@@ -284,7 +293,7 @@ class Exposure:
         exposure_image: ExposureImage,
         runtime_config: RuntimeConfig,
     ):
-        self.change = Signal()
+        self.change = MainLoopSignal(self.CHANGE_EVENTS)
         self.logger = logging.getLogger(__name__)
         self.runtime_config = runtime_config
         self.project: Optional[Project] = None
@@ -298,6 +307,7 @@ class Exposure:
         self.printStartTime = datetime.now(tz=timezone.utc)
         self.printEndTime = datetime.fromtimestamp(0, tz=timezone.utc)
         self.state = ExposureState.READING_DATA
+        self.project_copy_progress = 0.0
         self.remaining_wait_sec = 0
         self.low_resin = False
         self.warn_resin = False
@@ -323,6 +333,7 @@ class Exposure:
         self.hw.blower_fan.error_changed.connect(self._on_blower_fan_error)
         self.hw.rear_fan.error_changed.connect(self._on_rear_fan_error)
         self._checks_task: Optional[Task] = None
+        self._change_handlers_ns = 0  # change handlers time at the start of the current layer
 
     def read_project(self, project_file: str):
         check_ready_to_print(self.hw.config, self.hw.uv_led.parameters)
@@ -407,6 +418,15 @@ class Exposure:
         if not key.startswith("_"):
             self.change.emit(key, value)
 
+    def _layer_change_handlers_ms(self) -> float:
+        """
+        Time the change signal slots spent in the main loop since the previous layer
+        """
+        handlers_ns = self.change.handlers_ns
+        elapsed_ns = handlers_ns - self._change_handlers_ns
+        self._change_handlers_ns = handlers_ns
+        return elapsed_ns / 1e6
+
     def startProject(self):
         self.tower_position_nm = self.hw.tower.minimal_position
         self.actual_layer = 0
@@ -485,6 +505,12 @@ class Exposure:
         self.logger.warning("No active project to get remaining time")
         return -1
 
+    def estimate_remain_resin_ml(self) -> float:
+        if self.project:
+            return self.project.count_remain_resin_nl(self.actual_layer) / 1e6
+        self.logger.warning("No active project to get remaining resin")
+        return -1
+
     def expected_finish_timestamp(self) -> float:
         """
         Get timestamp of expected print end
@@ -509,8 +535,11 @@ class Exposure:
             with open(defines.lastProjectPickler, "rb") as pickle_io:
                 exposure = ExposureUnpickler(pickle_io).load()
                 # Fix missing (and still required attributes of exposure)
-                exposure.change = Signal()
+                exposure.change = MainLoopSignal(Exposure.CHANGE_EVENTS)
                 exposure.hw = hw
+                # not stored by older versions
+                if not hasattr(exposure, "project_copy_progress"):
+                    exposure.project_copy_progress = 0.0
                 return exposure
         except FileNotFoundError:
             logger.info("Last exposure data not present")
@@ -525,7 +554,11 @@ class Exposure:
     @staticmethod
     def cleanup_last_data(logger: Logger, clear_all=False) -> None:
         if clear_all:
-            files = glob.glob(defines.previousPrints + "/*")
+            files = [path for path in glob.glob(defines.previousPrints + "/*") if not os.path.isdir(path)]
+            # layer caches go together with their projects
+            for cache in glob.glob(defines.previousPrints + "/*" + defines.layerCacheSuffix):
+                logger.debug("removing '%s'", cache)
+                shutil.rmtree(cache, ignore_errors=True)
         else:
             files = [
                 defines.lastProjectHwConfig,
@@ -545,15 +578,23 @@ class Exposure:
     def stats_seen(self):
         self.state = ExposureState.DONE
 
-    def _exposure_simple(self, times_ms):
+    def _preload_next(self, second):
+        # reading and pasting the next layers is not on the way between the blit and the UV on
+        with print_trace.span("preload queue"):
+            self.exposure_image.preload_image(self.actual_layer + 1, second)
+
+    def _exposure_simple(self, times_ms, second):
         uv_on_remain_ms = times_ms[0]
         self.hw.uv_led.pulse(uv_on_remain_ms)
+        # the pulse is timed by the motion controller, the preloader can work on the next layers meanwhile
+        self._preload_next(second)
+        uv_on_remain_ms = self.hw.uv_led.pulse_remaining
         while uv_on_remain_ms > 0:
             sleep(uv_on_remain_ms / 1100.0)
             uv_on_remain_ms = self.hw.uv_led.pulse_remaining
         self.exposure_image.blank_screen()
 
-    def _exposure_calibration(self, times_ms):
+    def _exposure_calibration(self, times_ms, second):
         end = monotonic_ns()
         ends = []
         for time_ms in times_ms:
@@ -573,9 +614,12 @@ class Exposure:
             if abs(diff) > 1e7:
                 self.logger.warning("Exposure end delayed %f ms", abs(diff) / 1e6)
         self.hw.uv_led.off()
+        # the areas are blanked by software timing, do not delay them
+        self._preload_next(second)
 
     def _do_frame(self, times_ms, was_stirring, second, layer_height_nm):
         position_nm = self.tower_position_nm + self.hw.config.calib_tower_offset_nm
+        up_start = monotonic_ns()
 
         if self.hw.config.tilt:
             self.logger.info("%s tilt up", "Slow" if self._slow_move else "Fast")
@@ -590,7 +634,12 @@ class Exposure:
             self.hw.tower.move_ensure(position_nm + self.hw.config.layer_tower_hop_nm)
             self.hw.tower.move_ensure(position_nm)
 
-        white_pixels = self.exposure_image.sync_preloader()
+        up_end = monotonic_ns()
+        print_trace.record("layer up", up_start, up_end)
+        up_ms = (up_end - up_start) // 1_000_000
+
+        with print_trace.span("preload wait"):
+            white_pixels = self.exposure_image.sync_preloader(second)
         self.exposure_image.screenshot_rename(second)
 
         if self.project.exposure_user_profile == ExposureUserProfile.SAFE:
@@ -602,29 +651,33 @@ class Exposure:
 
         if delay_before:
             self.logger.info("delayBeforeExposure [s]: %f", delay_before / 10.0)
-            sleep(delay_before / 10.0)
+            with print_trace.span("delay before exposure"):
+                sleep(delay_before / 10.0)
 
         if was_stirring:
             self.logger.info("stirringDelay [s]: %f", self.hw.config.stirringDelay / 10.0)
-            sleep(self.hw.config.stirringDelay / 10.0)
+            with print_trace.span("stirring delay"):
+                sleep(self.hw.config.stirringDelay / 10.0)
 
-        self.exposure_image.blit_image(second)
+        with print_trace.span("blit"):
+            self.exposure_image.blit_image(second)
 
         exp_time_ms = sum(times_ms)
         self.exposure_end = datetime.now(tz=timezone.utc) + timedelta(seconds=exp_time_ms / 1e3)
         self.logger.info("Exposure started: %d ms, end: %s", exp_time_ms, self.exposure_end)
 
-        if len(times_ms) == 1:
-            self._exposure_simple(times_ms)
-        else:
-            self._exposure_calibration(times_ms)
+        with self.hw.critical_timing(), print_trace.span("exposure"):
+            if len(times_ms) == 1:
+                self._exposure_simple(times_ms, second)
+            else:
+                self._exposure_calibration(times_ms, second)
 
         self.logger.info("exposure done")
-        self.exposure_image.preload_image(self.actual_layer + 1)
 
         if self.hw.config.delayAfterExposure:
             self.logger.info("delayAfterExposure [s]: %f", self.hw.config.delayAfterExposure / 10.0)
-            sleep(self.hw.config.delayAfterExposure / 10.0)
+            with print_trace.span("delay after exposure"):
+                sleep(self.hw.config.delayAfterExposure / 10.0)
 
         if self.hw.config.tilt:
             self._slow_move = white_pixels > self.hw.white_pixels_threshold  # current layer
@@ -645,9 +698,20 @@ class Exposure:
                 self.slow_layers_done += 1
             try:
                 self.logger.info("%s tilt down", "Slow" if self._slow_move else "Fast")
+                down_start = monotonic_ns()
                 self.hw.tilt.layer_down_wait(self._slow_move)
+                down_end = monotonic_ns()
+                print_trace.record("tilt down", down_start, down_end)
+                self.logger.info(
+                    "Layer timing: up %d ms, preload_wait_ms %d, down %d ms",
+                    up_ms,
+                    self.exposure_image.preload_wait_ms,
+                    (down_end - down_start) // 1_000_000,
+                )
             except Exception:
                 return False, white_pixels
+        else:
+            self.logger.info("Layer timing: up %d ms, preload_wait_ms %d", up_ms, self.exposure_image.preload_wait_ms)
 
         return True, white_pixels
 
@@ -847,6 +911,8 @@ class Exposure:
 
         with WarningAction(self.hw.power_led):
             while self.actual_layer < project.total_layers:
+                layer_start = monotonic_ns()
+                print_trace.layer = self.actual_layer
                 try:
                     command = self.commands.get_nowait()
                 except Empty:
@@ -910,6 +976,7 @@ class Exposure:
                     was_stirring = True
                     exposure_compensation = self.hw.config.upAndDownExpoComp * 100
 
+                project.check_layer(self.actual_layer)
                 layer = project.layers[self.actual_layer]
 
                 self.tower_position_nm += Nm(layer.height_nm)
@@ -925,7 +992,8 @@ class Exposure:
                     " 'used [ml]': %d,"
                     " 'remaining [ml]': %d,"
                     " 'RAM': '%.1f%%',"
-                    " 'CPU': '%.1f%%'"
+                    " 'CPU': '%.1f%%',"
+                    " 'change handlers [ms]': %.1f"
                     " }",
                     self.actual_layer + 1,
                     project.total_layers,
@@ -938,8 +1006,9 @@ class Exposure:
                     self.estimate_remain_time_ms(),
                     self.resin_count,
                     self.remain_resin_ml if self.remain_resin_ml else -1,
-                    psutil.virtual_memory().percent,
-                    psutil.cpu_percent(),
+                    LazyValue(lambda: psutil.virtual_memory().percent),
+                    LazyValue(psutil.cpu_percent),
+                    self._layer_change_handlers_ms(),
                 )
 
                 times_ms = list(layer.times_ms)
@@ -969,6 +1038,7 @@ class Exposure:
                     self.logger.error("Trigger not implemented")
                     # sleep(self.hw.config.trigger / 10.0)
 
+                print_trace.record("layer", layer_start)
                 self.actual_layer += 1
 
         self._final_go_up()
@@ -1050,6 +1120,7 @@ class Exposure:
         self.hw.tower.move_ensure(self.hw.config.tower_height_nm)
 
     def _print_end_hw_off(self):
+        print_trace.layer = -1
         self.hw.uv_led.off()
         self.hw.stop_fans()
         self.hw.motors_release()
@@ -16,6 +16,7 @@ from slafw.configs.hw import HwConfig
 from slafw.configs.project import ProjectConfig
 from slafw.hardware.base.hardware import BaseHardware
 from slafw.image.exposure_image import ExposureImage
+from slafw.project.layer_cache import LayerCache
 from slafw.utils.traceable_collections import TraceableDict, TraceableList
 
 
@@ -32,6 +33,7 @@ class ExposurePickler(pickle.Pickler):
         Event,
         type(Lock()),
         Task,
+        LayerCache,
     )
 
     def persistent_id(self, obj):
@@ -17,6 +17,7 @@ from slafw.configs.unit import Unit
 from slafw.errors.errors import MotionControllerException
 from slafw.hardware.power_led import PowerLed
 from slafw.hardware.power_led_action import WarningAction
+from slafw.utils.loop_thread import hw_loop
 
 
 def parse_axis(text: str, axis: str) -> int:
@@ -141,8 +142,7 @@ class Axis(ABC):
         :param: number os subsequent rehoming
         :return: None, otherwise raises Exception
         """
-        while self.moving:
-            await asyncio.sleep(0.25)
+        await self.wait_to_stop_async()
 
         while self._target_position != self.position:
             if retries:
@@ -157,8 +157,7 @@ class Axis(ABC):
                 await self.sync_ensure_async()
                 self.profile_id = profile_backup
                 self.move(self._target_position)
-                while self.moving:
-                    await asyncio.sleep(0.1)
+                await self.wait_to_stop_async()
             else:
                 self._logger.error("Position max tries reached!")
                 self._raise_move_failed()
@@ -173,13 +172,22 @@ class Axis(ABC):
     def moving(self) -> bool:
         """determine if axis is moving at the moment"""
 
+    def wait_to_stop(self) -> None:
+        """block until the axis stops moving"""
+        hw_loop.run(self.wait_to_stop_async())
+
+    async def wait_to_stop_async(self) -> None:
+        """wait until the axis stops moving"""
+        while self.moving:
+            await asyncio.sleep(0.1)
+
     @abstractmethod
     def move(self, position: Unit) -> None:
         """initiate movement of the axis"""
 
     def move_ensure(self, position: Unit, retries=1) -> None:
         """initiate blocking movement of the axis"""
-        asyncio.run(self.move_ensure_async(position, retries))
+        hw_loop.run(self.move_ensure_async(position, retries))
 
     async def move_ensure_async(self, position: Unit, retries=1) \
             -> None:
@@ -263,15 +271,14 @@ class Axis(ABC):
 
     def sync_ensure(self, retries: int = 2) -> None:
         """blocking method for axis homing. retries = number of additional tries when homing fails"""
-        asyncio.run(self.sync_ensure_async(retries=retries))
+        hw_loop.run(self.sync_ensure_async(retries=retries))
 
     async def sync_ensure_async(self, retries: int = 2) -> None:
         """blocking method for axis homing. retries = number of additional tries when homing fails"""
         with WarningAction(self._power_led):
             while True:
                 self.sync()
-                while self.moving:
-                    await asyncio.sleep(0.25)
+                await self.wait_to_stop_async()
                 while True:
                     homing_status = self.homing_status
                     if homing_status.value == HomingStatus.SYNCED.value:
@@ -294,7 +301,7 @@ class Axis(ABC):
 
     def home_calibrate_wait(self):
         """test and save axis motor phase for accurate homing"""
-        return asyncio.run(self.home_calibrate_wait_async())
+        return hw_loop.run(self.home_calibrate_wait_async())
 
     @abstractmethod
     async def home_calibrate_wait_async(self):
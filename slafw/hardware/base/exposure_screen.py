@@ -23,6 +23,7 @@ from pywayland.utils import AnonymousFile
 
 from slafw import defines
 from slafw.hardware.base.component import HardwareComponent
+from slafw.utils.span_recorder import print_trace
 
 
 @dataclass(eq=False)
@@ -80,6 +81,7 @@ class Layer:
         self.bytes_per_pixel = bytes_per_pixel
         self.pool = None
         self.shm_data = None
+        self.shared_pools: list = []
         self.surfaces: List[Surface] = []
 
     @property
@@ -117,6 +119,24 @@ class Layer:
         surface.attach(self._create_buffer(), 0, 0)
         surface.damage_buffer(0, 0, self.width, self.height)
 
+    def set_shared_pools(self, fds: List[int]):
+        """
+        Create pools backed by memory shared with another process (no copy is needed to show its content)
+        """
+        self.destroy_shared_pools()
+        size = self.width * self.height * self.bytes_per_pixel
+        self.shared_pools = [self.bindings.shm.create_pool(fd, size) for fd in fds]
+
+    def destroy_shared_pools(self):
+        for pool in self.shared_pools:
+            pool.destroy()
+        self.shared_pools = []
+
+    def redraw_shared(self, index: int):
+        surface = self.base_wl_surface
+        surface.attach(self._create_buffer(self.shared_pools[index]), 0, 0)
+        surface.damage_buffer(0, 0, self.width, self.height)
+
     def _create_pool(self):
         size = self.width * self.height * self.bytes_per_pixel
         if self.pool:
@@ -127,9 +147,9 @@ class Layer:
             )
             self.pool = self.bindings.shm.create_pool(fd, size)
 
-    def _create_buffer(self):
+    def _create_buffer(self, pool = None):
         stride = self.width * self.bytes_per_pixel
-        buffer = self.pool.create_buffer(0, self.width, self.height, stride, self.bindings.shm_format)
+        buffer = (pool or self.pool).create_buffer(0, self.width, self.height, stride, self.bindings.shm_format)
         buffer.dispatcher["release"] = self._buffer_release_handler
         return buffer
 
@@ -168,24 +188,27 @@ def sync_call(function):
             feedback.dispatcher["presented"] = self.feedback_presented_handler
             feedback.dispatcher["discarded"] = self.feedback_discarded_handler
         start_time = monotonic()
-        function(self, main_surface, *args)
-        main_surface.commit()
+        with print_trace.span(function.__name__):
+            function(self, main_surface, *args)
+            main_surface.commit()
         self.logger.debug("%s done in %f ms", function.__name__, 1e3 * (monotonic() - start_time))
         # show immediately
         self.display.flush()
         if sync:
             self.logger.debug("waiting for video sync event")
             start_time = monotonic()
-            if not self.video_sync_event.wait(timeout=2):
-                self.logger.error("video sync event timeout")
-                # TODO this shouldn't happen, need better handling if yes
-                raise RuntimeError("video sync timeout")
+            with print_trace.span("video sync"):
+                if not self.video_sync_event.wait(timeout=2):
+                    self.logger.error("video sync event timeout")
+                    # TODO this shouldn't happen, need better handling if yes
+                    raise RuntimeError("video sync timeout")
             self.video_sync_event.clear()
             self.logger.debug("video sync done in %f ms", 1e3 * (monotonic() - start_time))
             delay = self.parameters.refresh_delay_ms / 1e3
             if delay > 0:
                 self.logger.debug("waiting %f ms for display refresh", self.parameters.refresh_delay_ms)
-                sleep(delay)
+                with print_trace.span("display refresh"):
+                    sleep(delay)
     return inner
 
 
@@ -261,6 +284,7 @@ class Wayland:
         self._stopped = True
         if self._thread:
             self._thread.join()
+        self.main_layer.destroy_shared_pools()
         self.main_layer.pool.destroy()
         self.blank_layer.pool.destroy()
         if self.calibration_layer:
@@ -350,8 +374,19 @@ class Wayland:
     def show_shm(self, main_surface):
         self._show(main_surface)
 
+    def set_shared_buffers(self, fds: List[int]):
+        self.main_layer.set_shared_pools(fds)
+
+    @sync_call
+    def show_shared(self, main_surface, index: int):
+        self.main_layer.redraw_shared(index)
+        self._place_below(main_surface)
+
     def _show(self, main_surface):
         self.main_layer.redraw()
+        self._place_below(main_surface)
+
+    def _place_below(self, main_surface):
         self.blank_layer.base_wl_subsurface.place_below(main_surface)
         if self.calibration_layer:
             for surface in self.calibration_layer.surfaces:
@@ -418,6 +453,24 @@ class ExposureScreen(HardwareComponent, ABC):
             self._logger.debug("resize to: %s", image.size)
         self._wayland.show_bytes(sync, image.tobytes())
 
+    @property
+    def shared_buffers_supported(self) -> bool:
+        """
+        Shared buffers are shown as they are, only images which need no resize can be used
+        """
+        return self.parameters.output_factor == 1
+
+    def set_shared_buffers(self, fds: List[int]):
+        """
+        Register files with images of apparent_size_px which can be shown by show_shared() without copying
+
+        :param fds: file descriptors, the caller may close them after the call
+        """
+        self._wayland.set_shared_buffers(fds)
+
+    def show_shared(self, index: int, sync: bool = True):
+        self._wayland.show_shared(sync, index)
+
     def blank_screen(self, sync: bool = True):
         self._wayland.blank_screen(sync)
 
@@ -6,9 +6,10 @@ import logging
 import os
 import re
 from abc import abstractmethod
+from contextlib import nullcontext
 from functools import cached_property, lru_cache
 from time import sleep
-from typing import Dict, List
+from typing import Dict, List, ContextManager, Callable, Any
 
 import bitstring
 import pydbus
@@ -239,6 +240,22 @@ class BaseHardware:
             // 100
         )
 
+    def critical_timing(self) -> ContextManager:
+        """
+        Timing critical window (exposure), periodic telemetry polls back off while it is open
+        """
+        return nullcontext()
+
+    def recent_value(self, name: str, read: Callable[[], Any]) -> Any:
+        """
+        Telemetry value polled at most config.telemetryMaxAge ago
+
+        :param name: telemetry snapshot field
+        :param read: reads the current value when the field was not polled recently
+        """
+        # pylint: disable = unused-argument
+        return read()
+
     @abstractmethod
     def exit(self):
         ...
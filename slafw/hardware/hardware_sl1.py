@@ -17,15 +17,13 @@
 import asyncio
 import json
 import os
-from asyncio import Task, CancelledError
-from datetime import timedelta
 from math import ceil
-from threading import Thread
 from time import sleep
-from typing import List, Optional, Any
+from typing import List, Any, Callable
 
 from slafw import defines
 from slafw.configs.hw import HwConfig
+from slafw.configs.unit import Ustep
 from slafw.errors.errors import MotionControllerException, ConfigException
 from slafw.functions.decorators import safe_call
 from slafw.hardware.a64.temp_sensor import A64CPUTempSensor
@@ -40,9 +38,10 @@ from slafw.hardware.sl1.tilt import TiltSL1
 from slafw.hardware.sl1.tower import TowerProfile, TowerSL1
 from slafw.hardware.sl1.uv_led import SL1UVLED, SL1SUVLED
 from slafw.hardware.sl1s_uvled_booster import Booster
-from slafw.motion_controller.controller import MotionController
+from slafw.motion_controller.controller import MotionController, Command
+from slafw.motion_controller.telemetry import TelemetryItem
 from slafw.tests.mocks.exposure_screen import VirtualExposureScreen
-from slafw.utils.value_checker import ValueChecker, UpdateInterval
+from slafw.utils.loop_thread import hw_loop
 
 
 class HardwareSL1(BaseHardware):
@@ -65,9 +64,6 @@ class HardwareSL1(BaseHardware):
 
         self.config.add_onchange_handler(self._fan_values_refresh)
 
-        self._value_refresh_thread = Thread(daemon=True, target=self._value_refresh_body)
-        self._value_refresh_task: Optional[Task] = None
-
         self.check_cover_override = False
 
         if self._printer_model in (PrinterModel.SL1, PrinterModel.VIRTUAL):
@@ -96,20 +92,24 @@ class HardwareSL1(BaseHardware):
         self.tower = TowerSL1(self.mcc, self.config, self.power_led)
         self.tilt = TiltSL1(self.mcc, self.config, self.power_led, self.tower)
 
-        self._tilt_position_checker = ValueChecker(
-            lambda: self.tilt.position,
-            self.tilt_position_changed,
-            UpdateInterval.seconds(5),
-            pass_value=False,
+        # Positions are polled along with the other telemetry, rapidly while the axis moves
+        self.mcc.telemetry.add(TelemetryItem(
+            "resin_sensor_state", Command.get_bool("?rsst"), 1, self.resin_sensor_state_changed
+        ))
+        self.mcc.telemetry.add(TelemetryItem(
+            "tilt_position", Command.get_int("?tipo"), 5, self.tilt_position_changed, pass_value=False,
+            rapid_interval_s=0.25, process=Ustep
+        ))
+        self.mcc.telemetry.add(TelemetryItem(
+            "tower_position", Command.get_int("?twpo"), 5, self.tower_position_changed, pass_value=False,
+            rapid_interval_s=0.25, process=self.config.tower_microsteps_to_nm
+        ))
+        self.mcc.tilt_status_changed.connect(
+            lambda moving: self.mcc.telemetry.set_rapid_update("tilt_position", moving)
         )
-        self._tower_position_checker = ValueChecker(
-            lambda: self.tower.position,
-            self.tower_position_changed,
-            UpdateInterval.seconds(5),
-            pass_value=False,
+        self.mcc.tower_status_changed.connect(
+            lambda moving: self.mcc.telemetry.set_rapid_update("tower_position", moving)
         )
-        self.mcc.tilt_status_changed.connect(self._tilt_position_checker.set_rapid_update)
-        self.mcc.tower_status_changed.connect(self._tower_position_checker.set_rapid_update)
 
         self.mcc.power_button_changed.connect(self.power_button_state_changed.emit)
         self.mcc.cover_state_changed.connect(self.cover_state_changed.emit)
@@ -129,46 +129,20 @@ class HardwareSL1(BaseHardware):
 
     def start(self):
         self.initDefaults()
-        self._value_refresh_thread.start()
+        # TODO: Fan and CPU temperature services run in the telemetry loop for now
+        # We should have a thread for running component services
+        self.mcc.telemetry.start([fan.run for fan in self.fans.values()] + [self.cpu_temp.run])
 
     def exit(self):
-        if self._value_refresh_thread.is_alive():
-            while not self._value_refresh_task:
-                sleep(0.1)
-            self._value_refresh_task.cancel()
-            self._value_refresh_thread.join()
         self.mcc.exit()
         self.exposure_screen.exit()
 
-    async def _value_refresh_task_body(self):
-        # This is deprecated, move value checkers to MotionController
-        checkers = [
-            ValueChecker(self.getResinSensorState, self.resin_sensor_state_changed),
-            self._tilt_position_checker,
-            self._tower_position_checker,
-            ValueChecker(self.mcc.getStateBits, None, UpdateInterval(timedelta(milliseconds=500))),
-        ]
-
-        tasks = [checker.check() for checker in checkers]
-
-        # TODO: This is temporary
-        # We should have a thread for running component services and get rid of the value checker thread
-        tasks.extend([fan.run() for fan in self.fans.values()])
-        tasks.append(self.cpu_temp.run())
+    def critical_timing(self):
+        return self.mcc.telemetry.critical()
 
-        self._value_refresh_task = asyncio.gather(*tasks)
-        await self._value_refresh_task
-
-    def _value_refresh_body(self):
-        try:
-            asyncio.run(self._value_refresh_task_body())
-        except CancelledError:
-            pass  # This is normal printer shutdown
-        except Exception:
-            self.logger.exception("Value checker thread crashed")
-            raise
-        finally:
-            self.logger.info("Value refresh checker thread ended")
+    def recent_value(self, name: str, read: Callable[[], Any]) -> Any:
+        value = self.mcc.telemetry.recent(name, self.config.telemetryMaxAge)
+        return read() if value is None else value
 
     def _fan_values_refresh(self, key: str, _: Any):
         """ Re-load the fan RPM settings from configuration, should be used as a callback """
@@ -208,7 +182,7 @@ class HardwareSL1(BaseHardware):
                     except Exception as e:
                         raise ConfigException() from e
 
-            self.tilt.movement_ended.connect(lambda: self._tilt_position_checker.set_rapid_update(False))
+            self.tilt.movement_ended.connect(lambda: self.mcc.telemetry.set_rapid_update("tilt_position", False))
 
     def flashMC(self):
         self.mcc.flash(self.config.MCBoardVersion)
@@ -335,7 +309,7 @@ class HardwareSL1(BaseHardware):
     # 70 % - 100 % : 1.0 mm = 14.85 ml
 
     def get_precise_resin_volume_ml(self) -> float:
-        return asyncio.run(self.get_precise_resin_volume_ml_async())
+        return hw_loop.run(self.get_precise_resin_volume_ml_async())
 
     async def get_precise_resin_volume_ml_async(self) -> float:
         if self.config.vatRevision == 1:
@@ -367,8 +341,7 @@ class HardwareSL1(BaseHardware):
             self.tower.profile_id = TowerProfile.resinSensor
             relative_move_nm = self.tower.resin_start_pos_nm - self.tower.resin_end_pos_nm
             self.mcc.do("!rsme", self.config.nm_to_tower_microsteps(relative_move_nm))
-            while self.tower.moving:
-                await asyncio.sleep(0.1)
+            await self.tower.wait_to_stop_async()
             if not self.getResinSensorState():
                 self.logger.error("Resin sensor was not triggered")
                 return 0.0
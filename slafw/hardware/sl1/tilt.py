@@ -58,6 +58,7 @@ class TiltSL1(Tilt):
         if self.moving:
             raise TiltPositionFailed("Failed to set tilt position since its moving")
         self._mcc.do("!tipo", int(position))
+        self._mcc.telemetry.invalidate("tilt_position")
         self._target_position = position
         self._logger.debug("Position set to: %d ustep", self._target_position)
 
@@ -67,9 +68,16 @@ class TiltSL1(Tilt):
             return True
         return False
 
+    def wait_to_stop(self) -> None:
+        self._mcc.wait_motion_end(2)
+
+    async def wait_to_stop_async(self) -> None:
+        await self._mcc.wait_motion_end_async(2)
+
     def move(self, position):
         self._check_units(position, Ustep)
         self._mcc.do("!tima", int(position))
+        self._mcc.telemetry.invalidate("tilt_position")
         self._target_position = position
         self._logger.debug("Move initiated. Target position: %d ustep",
                            self._target_position)
@@ -95,24 +103,21 @@ class TiltSL1(Tilt):
         self.profile_id = TiltProfile(profile[0])
         if profile[1] > 0:
             self.move(self.position - Ustep(profile[1]))
-            while self.moving:
-                await asyncio.sleep(0.1)
+            await self.wait_to_stop_async()
         await asyncio.sleep(profile[2] / 1000.0)
         # next movement may be splited
         self.profile_id = TiltProfile(profile[3])
         movePerCycle = self.position // profile[4]
         for _ in range(profile[4]):
             self.move(self.position - movePerCycle)
-            while self.moving:
-                await asyncio.sleep(0.1)
+            await self.wait_to_stop_async()
             await asyncio.sleep(profile[5] / 1000.0)
         tolerance = Ustep(defines.tiltHomingTolerance)
         # if not already in endstop ensure we end up at defined bottom position
         if not self._mcc.checkState("endstop"):
             self.move(-tolerance)
             # tilt will stop moving on endstop OR by stallguard
-            while self.moving:
-                await asyncio.sleep(0.1)
+            await self.wait_to_stop_async()
         # check if tilt is on endstop and within tolerance
         if self._mcc.checkState("endstop") and -tolerance <= self.position <= tolerance:
             return
@@ -124,8 +129,7 @@ class TiltSL1(Tilt):
         while count < self._config.tiltMax and not self._mcc.checkState("endstop"):
             self.position = step
             self.move(self.home_position)
-            while self.moving:
-                await asyncio.sleep(0.1)
+            await self.wait_to_stop_async()
             count += step
         await self.sync_ensure_async(retries=0)
 
@@ -138,8 +142,7 @@ class TiltSL1(Tilt):
 
         self.profile_id = TiltProfile(profile[0])
         self.move(_tiltHeight - Ustep(profile[1]))
-        while self.moving:
-            sleep(0.1)
+        self.wait_to_stop()
         sleep(profile[2] / 1000.0)
         self.profile_id = TiltProfile(profile[3])
 
@@ -147,8 +150,7 @@ class TiltSL1(Tilt):
         movePerCycle = (_tiltHeight - self.position) // profile[4]
         for _ in range(profile[4]):
             self.move(self.position + movePerCycle)
-            while self.moving:
-                sleep(0.1)
+            self.wait_to_stop()
             sleep(profile[5] / 1000.0)
 
     def release(self) -> None:
@@ -160,11 +162,9 @@ class TiltSL1(Tilt):
             self.profile_id = TiltProfile.homingFast
             # do not verify end positions
             self.move(self._config.tiltHeight)
-            while self.moving:
-                sleep(0.1)
+            await self.wait_to_stop_async()
             self.move(self.home_position)
-            while self.moving:
-                sleep(0.1)
+            await self.wait_to_stop_async()
             await self.sync_ensure_async()
 
     @property
@@ -173,6 +173,7 @@ class TiltSL1(Tilt):
 
     def sync(self) -> None:
         self._mcc.do("!tiho")
+        self._mcc.telemetry.invalidate("tilt_position")
         sleep(0.2)  #FIXME: mc-fw does not start the movement immediately -> wait a bit
 
     async def home_calibrate_wait_async(self):
@@ -182,8 +183,7 @@ class TiltSL1(Tilt):
 
     async def verify_async(self) -> None:
         if not self.synced:
-            while self._tower.moving:
-                await asyncio.sleep(0.25)
+            await self._tower.wait_to_stop_async()
             await self.sync_ensure_async()
         self.profile_id = TiltProfile.moveFast
         await self.move_ensure_async(self._config.tiltHeight)
@@ -53,6 +53,7 @@ class TowerSL1(Tower):
             raise TowerPositionFailed(
                 "Failed to set tower position since its moving")
         self._mcc.do("!twpo", int(self._config.nm_to_tower_microsteps(position)))
+        self._mcc.telemetry.invalidate("tower_position")
         self._target_position = position
         self._logger.debug("Position set to: %d nm", self._target_position)
 
@@ -62,9 +63,16 @@ class TowerSL1(Tower):
             return True
         return False
 
+    def wait_to_stop(self) -> None:
+        self._mcc.wait_motion_end(1)
+
+    async def wait_to_stop_async(self) -> None:
+        await self._mcc.wait_motion_end_async(1)
+
     def move(self, position: Nm) -> None:
         self._check_units(position, Nm)
         self._mcc.do("!twma", int(self._config.nm_to_tower_microsteps(position)))
+        self._mcc.telemetry.invalidate("tower_position")
         self._target_position = position
         self._logger.debug("Move initiated. Target position: %d nm", position)
 
@@ -88,6 +96,7 @@ class TowerSL1(Tower):
 
     def sync(self):
         self._mcc.do("!twho")
+        self._mcc.telemetry.invalidate("tower_position")
 
     async def home_calibrate_wait_async(self):
         self._mcc.do("!twhc")
@@ -2,13 +2,13 @@
 # Copyright (C) 2021 Prusa Research a.s. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import asyncio
 from abc import abstractmethod
 from functools import cached_property
 
 from slafw.configs.unit import Ustep
 from slafw.errors.errors import TiltMoveFailed, TiltHomeFailed
 from slafw.hardware.axis import Axis
+from slafw.utils.loop_thread import hw_loop
 
 
 class Tilt(Axis):
@@ -38,14 +38,14 @@ class Tilt(Axis):
         """tilt up during the print"""
 
     def layer_down_wait(self, slowMove: bool = False) -> None:
-        asyncio.run(self.layer_down_wait_async(slowMove=slowMove))
+        hw_loop.run(self.layer_down_wait_async(slowMove=slowMove))
 
     @abstractmethod
     async def layer_down_wait_async(self, slowMove: bool = False) -> None:
         """tilt up during the print"""
 
     def stir_resin(self) -> None:
-        asyncio.run(self.stir_resin_async())
+        hw_loop.run(self.stir_resin_async())
 
     @abstractmethod
     async def stir_resin_async(self) -> None:
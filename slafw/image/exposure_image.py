@@ -6,11 +6,12 @@
 
 import functools
 import logging
+from collections import deque
 from logging.handlers import QueueListener
 from multiprocessing import Process, shared_memory, Queue
 import os
 from time import monotonic
-from typing import Optional
+from typing import Optional, Deque, List, Tuple
 
 import numpy
 from PIL import Image, ImageOps
@@ -22,9 +23,10 @@ from slafw.hardware.printer_model import PrinterModel
 from slafw.project.project import Project
 from slafw.project.functions import get_white_pixels
 from slafw.image.resin_calibration import Calibration
-from slafw.image.preloader import Preloader, SLIDX, SHMIDX, ProjectFlags
+from slafw.image.preloader import Preloader, SLIDX, SHMIDX, SLOTIDX, ProjectFlags, slot_shm_name, screenshot_filename
 from slafw.errors.errors import ProjectErrorCalibrationInvalid
 from slafw.errors.warnings import PrintMaskNotAvaiable, PrintedObjectWasCropped
+from slafw.utils.span_recorder import print_trace
 
 
 def measure_time(what: str):
@@ -32,7 +34,8 @@ def measure_time(what: str):
         @functools.wraps(function)
         def inner(self, *args, **kwargs):
             start_time = monotonic()
-            function(self, *args, **kwargs)
+            with print_trace.span(what):
+                function(self, *args, **kwargs)
             self.logger.debug("%s done in %f ms", what, 1e3 * (monotonic() - start_time))
         return inner
     return decor
@@ -50,6 +53,15 @@ class ExposureImage:
         self._buffer: Optional[Image] = None
         self._sl: Optional[shared_memory.ShareableList] = None
         self._shm: Optional[list] = None
+        self._slots: List[List[shared_memory.SharedMemory]] = []
+        self._depth = max(2, defines.preloader_depth)
+        self._zero_copy = False
+        self._slot = 0
+        self._white_pixels = 0
+        self.preload_wait_ms = 0
+        self._generation = 0
+        self._next_layer = 0
+        self._queued: Deque[Tuple[int, int]] = deque()
         self._preloader: Optional[Process] = None
         self._preloader_log_queue: Queue = Queue()
         self._preloader_log_listener: QueueListener = \
@@ -60,7 +72,7 @@ class ExposureImage:
     def start(self):
         # numpy uses reversed axis indexing
         image_bytes_count = self._hw.exposure_screen.parameters.apparent_width_px * self._hw.exposure_screen.parameters.apparent_height_px
-        temp_usage = numpy.zeros(self._hw.exposure_screen.parameters.display_usage_size_px, dtype=numpy.float64, order='C')
+        temp_usage = numpy.zeros(self._hw.exposure_screen.parameters.display_usage_size_px, dtype=numpy.uint64, order='C')
         # see SLIDX!!!
         self._sl = shared_memory.ShareableList(sequence=[
                 0,
@@ -73,21 +85,45 @@ class ExposureImage:
         shm_prefix = self._sl.shm.name
         # see SHMIDX!!!
         self._shm = [
-                shared_memory.SharedMemory(create=True, size=image_bytes_count, name=shm_prefix+SHMIDX.PROJECT_IMAGE.name),
                 shared_memory.SharedMemory(create=True, size=image_bytes_count, name=shm_prefix+SHMIDX.PROJECT_MASK.name),
-                shared_memory.SharedMemory(create=True, size=image_bytes_count, name=shm_prefix+SHMIDX.OUTPUT_IMAGE1.name),
-                shared_memory.SharedMemory(create=True, size=image_bytes_count, name=shm_prefix+SHMIDX.OUTPUT_IMAGE2.name),
                 shared_memory.SharedMemory(create=True, size=temp_usage.nbytes, name=shm_prefix+SHMIDX.DISPLAY_USAGE.name),
                 shared_memory.ShareableList(range(5), name=shm_prefix+SHMIDX.PROJECT_BBOX.name),
                 shared_memory.ShareableList(range(5), name=shm_prefix+SHMIDX.PROJECT_FL_BBOX.name),
                 shared_memory.ShareableList(range(11), name=shm_prefix+SHMIDX.PROJECT_TIMES_MS.name)]
+        # see SLOTIDX!!!
+        self._slots = []
+        for slot in range(self._depth):
+            self._slots.append([
+                shared_memory.SharedMemory(create=True, size=image_bytes_count, name=slot_shm_name(shm_prefix, slot, idx))
+                for idx in SLOTIDX])
+        self.logger.info("Preloader ring buffer depth: %d", self._depth)
+        self._zero_copy = self._hw.exposure_screen.shared_buffers_supported
+        if self._zero_copy:
+            self._share_slots()
         self._preloader = Preloader(self._hw.exposure_screen.parameters, self._start_preload, self._preload_result, shm_prefix,
-                                    self._preloader_log_queue)
+                                    self._preloader_log_queue, self._depth)
         self._preloader_log_listener.start()
         self._preloader.start()
         self._buffer = Image.new("L", self._hw.exposure_screen.parameters.apparent_size_px)
 
+    def _share_slots(self):
+        # see _shared_index()
+        fds = []
+        for slot_shm in self._slots:
+            for idx in (SLOTIDX.OUTPUT_IMAGE1, SLOTIDX.OUTPUT_IMAGE2):
+                fds.append(os.open("/dev/shm/" + slot_shm[idx].name, os.O_RDWR))
+        try:
+            self._hw.exposure_screen.set_shared_buffers(fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    @staticmethod
+    def _shared_index(slot: int, second: bool) -> int:
+        return 2 * slot + int(second)
+
     def exit(self):
+        self._buffer = None     # may be a view of the shared memory
         if self._preloader:
             self._preloader.join()
             self._preloader_log_listener.stop()
@@ -102,6 +138,10 @@ class ExposureImage:
                 else:
                     shm.shm.close()
                     shm.shm.unlink()
+        for slot_shm in self._slots:
+            for shm in slot_shm:
+                shm.close()
+                shm.unlink()
 
     def _open_image(self, filename):
         self.logger.debug("loading '%s'", filename)
@@ -123,10 +163,10 @@ class ExposureImage:
         project_flags = ProjectFlags.NONE
         usage: numpy.ndarray = numpy.ndarray(
                 self._hw.exposure_screen.parameters.display_usage_size_px,
-                dtype=numpy.float64,
+                dtype=numpy.uint64,
                 order='C',
                 buffer=self._shm[SHMIDX.DISPLAY_USAGE].buf)
-        usage.fill(0.0)
+        usage.fill(0)
         if self._project.per_partes:
             project_flags |= ProjectFlags.PER_PARTES
         try:
@@ -159,6 +199,7 @@ class ExposureImage:
             project_flags |= ProjectFlags.CALIBRATE_COMPACT
         self._hw.exposure_screen.create_areas(self._calibration.areas if self._calibration else None)
         self._sl[SLIDX.PROJECT_SERIAL] += 1
+        self._reset_queue(0)
         self._sl[SLIDX.PROJECT_FLAGS] = project_flags.value
         self._write_SL(self._shm[SHMIDX.PROJECT_BBOX], self._project.bbox.coords)
         self._write_SL(self._shm[SHMIDX.PROJECT_FL_BBOX], self._project.layers[0].bbox.coords)
@@ -207,7 +248,25 @@ class ExposureImage:
         self._buffer = self._open_image(filename_with_path)
         self._hw.exposure_screen.show(self._buffer)
 
+    @property
+    def lookahead(self) -> int:
+        """
+        Number of layers preloaded ahead of the displayed one
+
+        The slot of the displayed layer is never reused until the next layer is blitted.
+        """
+        return self._depth - 1
+
+    def _reset_queue(self, layer_index: int):
+        # results of requests already sent to the preloader are dropped in sync_preloader()
+        self._generation += 1
+        self._queued.clear()
+        self._next_layer = layer_index
+
     def preload_image(self, layer_index: int, second=False):
+        """
+        Make sure layers from `layer_index` up to the lookahead are queued in the preloader
+        """
         if second:
             self.logger.debug("second part of image - no preloading")
             return
@@ -217,6 +276,16 @@ class ExposureImage:
         if not self._preloader.is_alive():
             self.logger.error("Preloader process is not running, exitcode: %d", self._preloader.exitcode)
             raise PreloadFailed()
+        if layer_index != self._next_layer and all(layer_index != queued for queued, _ in self._queued):
+            self.logger.debug("layer %d is out of sequence, restarting preload queue", layer_index)
+            self._reset_queue(layer_index)
+        last_layer = min(layer_index + self.lookahead, self._project.total_layers)
+        while self._next_layer < last_layer:
+            self._queue_layer(self._next_layer)
+            self._next_layer += 1
+
+    def _queue_layer(self, layer_index: int):
+        slot = layer_index % self._depth
         try:
             layer = self._project.layers[layer_index]
             self.logger.debug("read image %s from project started", layer.image)
@@ -226,38 +295,79 @@ class ExposureImage:
         except Exception as e:
             self.logger.exception("read image exception:")
             raise PreloadFailed() from e
-        image = Image.frombuffer("L", self._hw.exposure_screen.parameters.apparent_size_px, self._shm[SHMIDX.PROJECT_IMAGE].buf, "raw", "L", 0, 1)
+        size = self._hw.exposure_screen.parameters.apparent_size_px
+        image = Image.frombuffer("L", size, self._slots[slot][SLOTIDX.PROJECT_IMAGE].buf, "raw", "L", 0, 1)
         image.readonly = False
-        image.paste(input_image)
-        self._start_preload.put(layer.calibration_type.value)
+        if self._calibration and self._calibration.areas:
+            # calibration areas are cut from the whole project bounding box
+            image.paste(input_image)
+            bbox = (0, 0) + size
+        else:
+            # only the content is copied, the preloader does not look outside of the bounding box
+            bbox = input_image.getbbox()
+            if bbox:
+                bbox = bbox[:2] + (min(bbox[2], size[0]), min(bbox[3], size[1]))
+                image.paste(input_image.crop(bbox), bbox[:2])
+        self._queued.append((layer_index, slot))
+        self._start_preload.put((self._generation, layer_index, slot, layer.calibration_type.value, bbox))
+
+    def sync_preloader(self, second=False) -> int:
+        """
+        Wait for the oldest queued layer and make it current for blit_image and screenshot_rename
 
-    def sync_preloader(self) -> int:
+        Time spent waiting for the preloader is kept in preload_wait_ms.
+
+        :return: white pixels count of the layer
+        """
+        if second:
+            self.preload_wait_ms = 0
+            return self._white_pixels
         self.logger.debug("syncing preloader")
+        start_time = monotonic()
         try:
-            return self._preload_result.get(timeout=5)
+            layer_index, slot = self._queued.popleft()
+            while True:
+                generation, result_layer, white_pixels = self._preload_result.get(timeout=5)
+                if generation == self._generation and result_layer == layer_index:
+                    break
+                self.logger.debug("dropping stale preload result of layer %d", result_layer)
         except Exception as e:
             self.logger.exception("sync preloader exception:")
             raise PreloadFailed() from e
+        self.preload_wait_ms = int(1e3 * (monotonic() - start_time))
+        self._slot = slot
+        self._white_pixels = white_pixels
+        return white_pixels
 
     @measure_time("get result and blit")
     def blit_image(self, second=False):
-        source_shm = self._shm[SHMIDX.OUTPUT_IMAGE2].buf if second else self._shm[SHMIDX.OUTPUT_IMAGE1].buf
-        self._buffer = Image.frombuffer("L", self._hw.exposure_screen.parameters.apparent_size_px, source_shm, "raw", "L", 0, 1).copy()
-        self._hw.exposure_screen.show(self._buffer)
+        slot_shm = self._slots[self._slot]
+        source_shm = slot_shm[SLOTIDX.OUTPUT_IMAGE2].buf if second else slot_shm[SLOTIDX.OUTPUT_IMAGE1].buf
+        image = Image.frombuffer("L", self._hw.exposure_screen.parameters.apparent_size_px, source_shm, "raw", "L", 0, 1)
+        if self._zero_copy:
+            # The slot is not reused by the preloader until the next layer is blitted (see lookahead).
+            # Read only view, paste into the buffer (fill_area) makes a private copy.
+            self._buffer = image
+            self._hw.exposure_screen.show_shared(self._shared_index(self._slot, second))
+        else:
+            self._buffer = image.copy()
+            self._hw.exposure_screen.show(self._buffer)
 
     @measure_time("rename")
     def screenshot_rename(self, second=False):
         try:
-            os.rename(defines.livePreviewImage + "-tmp%s.png" % ("2" if second else "1"), defines.livePreviewImage)
+            os.rename(screenshot_filename(self._slot, "2" if second else "1"), defines.livePreviewImage)
         except Exception:
             self.logger.exception("Screenshot rename exception:")
 
     def save_display_usage(self):
-        usage = numpy.ndarray(
+        block_sums = numpy.ndarray(
                 self._hw.exposure_screen.parameters.display_usage_size_px,
-                dtype=numpy.float64,
+                dtype=numpy.uint64,
                 order='C',
                 buffer=self._shm[SHMIDX.DISPLAY_USAGE].buf)
+        # mean of block pixels, 1500 layers on 0.1 mm layer height <0:255> -> <0.0:1.0>
+        usage = block_sums / (self._hw.exposure_screen.parameters.thumbnail_factor ** 2 * 382500)
         try:
             with numpy.load(defines.displayUsageData) as npzfile:
                 saved_data = npzfile['display_usage']
@@ -5,13 +5,15 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
+from io import BytesIO
 from logging.handlers import QueueHandler
 from signal import signal, SIGTERM
 from enum import unique, IntEnum, IntFlag
 from multiprocessing import Process, shared_memory, Event, Queue
+from pathlib import Path
 from queue import Empty
 from time import monotonic
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Tuple
 import numpy
 from PIL import Image
 
@@ -19,7 +21,7 @@ from slafw import defines
 from slafw.hardware.base.exposure_screen import ExposureScreenParameters
 from slafw.image.resin_calibration import Calibration
 from slafw.image.cairo import draw_perpartes_mask, inverse
-from slafw.project.functions import get_white_pixels
+from slafw.project.functions import get_usage_and_white_pixels
 from slafw.utils.bounding_box import BBox
 
 
@@ -31,14 +33,18 @@ class ProjectFlags(IntFlag):
 
 @unique
 class SHMIDX(IntEnum):
+    PROJECT_MASK = 0
+    DISPLAY_USAGE = 1
+    PROJECT_BBOX = 2
+    PROJECT_FL_BBOX = 3
+    PROJECT_TIMES_MS = 4
+
+@unique
+class SLOTIDX(IntEnum):
+    """ Shared memory images of one preload ring buffer slot """
     PROJECT_IMAGE = 0
-    PROJECT_MASK = 1
-    OUTPUT_IMAGE1 = 2
-    OUTPUT_IMAGE2 = 3
-    DISPLAY_USAGE = 4
-    PROJECT_BBOX = 5
-    PROJECT_FL_BBOX = 6
-    PROJECT_TIMES_MS = 7
+    OUTPUT_IMAGE1 = 1
+    OUTPUT_IMAGE2 = 2
 
 @unique
 class SLIDX(IntEnum):
@@ -50,10 +56,18 @@ class SLIDX(IntEnum):
     PROJECT_CALIBRATE_PAD_SPACING_PX = 5
     WHITE_PIXELS_THRESHOLD = 6
 
+
+def slot_shm_name(shm_prefix: str, slot: int, index: SLOTIDX) -> str:
+    return f"{shm_prefix}{index.name}{slot}"
+
+
+def screenshot_filename(slot: int, number: str) -> str:
+    return f"{defines.livePreviewImage}-tmp{slot}-{number}.png"
+
 class Preloader(Process):
     # pylint: disable=too-many-instance-attributes, too-many-arguments
     def __init__(self, exposure_screen_parameters: ExposureScreenParameters, start_preload: Queue, preload_result: Queue,
-                 shm_prefix: str, log_queue: Queue):
+                 shm_prefix: str, log_queue: Queue, depth: int):
         super().__init__()
         self._logger = logging.getLogger(__name__)
         self._log_queue = log_queue
@@ -61,16 +75,17 @@ class Preloader(Process):
         self._start_preload = start_preload
         self._preload_result = preload_result
         self._dev_shm_prefix = '/dev/shm/' + shm_prefix
-        self._shm: Optional[List[Any]] = None  # TODO: List of heterogeneous types, "self._shm[SHMIDX.PROJECT_IMAGE].buf"
+        self._shm: Optional[List[Any]] = None  # TODO: List of heterogeneous types, "self._shm[SHMIDX.PROJECT_MASK].buf"
+        self._slots: List[List[shared_memory.SharedMemory]] = []
         self._sl: Optional[shared_memory.ShareableList] = None
         self._stoprequest = Event()
-        self._display_usage_shape = (
-                self._params.display_usage_size_px[0],
-                self._params.thumbnail_factor,
-                self._params.display_usage_size_px[1],
-                self._params.thumbnail_factor,
-        )
-        self._black_image = Image.new("L", self._params.apparent_size_px)
+        self._black_preview = Image.new("L", self._params.live_preview_size_px)
+        self._black_preview_png: Optional[bytes] = None
+        # content left in the output images of each slot, cleared before the slot is reused (full frame = unknown)
+        full_frame = (0, 0) + self._params.apparent_size_px
+        self._output_bbox: List[List[Optional[Tuple[int, int, int, int]]]] = [
+            [full_frame, full_frame] for _ in range(depth)
+        ]
         data = numpy.empty(shape=self._params.apparent_size_px, dtype=numpy.uint8)
         draw_perpartes_mask(data, self._params.apparent_width_px, self._params.apparent_height_px, 20)
         self._ppm1 = Image.frombytes("L", self._params.apparent_size_px, data)
@@ -79,14 +94,13 @@ class Preloader(Process):
         self._project_serial: Optional[int] = None
         self._calibration: Optional[Calibration] = None
         self._shm = [
-                shared_memory.SharedMemory(name=shm_prefix+SHMIDX.PROJECT_IMAGE.name),
                 shared_memory.SharedMemory(name=shm_prefix+SHMIDX.PROJECT_MASK.name),
-                shared_memory.SharedMemory(name=shm_prefix+SHMIDX.OUTPUT_IMAGE1.name),
-                shared_memory.SharedMemory(name=shm_prefix+SHMIDX.OUTPUT_IMAGE2.name),
                 shared_memory.SharedMemory(name=shm_prefix+SHMIDX.DISPLAY_USAGE.name),
                 shared_memory.ShareableList(name=shm_prefix+SHMIDX.PROJECT_BBOX.name),
                 shared_memory.ShareableList(name=shm_prefix+SHMIDX.PROJECT_FL_BBOX.name),
                 shared_memory.ShareableList(name=shm_prefix+SHMIDX.PROJECT_TIMES_MS.name)]
+        for slot in range(depth):
+            self._slots.append([shared_memory.SharedMemory(name=slot_shm_name(shm_prefix, slot, idx)) for idx in SLOTIDX])
         self._sl = shared_memory.ShareableList(name=shm_prefix)
 
     def signal_handler(self, _signal, _frame):
@@ -107,14 +121,14 @@ class Preloader(Process):
 
         while not self._stoprequest.is_set():
             try:
-                calibration_type = self._start_preload.get(timeout=0.1)
+                generation, layer_index, slot, calibration_type, bbox = self._start_preload.get(timeout=0.1)
             except Empty:
                 continue
             except Exception:
-                self._logger.exception("get calibration_type exception")
+                self._logger.exception("get preload request exception")
                 continue
             try:
-                self._preload_result.put(self._preload(calibration_type))
+                self._preload_result.put((generation, layer_index, self._preload(slot, calibration_type, bbox)))
             except Exception:
                 self._logger.exception("Preload failed")
                 # TODO: We would need to recover from error or force resart of the printer.
@@ -128,6 +142,9 @@ class Preloader(Process):
                     shm.close()
                 else:
                     shm.shm.close()
+        for slot_shm in self._slots:
+            for shm in slot_shm:
+                shm.close()
         if self._sl:
             self._sl.shm.close()
         self._logger.info("process ended")
@@ -139,8 +156,15 @@ class Preloader(Process):
             dst.append(src[i+1])
         return dst
 
-    def _preload(self, calibration_type: int) -> int:
+    def _preload(self, slot: int, calibration_type: int, bbox: Optional[Tuple[int, int, int, int]]) -> int:
+        """
+        Compose output image(s) of the layer and count its white pixels
+
+        Everything outside of `bbox` (the layer content) is black, so the compositing, masking and usage
+        accumulation work only within it. `None` stands for an empty layer.
+        """
         start_time_first = monotonic()
+        self._logger.debug("preloading into slot %d, bbox %s", slot, bbox)
         if self._project_serial != self._sl[SLIDX.PROJECT_SERIAL]:
             self._project_serial = self._sl[SLIDX.PROJECT_SERIAL]
             self._calibration = None
@@ -156,57 +180,96 @@ class Preloader(Process):
                         self._sl[SLIDX.PROJECT_CALIBRATE_TEXT_SIZE_PX],
                         self._sl[SLIDX.PROJECT_CALIBRATE_PAD_SPACING_PX]):
                     self._logger.warning("Calibration is invalid!")
-        input_image = Image.frombuffer("L", self._params.apparent_size_px, self._shm[SHMIDX.PROJECT_IMAGE].buf, "raw", "L", 0, 1)
-        output_image = Image.frombuffer("L", self._params.apparent_size_px, self._shm[SHMIDX.OUTPUT_IMAGE1].buf, "raw", "L", 0, 1)
+        slot_shm = self._slots[slot]
+        input_image = Image.frombuffer("L", self._params.apparent_size_px, slot_shm[SLOTIDX.PROJECT_IMAGE].buf, "raw", "L", 0, 1)
+        output_image = Image.frombuffer("L", self._params.apparent_size_px, slot_shm[SLOTIDX.OUTPUT_IMAGE1].buf, "raw", "L", 0, 1)
         output_image.readonly = False
+        self._clear(output_image, slot, 0)
         if self._calibration and self._calibration.areas:
             start_time = monotonic()
-            bbox = BBox(self._read_SL(self._shm[SHMIDX.PROJECT_BBOX]))
-            crop = input_image.crop(bbox.coords)
-            output_image.paste(self._black_image)
+            crop = input_image.crop(BBox(self._read_SL(self._shm[SHMIDX.PROJECT_BBOX])).coords)
             for area in self._calibration.areas:
                 area.paste(output_image, crop, calibration_type)
+            bbox = (0, 0) + self._params.apparent_size_px
             self._logger.debug("multiplying done in %f ms", 1e3 * (monotonic() - start_time))
-        else:
-            output_image.paste(input_image)
+        elif bbox:
+            output_image.paste(input_image.crop(bbox), bbox[:2])
+        self._output_bbox[slot][0] = bbox
+        if not bbox:
+            self._screenshot(output_image, screenshot_filename(slot, "1"), bbox)
+            self._logger.debug("empty layer preload done in %f ms", 1e3 * (monotonic() - start_time_first))
+            return 0
         if self._sl[SLIDX.PROJECT_FLAGS] & ProjectFlags.USE_MASK:
             mask = Image.frombuffer("L", self._params.apparent_size_px, self._shm[SHMIDX.PROJECT_MASK].buf, "raw", "L", 0, 1)
-            output_image.paste(self._black_image, mask=mask)
+            output_image.paste(0, bbox, mask=mask.crop(bbox))
         start_time = monotonic()
+        factor = self._params.thumbnail_factor
+        # align to the display usage blocks
+        x1, y1 = bbox[0] // factor * factor, bbox[1] // factor * factor
+        x2 = min(-(-bbox[2] // factor) * factor, self._params.apparent_width_px)
+        y2 = min(-(-bbox[3] // factor) * factor, self._params.apparent_height_px)
         pixels = numpy.memmap(
-                filename=self._dev_shm_prefix+SHMIDX.OUTPUT_IMAGE1.name,
+                filename='/dev/shm/' + slot_shm[SLOTIDX.OUTPUT_IMAGE1].name,
                 dtype=numpy.uint8,
                 mode='r',
+                shape=(self._params.apparent_height_px, self._params.apparent_width_px),
                 order='C')
         usage = numpy.memmap(
                 filename=self._dev_shm_prefix+SHMIDX.DISPLAY_USAGE.name,
-                dtype=numpy.float64,
+                dtype=numpy.uint64,
                 mode='r+',
                 shape=self._params.display_usage_size_px,
                 order='C')
-        # 1500 layers on 0.1 mm layer height <0:255> -> <0.0:1.0>
-        usage += numpy.reshape(pixels, self._display_usage_shape).mean(axis=3).mean(axis=1) / 382500
-        white_pixels = get_white_pixels(output_image)
+        block_sums, white_pixels = get_usage_and_white_pixels(pixels[y1:y2, x1:x2], factor)
+        usage[y1 // factor:y2 // factor, x1 // factor:x2 // factor] += block_sums
         self._logger.debug("pixels manipulations done in %f ms, white pixels: %d",
                 1e3 * (monotonic() - start_time), white_pixels)
         if self._sl[SLIDX.PROJECT_FLAGS] & ProjectFlags.PER_PARTES and white_pixels > self._sl[SLIDX.WHITE_PIXELS_THRESHOLD]:
-            output_image_second = Image.frombuffer("L", self._params.apparent_size_px, self._shm[SHMIDX.OUTPUT_IMAGE2].buf, "raw", "L", 0, 1)
+            output_image_second = Image.frombuffer("L", self._params.apparent_size_px, slot_shm[SLOTIDX.OUTPUT_IMAGE2].buf, "raw", "L", 0, 1)
             output_image_second.readonly = False
-            output_image_second.paste(output_image)
-            output_image.paste(self._black_image, mask=self._ppm1)
-            output_image_second.paste(self._black_image, mask=self._ppm2)
-            self._screenshot(output_image_second, "2")
-        self._screenshot(output_image, "1")
+            self._clear(output_image_second, slot, 1)
+            output_image_second.paste(output_image.crop(bbox), bbox[:2])
+            self._output_bbox[slot][1] = bbox
+            output_image.paste(0, bbox, mask=self._ppm1.crop(bbox))
+            output_image_second.paste(0, bbox, mask=self._ppm2.crop(bbox))
+            self._screenshot(output_image_second, screenshot_filename(slot, "2"), bbox)
+        self._screenshot(output_image, screenshot_filename(slot, "1"), bbox)
         self._logger.debug("whole preload done in %f ms", 1e3 * (monotonic() - start_time_first))
         return white_pixels
 
-    def _screenshot(self, image: Image, number: str):
+    def _clear(self, image: Image, slot: int, number: int):
+        bbox = self._output_bbox[slot][number]
+        if bbox:
+            image.paste(0, bbox)
+            self._output_bbox[slot][number] = None
+
+    def _screenshot(self, image: Image, filename: str, bbox: Optional[Tuple[int, int, int, int]]):
+        """
+        Save the live preview, only the content within `bbox` is resized into a black preview
+        """
         try:
             start_time = monotonic()
-            preview = image.resize(self._params.live_preview_size_px, Image.BICUBIC)
+            if not bbox:
+                if self._black_preview_png is None:
+                    data = BytesIO()
+                    self._black_preview.save(data, "PNG")
+                    self._black_preview_png = data.getvalue()
+                Path(filename).write_bytes(self._black_preview_png)
+                self._logger.debug("empty screenshot done in %f ms", 1e3 * (monotonic() - start_time))
+                return
+            width, height = self._params.live_preview_size_px
+            scale_x = self._params.apparent_width_px / width
+            scale_y = self._params.apparent_height_px / height
+            factor = self._params.thumbnail_factor
+            # bicubic filter reaches 2 preview pixels around the content, keep a margin
+            x1, y1 = max(0, bbox[0] // factor - 3), max(0, bbox[1] // factor - 3)
+            x2, y2 = min(width, -(-bbox[2] // factor) + 3), min(height, -(-bbox[3] // factor) + 3)
+            box = (x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y)
+            preview = self._black_preview.copy()
+            preview.paste(image.resize((x2 - x1, y2 - y1), Image.BICUBIC, box=box), (x1, y1))
             self._logger.debug("resize done in %f ms", 1e3 * (monotonic() - start_time))
             start_time = monotonic()
-            preview.save(defines.livePreviewImage + "-tmp%s.png" % number)
+            preview.save(filename)
             self._logger.debug("screenshot done in %f ms", 1e3 * (monotonic() - start_time))
         except Exception:
             self._logger.exception("Screenshot exception:")
@@ -61,6 +61,7 @@ from slafw.image.exposure_image import ExposureImage
 from slafw.libAsync import AdminCheck
 from slafw.libAsync import SlicerProfileUpdater
 from slafw.libNetwork import Network
+from slafw.project.index import ProjectIndex
 from slafw.slicer.slicer_profile import SlicerProfile
 from slafw.state_actions.manager import ActionManager
 from slafw.states.printer import PrinterState
@@ -104,6 +105,7 @@ class Printer:
         self.self_tested_changed = Signal()
         self._oneclick_inhibitors: Set[str] = set()
         self._run_expo_panel_wizard = False
+        self.project_index = ProjectIndex(defines.projectIndexFile)
 
         # HwConfig and runtime config
         self.hw_config = HwConfig(
@@ -195,6 +197,7 @@ class Printer:
 
         self._connect_hw()
         self._register_event_handlers()
+        self.project_index.refresh_async([Path(defines.internalProjectPath), Path(defines.mediaRootPath)])
 
         # Factory mode and admin
         self.runtime_config.factory_mode = defines.factory_enable.exists()
@@ -454,6 +457,7 @@ class Printer:
         return url
 
     def _media_inserted(self, _, __, ___, ____, params):
+        self.project_index.refresh_async([Path(defines.mediaRootPath)])
         if self._oneclick_inhibitors:
             self.logger.info("Oneclick inhibited by: %s", self._oneclick_inhibitors)
             return
@@ -476,6 +480,7 @@ class Printer:
         try:
             root_path = params[0]
             self.logger.info("Media ejected: %s", root_path)
+            self.project_index.drop(Path(root_path))
             expo = self.action_manager.exposure
             if expo and expo.project and Path(root_path) in Path(expo.project.path).parents:
                 expo.try_cancel()
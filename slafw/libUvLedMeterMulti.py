@@ -12,11 +12,13 @@
 # pylint: disable=too-many-statements
 
 
+import asyncio
 import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime
 from enum import IntEnum, unique
+from threading import Lock
 from time import sleep
 from typing import Optional
 
@@ -81,6 +83,9 @@ class UvLedMeterMulti:
         self.datetime = None
         self.sleepTime = 3
         self.sixty_points = False
+        self._interrupted = False
+        # Port operations run in executor threads that outlive cancelled reads, keep them from overlapping
+        self._port_lock = Lock()
 
     @property
     def present(self):
@@ -88,7 +93,8 @@ class UvLedMeterMulti:
 
     def connect(self):
         try:
-            self._low_level_connect()
+            with self._port_lock:
+                self._low_level_connect()
         except Exception:
             self.logger.exception("UV calibrator connect failed with exception")
             return False
@@ -156,19 +162,47 @@ class UvLedMeterMulti:
             raise e
 
     def close(self):
-        if self.port is not None:
-            self.port.close()
-
-        self.port = None
-
-    def read(self):
+        with self._port_lock:
+            if self.port is not None:
+                self.port.close()
+
+            self.port = None
+
+    def read(self) -> bool:
+        """
+        Blocking variant of async_read for threads without an event loop
+        """
+        return asyncio.run(self.async_read())
+
+    async def async_read(self, timeout_s: Optional[float] = None) -> bool:
+        """
+        Read the calibrator data without blocking the event loop
+
+        Only the port operations (bounded by the port timeouts) and reconnects run in the default executor, waiting
+        for the reply is polled from the event loop. Cancellation therefore takes effect within one poll period, the
+        reply to an interrupted request is discarded before the next one. A port operation left running by the
+        interrupted request is waited for, the port is never used by two threads at once.
+
+        :param timeout_s: limit for the whole read including retries, None to rely on per-request timeouts
+        :return: True if data were read
+        """
         self.logger.info("Reading UV calibrator data")
         if not test_runtime.testing:
-            sleep(self.sleepTime)
+            await asyncio.sleep(self.sleepTime)
         self.np = None
         try:
-            line = self._low_level_read(retries = 3)
+            line = await asyncio.wait_for(self._async_low_level_read(retries=3), timeout_s)
+        except asyncio.CancelledError:
+            self._interrupted = True
+            raise
+        except Exception:
+            self.logger.exception("Invalid response:")
+            self._interrupted = True
+            return False
+        return self._parse(line)
 
+    def _parse(self, line: str) -> bool:
+        try:
             if line[0] != "<":
                 self.logger.error("Invalid response - wrong line format")
                 return False
@@ -187,27 +221,50 @@ class UvLedMeterMulti:
         self.datetime = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
         return True
 
-    def _low_level_read(self, retries: int) -> str:
-        try:
+    def _send_request(self) -> None:
+        with self._port_lock:
+            if self._interrupted:
+                # reply to the interrupted request may still be on its way
+                self._interrupted = False
+                self.port.reset_input_buffer()
             self.port.write(">all\n".encode())
-            self.logger.debug("UV calibrator command reply: %s", self.port.readline().strip().decode())
+            reply = self.port.readline()
+        self.logger.debug("UV calibrator command reply: %s", reply.strip().decode())
+
+    def _reply_waiting(self) -> bool:
+        # polled from the event loop, do not wait for a port operation of an interrupted read
+        if not self._port_lock.acquire(blocking=False):  # pylint: disable = consider-using-with
+            return False
+        try:
+            return bool(self.port.inWaiting())
+        finally:
+            self._port_lock.release()
+
+    def _read_line(self) -> str:
+        with self._port_lock:
+            return self.port.readline().strip().decode()
+
+    async def _async_low_level_read(self, retries: int) -> str:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._send_request)
             timeout = defines.uvLedMeterMaxWait_s * 10
-            while not self.port.inWaiting() and timeout:
-                sleep(0.1)
+            while not self._reply_waiting() and timeout:
+                await asyncio.sleep(0.1)
                 timeout -= 1
 
             if not timeout:
                 raise TimeoutError("UV calibrator response timeout")
 
-            line = self.port.readline().strip().decode()
+            line = await loop.run_in_executor(None, self._read_line)
             self.logger.debug("UV calibrator response: %s", line)
             return line
         except (TimeoutError, IOError) as e:
             self.logger.error("Error reading UV calibrator")
             if retries > 0:
                 self.logger.warning("Reconnecting, Retrying UV calibrator read: %s", retries)
-                self.connect()
-                return self._low_level_read(retries - 1)
+                await loop.run_in_executor(None, self.connect)
+                return await self._async_low_level_read(retries - 1)
             else:
                 self.logger.error("Too many UV calibrator read retries")
                 raise e
@@ -247,9 +304,17 @@ class UvLedMeterMulti:
         else:
             return None
 
-    def check_place(self, screenOn):
+    async def async_read_data(self, timeout_s: Optional[float] = None) -> Optional[UvCalibrationData]:
+        if await self.async_read(timeout_s):
+            return self.get_data()
+        return None
+
+    def check_place(self, screenOn) -> Optional[UvMeterState]:
+        return asyncio.run(self.async_check_place(screenOn))
+
+    async def async_check_place(self, screenOn) -> Optional[UvMeterState]:
         self.logger.info("Checking UV calibrator placement")
-        self.read()
+        await self.async_read()
         if self.np is None:
             return UvMeterState.ERROR_COMMUNICATION
 
@@ -258,13 +323,14 @@ class UvLedMeterMulti:
             return UvMeterState.ERROR_TRANSLUCENT
 
         screenOn()
-        sleep(1)  # wait just to be sure display really opens
-        self.read()
+        await asyncio.sleep(1)  # wait just to be sure display really opens
+        await self.async_read()
         if self.np is None:
             return UvMeterState.ERROR_COMMUNICATION
 
         if self.np.min() < 3:
             return UvMeterState.ERROR_INTENSITY
+        return None
 
     def save_pic(self, width, height, text, filename, data):
         bg_color = (0, 0, 0)
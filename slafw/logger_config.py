@@ -3,10 +3,17 @@
 # Copyright (C) 2018-2019 Prusa Research s.r.o. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import atexit
 import json
 import logging
+from enum import Enum
 from logging.config import dictConfig
-from typing import Dict
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import PurePath
+from queue import SimpleQueue
+from threading import Lock
+from time import monotonic
+from typing import Dict, Callable, Any, Optional, Tuple, List
 
 from slafw import defines
 from slafw.errors.errors import FailedToSetLogLevel
@@ -20,6 +27,115 @@ DEFAULT_CONFIG = {
     "root": {"level": "INFO", "handlers": ["journald"]},
 }
 
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None), Enum, PurePath)
+
+
+class LazyValue:
+    """
+    Log message argument evaluated when the message is formatted
+
+    The value is computed by the log writer thread and only if the record passes the level, so expensive diagnostics
+    (psutil sampling) do not slow down the logging thread.
+    """
+
+    __slots__ = ("_function",)
+
+    def __init__(self, function: Callable[[], Any]):
+        self._function = function
+
+    def __float__(self) -> float:
+        return float(self._function())
+
+    def __int__(self) -> int:
+        return int(self._function())
+
+    def __str__(self) -> str:
+        return str(self._function())
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Suppress bursts of records logged from the same place
+
+    At most burst records below WARNING from the same source line pass within interval_s. The number of suppressed
+    records is appended to the first record passed in the next window.
+    """
+
+    def __init__(self, interval_s: float, burst: int):
+        super().__init__()
+        self._interval_s = interval_s
+        self._burst = burst
+        self._lock = Lock()
+        self._windows: Dict[Tuple[str, int], List] = {}  # source line -> [window start, records in window]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        now = monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and now - window[0] < self._interval_s:
+                window[1] += 1
+                return window[1] <= self._burst
+            self._windows[key] = [now, 1]
+        suppressed = window[1] - self._burst if window else 0
+        if suppressed > 0:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Queue handler passing the records unformatted, the message is formatted by the listener thread
+
+    Records with mutable arguments are formatted right away as the arguments could change before the record is written.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args.values() if isinstance(record.args, dict) else record.args
+        if args and not all(isinstance(arg, (_IMMUTABLE_ARGS, LazyValue)) for arg in args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _queue_handlers() -> None:
+    """
+    Move the configured root handlers behind a queue written by a background thread
+
+    Logging then costs the calling thread a rate limit check and a queue put, the handlers (journald) run in the
+    listener thread.
+    """
+    global _listener  # pylint: disable = global-statement
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    queue: SimpleQueue = SimpleQueue()
+    queue_handler = LazyQueueHandler(queue)
+    queue_handler.addFilter(RateLimitFilter(defines.log_rate_limit_interval_s, defines.log_rate_limit_burst))
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    _listener = QueueListener(queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    """
+    Write the queued records and stop the listener thread
+    """
+    global _listener  # pylint: disable = global-statement
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
 
 def _get_config() -> Dict:
     with defines.loggingConfig.open("r") as f:
@@ -28,16 +144,19 @@ def _get_config() -> Dict:
 
 def configure_log() -> bool:
     """
-    Configure logger according to configuration file or hardcoded config
+    Configure logger according to configuration file or hardcoded config, records are written by a background thread
 
     :return: True if configuration file was used, False otherwise
     """
+    _stop_listener()
     try:
         dictConfig(_get_config())
-        return True
+        from_config = True
     except Exception:
         dictConfig(DEFAULT_CONFIG)
-        return False
+        from_config = False
+    _queue_handlers()
+    return from_config
 
 
 def get_log_level() -> int:
@@ -19,26 +19,33 @@ from slafw.api.standard0 import Standard0
 from slafw.admin.manager import AdminManager
 from slafw.logger_config import configure_log
 
-log_from_config = configure_log()
-logger = logging.getLogger()
 
-if log_from_config:
-    logger.info("Logging configuration read from configuration file")
-else:
-    logger.info("Embedded logger configuration was used")
+def main():
+    log_from_config = configure_log()
+    logger = logging.getLogger()
 
-logger.info("Logging is set to level %s", logging.getLevelName(logger.level))
+    if log_from_config:
+        logger.info("Logging configuration read from configuration file")
+    else:
+        logger.info("Embedded logger configuration was used")
 
-warnings.simplefilter("ignore")
+    logger.info("Logging is set to level %s", logging.getLevelName(logger.level))
 
-printer = libPrinter.Printer()
+    warnings.simplefilter("ignore")
 
-SystemBus().publish(Printer0.__INTERFACE__, Printer0(printer))
-SystemBus().publish(Standard0.__INTERFACE__, Standard0(printer))
-admin_manager = AdminManager()
-SystemBus().publish(Admin0.__INTERFACE__, Admin0(admin_manager, printer))
-printer.setup()
-printer.run_make_ready_to_print()
+    printer = libPrinter.Printer()
 
-logger.info("Running DBus event loop")
-GLib.MainLoop().run()  # type: ignore[attr-defined]
+    SystemBus().publish(Printer0.__INTERFACE__, Printer0(printer))
+    SystemBus().publish(Standard0.__INTERFACE__, Standard0(printer))
+    admin_manager = AdminManager()
+    SystemBus().publish(Admin0.__INTERFACE__, Admin0(admin_manager, printer))
+    printer.setup()
+    printer.run_make_ready_to_print()
+
+    logger.info("Running DBus event loop")
+    GLib.MainLoop().run()  # type: ignore[attr-defined]
+
+
+# Guarded, multiprocessing imports the main module in the forkserver and spawned processes
+if __name__ == "__main__":
+    main()
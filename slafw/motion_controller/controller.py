@@ -12,10 +12,10 @@ import logging
 import re
 import socket
 import subprocess
-from asyncio import Task, CancelledError
-from threading import Thread, Lock
-from time import sleep
-from typing import Optional, Callable, List, Any, Tuple
+from collections import deque
+from threading import Thread, Lock, Event
+from time import sleep, monotonic
+from typing import Optional, Callable, List, Any, Tuple, Dict, NamedTuple, Sequence, Deque
 
 from gpiod import chip, line_request, find_line
 import serial
@@ -31,9 +31,51 @@ from slafw.motion_controller.states import (
 )
 from slafw.errors.errors import MotionControllerException, MotionControllerWrongRevision, MotionControllerWrongFw, \
     MotionControllerNotResponding, MotionControllerWrongResponse
+from slafw.motion_controller.link_statistics import LinkStatistics
+from slafw.motion_controller.telemetry import TelemetryPoller, TelemetryItem
 from slafw.motion_controller.trace import LineTrace, LineMarker, Trace
 from slafw.functions.decorators import safe_call
-from slafw.utils.value_checker import ValueChecker, UpdateInterval
+
+
+def _int_list(base: int = 10, multiply: float = 1) -> Callable[[str], List]:
+    return lambda ret: list([int(x, base) * multiply for x in ret.split(" ")])
+
+
+def _bool_list(bit_count: int) -> Callable[[str], List[bool]]:
+    def process(data):
+        bits = list()
+        num = int(data)
+        for i in range(bit_count):
+            bits.append(bool(num & (1 << i)))
+        return bits
+
+    return process
+
+
+class Command(NamedTuple):
+    """
+    Motion controller command for MotionController.do_batch
+    """
+
+    cmd: str
+    args: Tuple = ()
+    return_process: Callable = lambda x: x
+
+    @staticmethod
+    def get_int(cmd: str, *args) -> "Command":
+        return Command(cmd, args, int)
+
+    @staticmethod
+    def get_bool(cmd: str, *args) -> "Command":
+        return Command(cmd, args, lambda x: x == "1")
+
+    @staticmethod
+    def get_int_list(cmd: str, args=(), base=10, multiply: float = 1) -> "Command":
+        return Command(cmd, tuple(args), _int_list(base, multiply))
+
+    @staticmethod
+    def get_bool_list(cmd: str, bit_count: int, args=()) -> "Command":
+        return Command(cmd, tuple(args), _bool_list(bit_count))
 
 
 class MotionController:
@@ -50,8 +92,14 @@ class MotionController:
     BAUD_RATE_NORMAL = 115200
     BAUD_RATE_BOOTLOADER = 19200
     TIMEOUT_SEC = 3
+    STATE_UPDATE_INTERVAL_S = 0.5
     TEMP_UPDATE_INTERVAL_S = 3
     FAN_UPDATE_INTERVAL_S = 3
+    STATISTICS_UPDATE_INTERVAL_S = 30
+    MOTION_POLL_INTERVAL_S = 0.005
+    MOTION_POLLER_CHECK_S = 1
+    # Data written ahead of responses in a pipelined batch, keeps the MC receive buffer from overflowing
+    PIPELINE_WINDOW_BYTES = 64
 
     commOKStr = re.compile("^(.*)ok$")
     commErrStr = re.compile("^e(.)$")
@@ -61,6 +109,7 @@ class MotionController:
         self.logger = logging.getLogger(__name__)
         self.device = device
         self.trace = Trace(defines.traces)
+        self.link_statistics = LinkStatistics(self.BAUD_RATE_NORMAL)
 
         self._debug_sock: Optional[socket.socket] = None
         self._port: Optional[serial.Serial] = None
@@ -71,6 +120,9 @@ class MotionController:
         self._command_lock = Lock()
         self._exclusive_lock = Lock()
         self._flash_lock = Lock()
+        self._motion_lock = Lock()
+        self._motion_waiters: List[Tuple[int, Callable[[Optional[Exception]], None]]] = []
+        self._motion_thread: Optional[Thread] = None
 
         self.u_input: Optional[UInput] = None
         self._old_state_bits: Optional[List[bool]] = None
@@ -88,8 +140,23 @@ class MotionController:
         self.power_button_changed.connect(self._power_button_handler)
         self.cover_state_changed.connect(self._cover_state_handler)
 
-        self._value_refresh_thread = Thread(target=self._value_refresh_body, daemon=True)
-        self._value_refresh_task: Optional[Task] = None
+        self.telemetry = TelemetryPoller(self, self.value_refresh_failed)
+        self.telemetry.add(TelemetryItem(
+            "state_bits", Command.get_bool_list("?", bit_count=16), self.STATE_UPDATE_INTERVAL_S,
+            process=self.state_bits
+        ))
+        self.telemetry.add(TelemetryItem(
+            "temperatures", Command.get_int_list("?temp", multiply=0.1), self.TEMP_UPDATE_INTERVAL_S,
+            self.temps_changed, process=self._check_temperatures
+        ))
+        self.telemetry.add(TelemetryItem(
+            "fans_rpm", Command.get_int_list("?frpm"), self.FAN_UPDATE_INTERVAL_S, self.fans_rpm_changed,
+            process=self._check_fans_rpm
+        ))
+        self.telemetry.add(TelemetryItem(
+            "statistics", Command.get_int_list("?usta"), self.STATISTICS_UPDATE_INTERVAL_S, self.statistics_changed,
+            process=self._check_statistics
+        ))
         self._fans_mask = {0: False, 1: False, 2: False}
         self._fans_rpm = {0: defines.fanMinRPM, 1: defines.fanMinRPM, 2: defines.fanMinRPM}
 
@@ -126,11 +193,7 @@ class MotionController:
             self._port.close()
         if self.u_input:
             self.u_input.close()
-        if self._value_refresh_thread.is_alive():
-            while not self._value_refresh_task:
-                sleep(0.1)
-            self._value_refresh_task.cancel()
-            self._value_refresh_thread.join()
+        self.telemetry.stop()
 
     def _port_read_thread(self):
         """
@@ -139,11 +202,13 @@ class MotionController:
         This reads everything from serial and
            - Stores it in a queue stream for later use
            - Sends it to the debugger
+
+        Blocks for the first byte and then takes everything already waiting in the port at once.
         """
         while self._port.is_open:
             with self._raw_read_lock:
                 try:
-                    data = self._port.read()
+                    data = self._port.read(max(1, self._port.in_waiting))
                 except serial.SerialTimeoutException:
                     data = b""
             if data:
@@ -166,6 +231,7 @@ class MotionController:
         """
         marker = LineMarker.GARBAGE if garbage else LineMarker.INPUT
         ret = self._read_stream.readline()
+        self.link_statistics.read(len(ret))
         trace = LineTrace(marker, ret)
         self.trace.append_trace(trace)
         return ret
@@ -188,6 +254,7 @@ class MotionController:
         """
         self.trace.append_trace(LineTrace(LineMarker.OUTPUT, data))
         self._debug_send(bytes(LineMarker.OUTPUT) + data)
+        self.link_statistics.written(len(data))
         return self._port.write(data)
 
     def start_debugging(self, bootloader: bool) -> None:
@@ -329,28 +396,19 @@ class MotionController:
             self.logger.warning("motion controller serial number is invalid")
             self.board['serial'] = "*INVALID*"
 
-        # Value refresh thread
         self.temps_changed.emit(self._get_temperatures())  # Initial values for MC temperatures
-        self._value_refresh_thread.start()
 
     def doGetInt(self, *args):
         return self.do(*args, return_process=int)
 
     def doGetIntList(self, cmd, args=(), base=10, multiply: float = 1):
-        return self.do(cmd, *args, return_process=lambda ret: list([int(x, base) * multiply for x in ret.split(" ")]), )
+        return self.do(cmd, *args, return_process=_int_list(base, multiply))
 
     def doGetBool(self, cmd, *args):
         return self.do(cmd, *args, return_process=lambda x: x == "1")
 
     def doGetBoolList(self, cmd, bit_count, args=()) -> List[bool]:
-        def process(data):
-            bits = list()
-            num = int(data)
-            for i in range(bit_count):
-                bits.append(bool(num & (1 << i)))
-            return bits
-
-        return self.do(cmd, *args, return_process=process)
+        return self.do(cmd, *args, return_process=_bool_list(bit_count))
 
     def doGetHexedString(self, *args):
         return self.do(*args, return_process=lambda x: bytes.fromhex(x).decode("ascii"))
@@ -385,15 +443,76 @@ class MotionController:
     def do(self, cmd, *args, return_process: Callable = lambda x: x) -> Any:
         with self._exclusive_lock, self._command_lock:
             if self._flash_lock.acquire(blocking=False):
+                start = monotonic()
                 try:
                     self._read_garbage()
                     self.do_write(cmd, *args)
-                    return self.do_read(return_process=return_process)
+                    ret = self.do_read(return_process=return_process)
+                    self.link_statistics.command(monotonic() - start)
+                    return ret
                 finally:
                     self._flash_lock.release()
+                    self.link_statistics.exchange(monotonic() - start)
             else:
                 raise MotionControllerException("MC flash in progress", self.trace)
 
+    def do_batch(self, commands: Sequence[Command]) -> List[Any]:
+        """
+        Run several commands pipelined
+
+        Commands are written back-to-back without waiting for the previous response as long as the unanswered data
+        fit PIPELINE_WINDOW_BYTES, responses are matched to the commands in order. This saves a round-trip per command
+        compared to calling do for each of them. When a command fails, no more commands are written, responses of
+        those already written are read (and dropped) to keep the port in sync and the failure is raised.
+
+        :param commands: Commands to run in this order
+        :return: Processed responses in the order of commands
+        """
+        lines = [f"{' '.join(str(x) for x in (command.cmd,) + tuple(command.args))}\n".encode("ascii")
+                 for command in commands]
+        results = []
+        with self._exclusive_lock, self._command_lock:
+            if not self._flash_lock.acquire(blocking=False):
+                raise MotionControllerException("MC flash in progress", self.trace)
+            start = monotonic()
+            # written and not yet answered: (size, write time)
+            pending: Deque[Tuple[int, float]] = deque()
+            pending_bytes = 0
+            error: Optional[Exception] = None
+            try:
+                self._read_garbage()
+                for command in commands:
+                    while not error and len(results) + len(pending) < len(lines):
+                        line = lines[len(results) + len(pending)]
+                        if pending and pending_bytes + len(line) > self.PIPELINE_WINDOW_BYTES:
+                            break
+                        try:
+                            self.write_port(line)
+                        except serial.SerialTimeoutException as e:
+                            error = MotionControllerException(f"Timeout writing serial port: {line}", self.trace)
+                            error.__cause__ = e
+                            break
+                        pending.append((len(line), monotonic()))
+                        pending_bytes += len(line)
+                    if not pending:
+                        break
+                    size, written = pending.popleft()
+                    pending_bytes -= size
+                    try:
+                        results.append(self.do_read(return_process=command.return_process))
+                        self.link_statistics.command(monotonic() - written)
+                    except MotionControllerNotResponding:
+                        raise
+                    except MotionControllerException as e:
+                        error = error or e
+                        results.append(None)
+                if error:
+                    raise error
+                return results
+            finally:
+                self._flash_lock.release()
+                self.link_statistics.exchange(monotonic() - start)
+
     def do_write(self, cmd, *args) -> None:
         """
         Write command
@@ -531,11 +650,18 @@ class MotionController:
         rst.set_value(0)
 
     def getStateBits(self, request: List[str] = None, check_for_updates: bool = True):
+        return self.state_bits(self.doGetBoolList("?", bit_count=16), request, check_for_updates)
+
+    def state_bits(self, bits: List[bool], request: List[str] = None, check_for_updates: bool = True) -> Dict[str, bool]:
+        """
+        Process state bits read by the "?" command, as getStateBits does
+
+        Used when the state is read as a part of a batch.
+        """
         if not request:
             # pylint: disable = no-member
             request = StatusBits.__members__.keys()  # type: ignore
 
-        bits = self.doGetBoolList("?", bit_count=16)
         if len(bits) != 16:
             raise ValueError(f"State bits count not match! ({bits})")
 
@@ -569,6 +695,117 @@ class MotionController:
             self.fans_error_changed.emit(self.get_fans_error())
         self._old_state_bits = state_bits
 
+    def wait_motion_end(self, mask: int) -> None:
+        """
+        Block until all axes in the mask stop moving
+
+        :param mask: "?mot" bits of the axes to wait for (tower 1, tilt 2)
+        :raises MotionControllerException: when the motion state cannot be read
+        """
+        done = Event()
+        errors: List[Exception] = []
+
+        def callback(error: Optional[Exception]):
+            if error:
+                errors.append(error)
+            done.set()
+
+        waiter = self._add_motion_waiter(mask, callback)
+        while not done.wait(self.MOTION_POLLER_CHECK_S):
+            self._check_motion_poller(waiter)
+        if errors:
+            raise errors[0]
+
+    async def wait_motion_end_async(self, mask: int) -> None:
+        """
+        Wait until all axes in the mask stop moving
+
+        :param mask: "?mot" bits of the axes to wait for (tower 1, tilt 2)
+        :raises MotionControllerException: when the motion state cannot be read
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def callback(error: Optional[Exception]):
+            loop.call_soon_threadsafe(self._resolve_motion_future, future, error)
+
+        waiter = self._add_motion_waiter(mask, callback)
+        try:
+            while True:
+                done, _ = await asyncio.wait([future], timeout=self.MOTION_POLLER_CHECK_S)
+                if done:
+                    break
+                self._check_motion_poller(waiter)
+            future.result()
+        finally:
+            self._remove_motion_waiter(waiter)
+
+    @staticmethod
+    def _resolve_motion_future(future: asyncio.Future, error: Optional[Exception]) -> None:
+        if future.done():
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+    def _add_motion_waiter(self, mask: int, callback: Callable[[Optional[Exception]], None]) -> Tuple:
+        waiter = (mask, callback)
+        with self._motion_lock:
+            self._motion_waiters.append(waiter)
+            if not self._motion_thread or not self._motion_thread.is_alive():
+                self._motion_thread = Thread(target=self._motion_poller_body, daemon=True)
+                self._motion_thread.start()
+        return waiter
+
+    def _remove_motion_waiter(self, waiter: Tuple) -> None:
+        with self._motion_lock:
+            if waiter in self._motion_waiters:
+                self._motion_waiters.remove(waiter)
+
+    def _check_motion_poller(self, waiter: Tuple) -> None:
+        """
+        :raises MotionControllerException: when the poller ended without resolving the waiter
+        """
+        with self._motion_lock:
+            if waiter not in self._motion_waiters:
+                return  # resolved meanwhile
+            if self._motion_thread and self._motion_thread.is_alive():
+                return
+            self._motion_waiters.remove(waiter)
+        raise MotionControllerException("Motion state poller ended", self.trace)
+
+    def _motion_poller_body(self) -> None:
+        """
+        Single "?mot" poller shared by all motion waiters
+
+        Runs only while somebody waits, so the port is not loaded by polling when the axes are idle.
+        """
+        while True:
+            error = None
+            try:
+                moving = self.doGetInt("?mot")
+            except Exception as e:
+                error = e if isinstance(e, MotionControllerException) else \
+                    MotionControllerException("Failed to read motion state", self.trace)
+                moving = 0
+            with self._motion_lock:
+                finished = [waiter for waiter in self._motion_waiters if error or not moving & waiter[0]]
+                for waiter in finished:
+                    self._motion_waiters.remove(waiter)
+                idle = not self._motion_waiters
+                if idle:
+                    self._motion_thread = None
+            for _, callback in finished:
+                try:
+                    callback(error)
+                except Exception:
+                    # i.e. the loop of an async waiter is already closed, other waiters still need the poller
+                    self.logger.exception("Motion waiter callback failed")
+            if idle:
+                return
+            sleep(self.MOTION_POLL_INTERVAL_S)
+
     def _power_button_handler(self, state: bool):
         # pylint: disable=no-member
         self.u_input.write(ecodes.EV_KEY, ecodes.KEY_POWER, 1 if state else 0)
@@ -583,38 +820,15 @@ class MotionController:
         return self.doGetIntList("?rev")
 
     def _get_temperatures(self):
-        temps = self.doGetIntList("?temp", multiply=0.1)
+        return self._check_temperatures(self.doGetIntList("?temp", multiply=0.1))
+
+    @staticmethod
+    def _check_temperatures(temps: List[float]) -> List[float]:
         if len(temps) != 4:
             raise ValueError(f"TEMPs count not match! ({temps})")
 
         return [round(temp, 1) for temp in temps]
 
-    def _value_refresh_body(self):
-        self.logger.info("Value refresh thread running")
-        try:
-            # Run refresh task
-            asyncio.run(self._value_refresh())
-        except CancelledError:
-            pass  # This is normal printer shutdown
-        except Exception:
-            self.logger.exception("Value checker crashed")
-            self.value_refresh_failed.emit()
-            raise
-        finally:
-            self.logger.info("Value refresh checker ended")
-
-    async def _value_refresh(self):
-        checkers = [
-            ValueChecker(
-                self._get_temperatures, self.temps_changed, UpdateInterval.seconds(self.TEMP_UPDATE_INTERVAL_S)
-            ),
-            ValueChecker(self._get_fans_rpm, self.fans_rpm_changed, UpdateInterval.seconds(self.FAN_UPDATE_INTERVAL_S)),
-            ValueChecker(self._get_statistics, self.statistics_changed, UpdateInterval.seconds(30)),
-        ]
-        checks = [checker.check() for checker in checkers]
-        self._value_refresh_task = asyncio.gather(*checks)
-        await self._value_refresh_task
-
     def set_fan_enabled(self, index: int, enabled: bool):
         self._fans_mask[index] = enabled
         self.doSetBoolList("!fans", self._fans_mask.values())
@@ -624,14 +838,21 @@ class MotionController:
         self.do("!frpm", " ".join([str(v) for v in self._fans_rpm.values()]))
 
     def _get_fans_rpm(self) -> Tuple[int, int, int]:
-        rpms = self.doGetIntList("?frpm", multiply=1)
+        return self._check_fans_rpm(self.doGetIntList("?frpm", multiply=1))
+
+    @staticmethod
+    def _check_fans_rpm(rpms):
         if not rpms or len(rpms) != 3:
             raise MotionControllerException(f"RPMs count not match! ({rpms})")
 
         return rpms
 
     def _get_statistics(self):
-        data = self.doGetIntList("?usta")  # time counter [s] #TODO add uv average current, uv average temperature
+        return self._check_statistics(self.doGetIntList("?usta"))
+
+    @staticmethod
+    def _check_statistics(data):
+        # time counter [s] #TODO add uv average current, uv average temperature
         if len(data) != 2:
             raise ValueError(f"UV statistics data count not match! ({data})")
 
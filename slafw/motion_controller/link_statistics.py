@@ -0,0 +1,76 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Dict, Any
+
+BITS_PER_BYTE = 10  # 8N1 framing: start bit, 8 data bits, stop bit
+
+
+@dataclass
+class LinkStatistics:
+    """
+    Counters of the motion controller serial link
+
+    Commands are counted individually, exchanges are the lock holding request/response sequences (a pipelined batch
+    is a single exchange). Latency is measured from writing a command to having its response.
+    """
+
+    baud_rate: int
+    started: float = field(default_factory=monotonic)
+    commands: int = 0
+    exchanges: int = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    busy_s: float = 0
+    latency_total_s: float = 0
+    latency_max_s: float = 0
+    _lock: Lock = field(default_factory=Lock, repr=False, compare=False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = monotonic()
+            self.commands = self.exchanges = self.bytes_out = self.bytes_in = 0
+            self.busy_s = self.latency_total_s = self.latency_max_s = 0
+
+    def written(self, size: int) -> None:
+        with self._lock:
+            self.bytes_out += size
+
+    def read(self, size: int) -> None:
+        with self._lock:
+            self.bytes_in += size
+
+    def exchange(self, duration_s: float) -> None:
+        with self._lock:
+            self.exchanges += 1
+            self.busy_s += duration_s
+
+    def command(self, latency_s: float) -> None:
+        with self._lock:
+            self.commands += 1
+            self.latency_total_s += latency_s
+            self.latency_max_s = max(self.latency_max_s, latency_s)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        :return: utilization (fraction of the line capacity used in the busier direction), busy (fraction of time
+                 the port was locked by an exchange), average and maximal command latency and the raw counters
+        """
+        with self._lock:
+            elapsed = max(monotonic() - self.started, 1e-9)
+            capacity = self.baud_rate / BITS_PER_BYTE * elapsed
+            return {
+                "elapsed_s": elapsed,
+                "commands": self.commands,
+                "exchanges": self.exchanges,
+                "bytes_out": self.bytes_out,
+                "bytes_in": self.bytes_in,
+                "utilization": max(self.bytes_out, self.bytes_in) / capacity,
+                "busy": self.busy_s / elapsed,
+                "latency_avg_ms": 1e3 * self.latency_total_s / self.commands if self.commands else 0,
+                "latency_max_ms": 1e3 * self.latency_max_s,
+            }
@@ -5,24 +5,41 @@
 
 from io import IOBase
 from queue import Queue
-from typing import Optional
+from threading import Lock
 
 
 class QueueStream(IOBase):
+    """
+    Line framed stream fed by chunks of bytes
+
+    Data are put in whatever chunks the port provides. Complete lines are split in bulk and queued, the incomplete
+    tail is kept until the rest of the line arrives. Readers block on the line queue.
+    """
+
     def __init__(self, timeout_sec = None):
         super().__init__()
         self._queue = Queue()
         self._timeout_sec = timeout_sec
+        self._partial = b""
+        self._lock = Lock()
+
+    def readline(self, size: int = -1) -> bytes:
+        """
+        Get next complete line including the line end
 
-    def read(self, size: int = 1) -> Optional[bytes]:
-        ret = b''
-        for _ in range(size):
-            ret += self._queue.get(timeout=self._timeout_sec)
-        return ret
+        :raises queue.Empty: on timeout
+        """
+        return self._queue.get(timeout=self._timeout_sec)
 
     def put(self, data: bytes) -> None:
-        for b in data:
-            self._queue.put(bytes([b]))
+        with self._lock:
+            lines = (self._partial + data).split(b"\n")
+            self._partial = lines.pop()
+            for line in lines:
+                self._queue.put(line + b"\n")
 
     def waiting(self) -> bool:
-        return bool(self._queue.qsize())
+        """
+        Whenever there is any data pending, even an incomplete line
+        """
+        return bool(self._queue.qsize() or self._partial)
@@ -0,0 +1,278 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import logging
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from threading import Lock
+from time import monotonic
+from typing import Optional, Callable, List, Dict, Any, Coroutine, Iterable, ClassVar
+
+from PySignal import Signal
+
+from slafw.motion_controller.states import StatusBits
+from slafw.utils.loop_thread import LoopThread
+from slafw.utils.value_checker import ControlledDelay
+
+
+@dataclass(frozen=True)
+class TelemetrySnapshot:
+    """
+    Last values polled from the motion controller, None until polled for the first time
+
+    Snapshot is immutable, a new one with an incremented version is published after every poll, so reading it is safe
+    from any thread. Fields are polled at different intervals, so each one has its own poll time.
+    """
+
+    SOURCES: ClassVar[Dict[str, str]] = {"cover_closed": "state_bits", "power_switch": "state_bits"}
+
+    version: int = 0
+    polled: Dict[str, float] = field(default_factory=dict)  # field -> monotonic time of its last poll
+    state_bits: Optional[Dict[str, bool]] = None
+    resin_sensor_state: Optional[bool] = None
+    temperatures: Optional[List[float]] = None
+    fans_rpm: Optional[List[int]] = None
+    statistics: Optional[List[int]] = None
+    tower_position: Optional[Any] = None
+    tilt_position: Optional[Any] = None
+
+    def polled_at(self, name: str) -> Optional[float]:
+        """
+        :return: monotonic time the field (or the field it is derived from) was polled, None if not polled
+        """
+        return self.polled.get(self.SOURCES.get(name, name))
+
+    @property
+    def cover_closed(self) -> Optional[bool]:
+        return self.state_bits[StatusBits.COVER.name] if self.state_bits else None
+
+    @property
+    def power_switch(self) -> Optional[bool]:
+        return self.state_bits[StatusBits.BUTTON.name] if self.state_bits else None
+
+
+@dataclass(eq=False)
+class TelemetryItem:
+    """
+    Periodically polled value
+
+    :param name: TelemetrySnapshot field
+    :param command: motion controller Command reading the value
+    :param interval_s: poll period
+    :param signal: emitted when the value changes, None for no signal
+    :param pass_value: pass the new value with the signal
+    :param rapid_interval_s: poll period while rapid updates are requested (axis moving)
+    :param process: applied to the processed response before it is stored, emitted and compared
+    """
+
+    name: str
+    command: Any
+    interval_s: float
+    signal: Optional[Signal] = None
+    pass_value: bool = True
+    rapid_interval_s: Optional[float] = None
+    process: Optional[Callable[[Any], Any]] = None
+    rapid: bool = False
+    due: float = 0
+    invalidated: float = 0
+    value: Any = field(default=None, repr=False)
+
+    def interval(self) -> float:
+        return self.rapid_interval_s if self.rapid and self.rapid_interval_s else self.interval_s
+
+
+class TelemetryPoller:
+    """
+    Single scheduler of the periodic motion controller polls
+
+    All polls due at the same time (within COALESCE_S) are read in a single pipelined batch, so the periodic
+    telemetry takes one exchange at a time instead of independent checkers contending for the port. While any
+    critical window is open (timing sensitive exposure), polls are postponed up to CRITICAL_MAX_DEFERRAL_S.
+    Consumers read the published snapshot instead of asking the motion controller.
+    """
+
+    COALESCE_S = 0.1
+    AGE_MARGIN_S = 0.5  # poll duration and scheduling delay on top of the poll interval
+    CRITICAL_MAX_DEFERRAL_S = 5
+
+    def __init__(self, mcc, failed: Optional[Signal] = None):
+        self._logger = logging.getLogger(__name__)
+        self._mcc = mcc
+        self._failed = failed
+        self._items: Dict[str, TelemetryItem] = {}
+        self._snapshot = TelemetrySnapshot()
+        self._delay = ControlledDelay()
+        self._lock = Lock()
+        self._critical = 0
+        self._critical_since = 0.0
+        self._loop_thread = LoopThread("telemetry")
+        self._future: Optional[Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0  # batches read so far
+
+    @property
+    def snapshot(self) -> TelemetrySnapshot:
+        return self._snapshot
+
+    def recent(self, name: str, max_age_s: float) -> Any:
+        """
+        Polled value, None if it is outdated
+
+        A value is never outdated before its next poll is due, so the age limit is at least the poll interval of
+        the item. While a critical window is open the polls are deferred and the last value is served regardless
+        of its age. Values changed by a motion controller command are outdated by invalidate().
+
+        :return: Value of the snapshot field if it was polled at most max_age_s ago, None otherwise
+        """
+        snapshot = self._snapshot
+        polled = snapshot.polled_at(name)
+        if polled is None:
+            return None
+        if not self._critical:
+            item = self._items.get(snapshot.SOURCES.get(name, name))
+            if item:
+                max_age_s = max(max_age_s, item.interval() + self.AGE_MARGIN_S)
+            if monotonic() - polled > max_age_s:
+                return None
+        return getattr(snapshot, name)
+
+    def invalidate(self, name: str) -> None:
+        """
+        Mark the polled value outdated (the motion controller was told to change it) and poll it right away
+        """
+        with self._lock:
+            polled = dict(self._snapshot.polled)
+            polled.pop(name, None)
+            self._snapshot = replace(self._snapshot, version=self._snapshot.version + 1, polled=polled)
+            item = self._items.get(name)
+            if item:
+                item.due = 0
+                item.invalidated = monotonic()
+        self._delay.cancel()
+
+    def add(self, item: TelemetryItem) -> None:
+        with self._lock:
+            self._items[item.name] = item
+        self._delay.cancel()
+
+    def set_rapid_update(self, name: str, rapid: bool) -> None:
+        """
+        Switch the item to the rapid interval and poll it right away
+        """
+        with self._lock:
+            item = self._items[name]
+            item.rapid = rapid
+            item.due = 0
+        self._delay.cancel()
+
+    @contextmanager
+    def critical(self):
+        """
+        Timing critical window, periodic polls back off while any one is open
+        """
+        with self._lock:
+            if not self._critical:
+                self._critical_since = monotonic()
+            self._critical += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._critical -= 1
+            self._delay.cancel()
+
+    def start(self, services: Iterable[Callable[[], Coroutine]] = ()) -> None:
+        """
+        Run the poller in its own event loop thread
+
+        :param services: coroutine functions run in the same loop alongside the poller (fan and temperature control)
+        """
+        self._future = self._loop_thread.submit(self._run(services))
+
+    def stop(self) -> None:
+        if self._future:
+            self._loop_thread.run(self._cancel())
+            self._future = None
+        self._loop_thread.stop()
+
+    async def _cancel(self) -> None:
+        # cancellation gets lost when wait_for in the delay finishes at the same time, repeat it until it sticks
+        while self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.wait([self._task], timeout=0.1)
+
+    async def _run(self, services: Iterable[Callable[[], Coroutine]]) -> None:
+        self._task = asyncio.current_task()
+        self._logger.info("Telemetry poller running")
+        try:
+            await asyncio.gather(self.run(), *(service() for service in services))
+        except asyncio.CancelledError:
+            pass  # This is normal printer shutdown
+        except Exception:
+            self._logger.exception("Telemetry poller crashed")
+            if self._failed:
+                self._failed.emit()
+            raise
+        finally:
+            self._logger.info("Telemetry poller ended")
+
+    async def run(self) -> None:
+        while True:
+            due = self._due_items()
+            if due:
+                self.poll(due)
+            await self._delay.delay(self._wait_s())
+
+    def _due_items(self) -> List[TelemetryItem]:
+        now = monotonic()
+        with self._lock:
+            if self._critical and now - self._critical_since < self.CRITICAL_MAX_DEFERRAL_S:
+                return []
+            return [item for item in self._items.values() if item.due <= now + self.COALESCE_S]
+
+    def _wait_s(self) -> float:
+        now = monotonic()
+        with self._lock:
+            wait = min((item.due for item in self._items.values()), default=now + 1) - now
+            if self._critical:
+                wait = max(wait, self._critical_since + self.CRITICAL_MAX_DEFERRAL_S - now)
+        return max(0.0, wait)
+
+    def poll(self, items: List[TelemetryItem]) -> None:
+        """
+        Read the items in a single batch, publish a new snapshot and emit signals of the changed values
+        """
+        start = monotonic()
+        values = self._mcc.do_batch([item.command for item in items])
+        now = monotonic()
+        # processing may emit signals which reschedule items, do not hold the lock
+        values = [item.process(value) if item.process else value for item, value in zip(items, values)]
+        changed = []
+        with self._lock:
+            for item, value in zip(items, values):
+                # keep the schedule grid so items of commensurable intervals stay coalesced
+                due = item.due + item.interval()
+                item.due = due if item.due and due > now else now + item.interval()
+                if item.value is None or item.value != value:
+                    item.value = value
+                    changed.append(item)
+            self._snapshot = replace(
+                self._snapshot,
+                version=self._snapshot.version + 1,
+                # a value read before the last invalidation is already outdated, keep it unpolled
+                polled={
+                    **self._snapshot.polled,
+                    **{item.name: start for item in items if item.invalidated < start},
+                },
+                **{item.name: item.value for item in items},
+            )
+            self.polls += 1
+        for item in changed:
+            if item.signal is not None:
+                if item.pass_value:
+                    item.signal.emit(item.value)
+                else:
+                    item.signal.emit()
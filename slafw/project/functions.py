@@ -4,6 +4,8 @@
 # Copyright (C) 2020 Prusa Research a.s. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from typing import Tuple
+
 import numpy
 from PIL import Image
 
@@ -17,6 +19,28 @@ def get_white_pixels(image: Image) -> int:
     return int(numpy.sum(np_array[128:]))  # simple threshold
 
 
+def get_usage_and_white_pixels(pixels: numpy.ndarray, factor: int) -> Tuple[numpy.ndarray, int]:
+    """
+    Sum pixels in factor x factor blocks and count white pixels in a single pass over the image
+
+    Blocks which are all black or all white are counted from their sums, only the remaining
+    (edge) blocks are thresholded pixel by pixel.
+
+    :param pixels: 2D uint8 array, both dimensions divisible by factor
+    :param factor: block size
+    :return: uint32 array of block sums, white pixels count
+    """
+    height, width = pixels.shape
+    blocks = pixels.reshape(height // factor, factor, width // factor, factor)
+    sums = blocks.sum(axis=(1, 3), dtype=numpy.uint32)
+    white_block = 255 * factor * factor
+    white_pixels = int(numpy.count_nonzero(sums == white_block)) * factor * factor
+    rows, cols = numpy.nonzero((sums != 0) & (sums != white_block))
+    if rows.size:
+        white_pixels += int(numpy.count_nonzero(blocks[rows, :, cols, :] >= 128))  # simple threshold
+    return sums, white_pixels
+
+
 def check_ready_to_print(config: HwConfig, uv_parameters: UvLedParameters) -> None:
     """
     This raises exceptions when printer is not ready to print
@@ -0,0 +1,243 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Optional, Dict, Any, List, Collection, Iterable, Set
+from zipfile import ZipFile
+
+from slafw import defines
+from slafw.configs.project import ProjectConfig
+from slafw.hardware.printer_model import PrinterModel
+
+
+class ProjectIndex:
+    """
+    Persistent index of project files and their summaries
+
+    Directories are listed again only when their modification time changes (a file was added, removed or renamed),
+    project files are parsed again only when their size or modification time changes. Listing projects is therefore
+    a stat of the known directories and project files instead of a recursive glob per extension.
+
+    Queries are answered from the last published state of the index and never wait for the file system, refreshes
+    run in a background thread (requested by media events and by the queries themselves).
+    """
+
+    VERSION = 1
+
+    def __init__(self, index_file: Path):
+        self.logger = logging.getLogger(__name__)
+        self._index_file = index_file
+        self._lock = Lock()  # held for the whole refresh
+        self._load_lock = Lock()
+        self._pending_lock = Lock()
+        self._pending: Set[str] = set()  # roots to refresh in the background
+        self._dropped: Set[str] = set()  # roots to forget in the background
+        self._worker: Optional[Thread] = None
+        self._published: Dict[str, Dict[str, Any]] = {}  # project path -> summary, replaced as a whole
+        self._loaded = False
+        self._dirty = False
+        # directory -> {"mtime": float, "dirs": [subdirectory names], "files": [project file names]}
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        # project file path -> summary
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._extensions: Set[str] = set()
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            # models register themselves on import, collect extensions as late as possible
+            self._extensions = {extension for model in PrinterModel for extension in model.extensions if extension}
+            try:
+                with self._index_file.open("r") as f:
+                    data = json.load(f)
+                if data["version"] == self.VERSION:
+                    self._dirs = data["dirs"]
+                    self._files = data["files"]
+            except FileNotFoundError:
+                pass
+            except Exception:
+                self.logger.exception("Failed to load project index, starting from scratch")
+            self._publish()
+
+    def _publish(self) -> None:
+        # summaries are replaced, never modified, a shallow copy is enough
+        self._published = dict(self._files)
+
+    def _save(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            tmp = self._index_file.with_name(self._index_file.name + "~")
+            with tmp.open("w") as f:
+                json.dump({"version": self.VERSION, "dirs": self._dirs, "files": self._files}, f)
+            os.replace(tmp, self._index_file)
+            self._dirty = False
+        except Exception:
+            self.logger.exception("Failed to save project index")
+
+    def _forget(self, directory: str) -> None:
+        record = self._dirs.pop(directory, None)
+        if not record:
+            return
+        self._dirty = True
+        for name in record["files"]:
+            self._files.pop(os.path.join(directory, name), None)
+        for name in record["dirs"]:
+            self._forget(os.path.join(directory, name))
+
+    def _scan(self, directory: str) -> None:
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            self._forget(directory)
+            return
+        record = self._dirs.get(directory)
+        if not record or record["mtime"] != mtime:
+            dirs = []
+            files = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif entry.is_file() and os.path.splitext(entry.name)[1] in self._extensions:
+                            files.append(entry.name)
+            except OSError:
+                self.logger.exception("Failed to list '%s'", directory)
+            if record:
+                for name in set(record["files"]) - set(files):
+                    self._files.pop(os.path.join(directory, name), None)
+                for name in set(record["dirs"]) - set(dirs):
+                    self._forget(os.path.join(directory, name))
+            record = {"mtime": mtime, "dirs": dirs, "files": files}
+            self._dirs[directory] = record
+            self._dirty = True
+        for name in record["files"]:
+            self._update_file(os.path.join(directory, name))
+        for name in record["dirs"]:
+            self._scan(os.path.join(directory, name))
+
+    def _update_file(self, path: str) -> None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._files.pop(path, None)
+            self._dirty = True
+            return
+        summary = self._files.get(path)
+        if summary and summary["size"] == stat.st_size and summary["mtime"] == stat.st_mtime:
+            return
+        self._files[path] = self._summary(path, stat)
+        self._dirty = True
+
+    def _summary(self, path: str, stat: os.stat_result) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {"size": stat.st_size, "mtime": stat.st_mtime, "valid": False}
+        config = ProjectConfig()
+        try:
+            with ZipFile(path, "r") as zf:
+                config.read_text(zf.read(defines.configFile).decode("utf-8"))
+        except Exception:
+            self.logger.warning("Failed to read project config of '%s'", path, exc_info=True)
+            return summary
+        summary.update({
+            "valid": True,
+            "name": config.job_dir,
+            "layers": config.layersSlow + config.layersFast,
+            "print_time_s": config.printTime,
+            "exposure_time_ms": int(config.expTime * 1e3),
+            "material": config.materialName,
+            "printer_model": config.printerModel,
+        })
+        return summary
+
+    def refresh(self, roots: Iterable[Path]) -> None:
+        """
+        Bring the index of the roots up to date
+        """
+        with self._lock:
+            self._load()
+            self._forget_dropped()
+            for root in roots:
+                self._scan(str(root))
+                self._publish()
+            self._save()
+
+    def refresh_async(self, roots: Iterable[Path]) -> None:
+        """
+        Refresh the index of the roots in the background, requests made during a refresh are merged into one
+        """
+        with self._pending_lock:
+            self._pending.update(str(root) for root in roots)
+            if self._worker:
+                return
+            self._worker = Thread(target=self._refresh_pending, name="project-index", daemon=True)
+            self._worker.start()
+
+    def _refresh_pending(self) -> None:
+        while True:
+            with self._pending_lock:
+                roots = sorted(self._pending)
+                self._pending.clear()
+                if not roots and not self._dropped:
+                    self._worker = None
+                    return
+            try:
+                self.refresh(Path(root) for root in roots)
+            except Exception:
+                self.logger.exception("Failed to refresh project index")
+
+    def drop(self, root: Path) -> None:
+        """
+        Forget the root, used when media are ejected
+
+        Its projects are hidden right away, the index is updated in the background.
+        """
+        self._load()
+        with self._pending_lock:
+            self._dropped.add(str(root))
+        self._published = {
+            path: summary for path, summary in self._published.items() if Path(root) not in Path(path).parents
+        }
+        self.refresh_async(())
+
+    def _forget_dropped(self) -> None:
+        with self._pending_lock:
+            dropped = list(self._dropped)
+            self._dropped.clear()
+        for root in dropped:
+            for directory in [directory for directory in self._dirs
+                              if directory == root or Path(root) in Path(directory).parents]:
+                self._forget(directory)
+        if dropped:
+            self._publish()
+
+    def query(self, roots: Iterable[Path], extensions: Optional[Collection[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Projects under the roots as currently indexed, a refresh of the roots is started in the background
+
+        Changes made since the last refresh show up in the next query.
+
+        :param roots: directories to list
+        :param extensions: only projects with these extensions, all known by default
+        :return: project path -> summary (size, mtime, valid, name, layers, print_time_s, exposure_time_ms, material,
+                 printer_model)
+        """
+        roots = [Path(root) for root in roots]
+        self._load()
+        self.refresh_async(roots)
+        return {
+            path: dict(summary)
+            for path, summary in self._published.items()
+            if (extensions is None or os.path.splitext(path)[1] in extensions)
+            and any(root in Path(path).parents for root in roots)
+        }
+
+    def paths(self, roots: Iterable[Path], extensions: Optional[Collection[str]] = None) -> List[Path]:
+        return sorted(Path(path) for path in self.query(roots, extensions))
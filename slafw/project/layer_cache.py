@@ -0,0 +1,212 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from queue import SimpleQueue
+from threading import Thread
+from typing import Optional, List, Dict, Any, BinaryIO, Tuple
+
+import numpy
+from PIL import Image
+
+from slafw import defines
+
+
+class LayerCache:
+    """
+    On-disk store of decoded layer images of a project
+
+    Layers are kept as raw 8 bit frames cropped to their bounding box, one after another in a single file. The file is
+    memory mapped when the project is printed again, so getting a layer is a copy instead of a PNG decode. The cache
+    is filled as layers are read during the first print and becomes valid once all layers are stored. Caches of other
+    projects are evicted, least recently used first, to keep defines.internalReservedSpace free and all caches within
+    defines.layer_cache_max_size. Writing, space checks and eviction run in a writer thread, the reading thread only
+    queues the decoded images.
+    """
+
+    INDEX = "index.json"
+    FRAMES = "frames.raw"
+
+    def __init__(self, project_path: str, key: Dict[str, Any], layers: List[str]):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(defines.previousPrints) / (Path(project_path).name + defines.layerCacheSuffix)
+        self._key = key
+        self._layers = {name: index for index, name in enumerate(layers)}
+        self._size: Optional[Tuple[int, int]] = None
+        self._entries: List[Tuple[int, Optional[Tuple[int, int, int, int]]]] = []
+        self._frames: Optional[numpy.memmap] = None
+        self._writer: Optional[BinaryIO] = None
+        self._written = 0
+        self._writing = False  # layers are accepted
+        self._queued = 0
+        self._queue: SimpleQueue = SimpleQueue()
+        self._thread: Optional[Thread] = None
+        if not self._load():
+            self._start()
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._layers
+
+    @property
+    def ready(self) -> bool:
+        return len(self._entries) == len(self._layers) and self._writer is None
+
+    def _load(self) -> bool:
+        try:
+            with (self.path / self.INDEX).open("r") as f:
+                index = json.load(f)
+            if index["key"] != self._key:
+                self.logger.info("Layer cache '%s' belongs to another project", self.path)
+                return False
+            self._size = tuple(index["size"])
+            self._entries = [(offset, tuple(bbox) if bbox else None) for offset, bbox in index["layers"]]
+            if os.path.getsize(self.path / self.FRAMES):
+                self._frames = numpy.memmap(self.path / self.FRAMES, dtype=numpy.uint8, mode="r")
+            os.utime(self.path / self.INDEX)
+            self.logger.info("Using layer cache '%s'", self.path)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception:
+            self.logger.exception("Failed to load layer cache '%s'", self.path)
+            self._entries = []
+            return False
+
+    def _start(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.path.mkdir(parents=True)
+        self._writer = (self.path / self.FRAMES).open("wb")
+        self._writing = True
+        self._thread = Thread(target=self._write_layers, name="layer_cache", daemon=True)
+        self._thread.start()
+        self.logger.info("Creating layer cache '%s'", self.path)
+
+    def get(self, filename: str) -> Optional[Image.Image]:
+        """
+        :return: decoded layer image or None if the cache is not complete yet
+        """
+        if not self.ready:
+            return None
+        offset, bbox = self._entries[self._layers[filename]]
+        image = Image.new("L", self._size)
+        if bbox:
+            size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+            data = self._frames[offset:offset + size[0] * size[1]]
+            image.paste(Image.frombuffer("L", size, data, "raw", "L", 0, 1), bbox[:2])
+        return image
+
+    def put(self, filename: str, image: Image.Image) -> None:
+        """
+        Queue decoded layer image to be stored, the image must not be modified afterwards
+
+        Layers have to come in order. Anything else (jump in the layers, different image format) drops the cache.
+        """
+        if not self._writing:
+            return
+        if self._layers.get(filename) != self._queued or image.mode != "L":
+            self.logger.info("Layer '%s' out of sequence or of other format, dropping layer cache", filename)
+            self.drop()
+            return
+        self._queued += 1
+        self._queue.put(image)
+
+    def _write_layers(self) -> None:
+        while True:
+            image = self._queue.get()
+            if image is None:
+                break
+            try:
+                if not self._store(image):
+                    break
+            except Exception:
+                self.logger.exception("Failed to store layer in cache")
+                break
+            if self._writer is None:
+                self._writing = False  # complete
+                return
+        self._writing = False
+        self._remove()
+
+    def _store(self, image: Image.Image) -> bool:
+        if self._size and image.size != self._size:
+            self.logger.info("Layer of other size, dropping layer cache")
+            return False
+        bbox = image.getbbox()
+        data = image.crop(bbox).tobytes() if bbox else b""
+        if not self._make_room(len(data)):
+            self.logger.info("Not enough space or over the size limit, dropping layer cache")
+            return False
+        self._writer.write(data)
+        self._entries.append((self._written, bbox))
+        self._written += len(data)
+        self._size = image.size
+        if len(self._entries) == len(self._layers):
+            self._finish()
+        return True
+
+    def _finish(self) -> None:
+        self._writer.close()
+        with (self.path / self.INDEX).open("w") as f:
+            json.dump({"key": self._key, "size": self._size, "layers": self._entries}, f)
+        if self._written:
+            self._frames = numpy.memmap(self.path / self.FRAMES, dtype=numpy.uint8, mode="r")
+        self._writer = None  # ready from now on
+        self.logger.info("Layer cache '%s' complete, %d bytes", self.path, self._written)
+
+    def _make_room(self, size: int) -> bool:
+        if self._written + size > defines.layer_cache_max_size:
+            return False
+        while True:
+            others = [path for path in Path(defines.previousPrints).glob("*" + defines.layerCacheSuffix)
+                      if path != self.path and path.is_dir()]
+            others_size = sum(self._frames_size(path) for path in others)
+            statvfs = os.statvfs(self.path)
+            if statvfs.f_frsize * statvfs.f_bavail - defines.internalReservedSpace >= size \
+                    and others_size + self._written + size <= defines.layer_cache_max_size:
+                return True
+            if not others:
+                return False
+            oldest = min(others, key=lambda path: (path / self.INDEX).stat().st_mtime
+                         if (path / self.INDEX).exists() else 0)
+            self.logger.info("Evicting layer cache '%s'", oldest)
+            shutil.rmtree(oldest, ignore_errors=True)
+
+    def _frames_size(self, path: Path) -> int:
+        try:
+            return (path / self.FRAMES).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _remove(self) -> None:
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        self._entries = []
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def drop(self) -> None:
+        """
+        Remove the cache, an unfinished one is removed by the writer thread
+        """
+        self._writing = False
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+        else:
+            self._frames = None
+            self._remove()
+
+    def close(self) -> None:
+        """
+        Release the cache, wait for the queued layers to be stored, unfinished cache is removed
+        """
+        self._writing = False
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._frames = None
@@ -9,19 +9,23 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import shutil
 import functools
-from zipfile import ZipFile
+from multiprocessing import get_context
+from threading import Thread
+from zipfile import ZipFile, BadZipFile
 from datetime import datetime, timezone
 from io import BytesIO
 from pathlib import Path
 from time import time
-from typing import Optional, Collection, List, Set
+from typing import Optional, Collection, List, Set, Dict, Tuple, Any, Callable
 from enum import unique, IntEnum
 
 import pprint
+import numpy
 from PIL import Image
 from PySignal import Signal
 
@@ -34,6 +38,8 @@ from slafw.configs.project import ProjectConfig
 from slafw.functions.system import get_configured_printer_model
 from slafw.hardware.base.hardware import BaseHardware
 from slafw.project.functions import get_white_pixels
+from slafw.project.layer_cache import LayerCache
+from slafw.project.zip_copy import copy_and_verify
 from slafw.utils.bounding_box import BBox
 from slafw.api.decorators import range_checked
 
@@ -50,6 +56,22 @@ class ExposureUserProfile(IntEnum):
     #CUSTOM = 2
     #CUSTOM2 = 3
 
+def _analyze_images(path: str, images: List[str]) -> List[Tuple[Optional[Tuple[int, int, int, int]], int]]:
+    """
+    Project.analyze() worker, runs in a separate process
+
+    :return: bounding box coords and white pixels count of each image
+    """
+    results = []
+    with ZipFile(path, "r") as zf:
+        for image in images:
+            img = Image.open(BytesIO(zf.read(image)))
+            if img.mode != "L":
+                img = img.convert("L")
+            results.append((img.getbbox(), get_white_pixels(img)))
+    return results
+
+
 class ProjectLayer:
     def __init__(self, image: str, height_nm: int):
         self.image = image
@@ -72,7 +94,7 @@ class ProjectLayer:
         return pp.pformat(items)
 
     def __eq__(self, other):
-        return isinstance(other, type(self)) \
+        return isinstance(other, ProjectLayer) \
             and self.image == other.image \
             and self.height_nm == other.height_nm \
             and self.times_ms == other.times_ms \
@@ -87,6 +109,137 @@ class ProjectLayer:
             self.calibration_type = LayerCalibrationType.LABEL_TEXT
 
 
+class LayerView(ProjectLayer):
+    """
+    ProjectLayer backed by a row of LayerTable
+    """
+
+    # pylint: disable = super-init-not-called
+    def __init__(self, table: LayerTable, index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def image(self) -> str:
+        return self._table.images[self._index]
+
+    @property
+    def height_nm(self) -> int:
+        return int(self._table.height_nm[self._index])
+
+    @property
+    def times_ms(self) -> Tuple[int, ...]:
+        return tuple(int(t) for t in self._table.times_ms[self._index])
+
+    @property
+    def consumed_resin_nl(self) -> Optional[int]:
+        consumed = int(self._table.consumed_resin_nl[self._index])
+        return consumed if consumed >= 0 else None
+
+    @consumed_resin_nl.setter
+    def consumed_resin_nl(self, value: int):
+        self._table.consumed_resin_nl[self._index] = value
+        self._table.changed()
+
+    @property
+    def bbox(self) -> BBox:
+        coords = tuple(int(c) for c in self._table.bbox[self._index])
+        return BBox(coords) if coords[2] > coords[0] and coords[3] > coords[1] else BBox()
+
+    @bbox.setter
+    def bbox(self, bbox: BBox):
+        self._table.bbox[self._index] = bbox.coords if bbox else (0, 0, 0, 0)
+
+    @property
+    def calibration_type(self) -> LayerCalibrationType:
+        return LayerCalibrationType(self._table.calibration_type[self._index])
+
+
+class LayerTable:
+    """
+    Columnar description of project layers
+
+    Layer properties are kept in arrays instead of a ProjectLayer object per layer. Remaining time, resin and slow
+    layer counts are answered from prefix sums, which are recomputed only after the data change. Indexing returns
+    a LayerView, so the table can be used as a sequence of ProjectLayer.
+    """
+
+    def __init__(self, images: List[str], height_first_nm: int, height_nm: int):
+        count = len(images)
+        self.images = images
+        self.height_nm = numpy.full(count, height_nm, dtype=numpy.int64)
+        self.height_nm[:1] = height_first_nm
+        self.times_ms = numpy.zeros((count, 1), dtype=numpy.int64)
+        self.consumed_resin_nl = numpy.full(count, -1, dtype=numpy.int64)
+        self.bbox = numpy.zeros((count, 4), dtype=numpy.int32)
+        self.calibration_type = numpy.zeros(count, dtype=numpy.uint8)
+        self.slow = numpy.zeros(count, dtype=bool)  # area over the slow tilt threshold, valid once analyzed
+        self._prefix: Dict[str, numpy.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [LayerView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("layer index out of range")
+        return LayerView(self, index)
+
+    def __iter__(self):
+        return (LayerView(self, i) for i in range(len(self)))
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return False
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def set_calibration_types(self, pad_thickness_nm: int, text_thickness_nm: int) -> None:
+        bottom_nm = numpy.cumsum(self.height_nm) - self.height_nm
+        self.calibration_type[:] = LayerCalibrationType.NONE
+        self.calibration_type[bottom_nm < pad_thickness_nm + text_thickness_nm] = LayerCalibrationType.LABEL_TEXT
+        self.calibration_type[bottom_nm < pad_thickness_nm] = LayerCalibrationType.LABEL_PAD
+
+    def set_times(self, times_ms: numpy.ndarray) -> None:
+        self.times_ms = times_ms
+        self.changed()
+
+    def changed(self) -> None:
+        """
+        Drop prefix sums, call after modifying the arrays directly
+        """
+        self._prefix.clear()
+
+    def _sums(self, name: str, values) -> numpy.ndarray:
+        if name not in self._prefix:
+            sums = numpy.zeros(len(self) + 1, dtype=numpy.int64)
+            numpy.cumsum(values(), out=sums[1:])
+            self._prefix[name] = sums
+        return self._prefix[name]
+
+    @property
+    def analyzed(self) -> bool:
+        return bool((self.consumed_resin_nl >= 0).all())
+
+    def remain_time_ms(self, layers_done: int) -> int:
+        sums = self._sums("time", lambda: self.times_ms.sum(axis=1))
+        return int(sums[-1] - sums[min(layers_done, len(self))])
+
+    def remain_resin_nl(self, layers_done: int) -> int:
+        sums = self._sums("resin", lambda: numpy.maximum(self.consumed_resin_nl, 0))
+        return int(sums[-1] - sums[min(layers_done, len(self))])
+
+    def remain_slow_layers(self, layers_done: int) -> int:
+        sums = self._sums("slow", lambda: self.slow)
+        return int(sums[-1] - sums[min(layers_done, len(self))])
+
+
 class Project:
     def __init__(self, hw: BaseHardware, project_file: str):
         self.logger = logging.getLogger(__name__)
@@ -99,7 +252,8 @@ class Project:
         # When printing points to `previous-prints`
         self.path = project_file
         self._config = ProjectConfig()
-        self.layers: List[ProjectLayer] = []
+        self._layer_images: List[str] = []
+        self._layers: Optional[LayerTable] = None
         self.total_height_nm = 0
         self.layer_height_nm = 0
         self.layer_height_first_nm = 0
@@ -112,6 +266,10 @@ class Project:
         self.modification_time = 0.0
         self.per_partes = hw.config.perPartes
         self._zf: Optional[ZipFile] = None
+        self._layer_cache: Optional[LayerCache] = None
+        self._layer_cache_failed = False
+        self._verifier: Optional[Thread] = None
+        self._corrupted_layer: Optional[int] = None
         self._mode_warn = True
         self._exposure_time_ms = 0
         self._exposure_time_first_ms = 0
@@ -123,7 +281,7 @@ class Project:
         self._exposure_user_profile = ExposureUserProfile.DEFAULT
         namelist = self._read_toml_config()
         self._parse_config()
-        self._build_layers_description(self._check_filenames(namelist))
+        self._set_layer_images(self._check_filenames(namelist))
 
     def __del__(self):
         self.data_close()
@@ -228,45 +386,48 @@ class Project:
         if altered_values:
             self.warnings.add(ProjectSettingsModified(altered_values))
 
-    def _build_layers_description(self, to_print: list):
-        first = True
-        pad_thickness_nm = int(self._config.calibratePadThickness * 1e6)
-        text_thickness_nm = int(self._config.calibrateTextThickness * 1e6)
-        for image in to_print:
-            if first:
-                height = self.layer_height_first_nm
-                first = False
-            else:
-                height = self.layer_height_nm
-            layer = ProjectLayer(image, height)
-            layer.set_calibration_type(self.total_height_nm, pad_thickness_nm, text_thickness_nm)
-            self.layers.append(layer)
-            self.total_height_nm += height
-        total_layers = len(self.layers)
+    def _set_layer_images(self, to_print: list):
+        self._layer_images = to_print
+        total_layers = len(to_print)
         self.logger.info("found %d layer(s)", total_layers)
         if not total_layers:
             self.logger.error("Not enough layers")
             raise ProjectErrorNotEnoughLayers
-        self._fill_layers_times()
+        self.total_height_nm = self.layer_height_first_nm + (total_layers - 1) * self.layer_height_nm
 
-    def _fill_layers_times(self):
+    @property
+    def layers(self) -> LayerTable:
+        """
+        Layer table is built on the first access
+
+        Opening the project for the confirmation screen needs just the config and the layer count.
+        """
+        if self._layers is None:
+            self._layers = LayerTable(self._layer_images, self.layer_height_first_nm, self.layer_height_nm)
+            self._layers.set_calibration_types(
+                int(self._config.calibratePadThickness * 1e6), int(self._config.calibrateTextThickness * 1e6))
+            self._layers.set_times(self._layers_times_ms())
+        return self._layers
+
+    def _layers_times_ms(self) -> numpy.ndarray:
+        index = numpy.arange(len(self._layer_images))
         fade_layers = self._config.fadeLayers
-        time_loss = (self._exposure_time_first_ms - self._exposure_time_ms) // (fade_layers + 1)
         extra_layers = defines.exposure_time_first_extra_layers
-        for i, layer in enumerate(self.layers):
-            if i <= extra_layers:
-                t = self._exposure_time_first_ms
-            elif i <= fade_layers + extra_layers:
-                t = self._exposure_time_first_ms - (i - extra_layers) * time_loss
-            else:
-                t = self._exposure_time_ms
-            if self._calibrate_regions:
-                if self._calibrate_time_ms_exact:
-                    layer.times_ms = self._calibrate_time_ms_exact
-                else:
-                    layer.times_ms = (t,) + (self._calibrate_time_ms,) * (self._calibrate_regions - 1)
-            else:
-                layer.times_ms = (t,)
+        time_loss = (self._exposure_time_first_ms - self._exposure_time_ms) // (fade_layers + 1)
+        times = numpy.full(len(index), self._exposure_time_ms, dtype=numpy.int64)
+        fade = index <= fade_layers + extra_layers
+        times[fade] = self._exposure_time_first_ms - (index[fade] - extra_layers) * time_loss
+        times[index <= extra_layers] = self._exposure_time_first_ms
+        if self._calibrate_regions:
+            if self._calibrate_time_ms_exact:
+                return numpy.tile(numpy.array(self._calibrate_time_ms_exact, dtype=numpy.int64), (len(index), 1))
+            calibrate = numpy.full((len(index), self._calibrate_regions - 1), self._calibrate_time_ms, dtype=numpy.int64)
+            return numpy.column_stack((times, calibrate))
+        return times[:, None]
+
+    def _fill_layers_times(self):
+        if self._layers is not None:
+            self._layers.set_times(self._layers_times_ms())
 
     def analyze(self, force: bool = False ):
         """
@@ -281,25 +442,24 @@ class Project:
         update_consumed = False
         self.bbox = BBox()
         try:
-            for layer in self.layers:
-                if force or not layer.bbox or not layer.consumed_resin_nl:
-                    img = self.read_image(layer.image)
-                else:
-                    img = None
+            results = self._analyze_layers(
+                [i for i, layer in enumerate(self.layers) if force or not layer.bbox or not layer.consumed_resin_nl])
+            for i, layer in enumerate(self.layers):
                 if force or not layer.bbox:
-                    layer.bbox = BBox(img.getbbox())
+                    layer.bbox = BBox(results[i][0])
                     self.logger.debug("'%s' image bbox: %s", layer.image, layer.bbox)
                 else:
                     self.logger.debug("'%s' project bbox: %s", layer.image, layer.bbox)
                 self.bbox.maximize(layer.bbox)
                 # labels and pads are not counted
                 if force or not layer.consumed_resin_nl:
-                    white_pixels = get_white_pixels(img.crop(layer.bbox.coords))
+                    white_pixels = results[i][1]
                     if self._calibrate_regions:
                         white_pixels *= self._calibrate_regions
                     self.logger.debug("white_pixels: %s", white_pixels)
                     update_consumed = True
-                    if white_pixels > self._hw.white_pixels_threshold:
+                    self.layers.slow[i] = white_pixels > self._hw.white_pixels_threshold
+                    if self.layers.slow[i]:
                         new_slow_layers += 1
                     # nm3 -> nl
                     layer.consumed_resin_nl = white_pixels * self._hw.exposure_screen.parameters.pixel_size_nm ** 2 * layer.height_nm // int(1e15)
@@ -311,10 +471,63 @@ class Project:
                 self.used_material_nl = new_used_material_nl
                 self.logger.info("new layers_slow: %d, new layers_fast: %s", self._layers_slow, self._layers_fast)
                 self.logger.info("new used_material_nl: %d", self.used_material_nl)
+                self.layers.changed()
+                self.count_remain_time.cache_clear()
         except Exception as e:
             self.logger.exception("analyze exception: %s", str(e))
             raise ProjectErrorAnalysisFailed from e
 
+    def _analyze_layers(self, indices: List[int]) -> Dict[int, Any]:
+        """
+        Get bounding box coords and white pixels count of the layers, from the sidecar file if possible
+
+        Layer images are decoded in a pool of processes started by the forkserver, chunk by chunk.
+        """
+        if not indices:
+            return {}
+        cache_file = Path(defines.previousPrints) / (Path(self.path).name + defines.projectAnalysisSuffix)
+        cache_key = self._content_key()
+        try:
+            with cache_file.open("r") as f:
+                cache = json.load(f)
+            if cache["key"] == cache_key:
+                self.logger.info("Using analysis results from '%s'", cache_file)
+                return {i: cache["layers"][i] for i in indices}
+            self.logger.info("Analysis results in '%s' belong to another project", cache_file)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            self.logger.exception("Failed to read analysis results from '%s'", cache_file)
+
+        processes = os.cpu_count() or 1
+        chunk_size = max(1, -(-len(indices) // (4 * processes)))
+        chunks = [indices[i:i + chunk_size] for i in range(0, len(indices), chunk_size)]
+        results: Dict[int, Any] = {}
+        # forked workers would inherit the threads and the queued log handler of the printer process
+        with get_context("forkserver").Pool(min(processes, len(chunks))) as pool:
+            analyze = functools.partial(_analyze_images, self.path)
+            for chunk, chunk_results in zip(chunks, pool.imap(analyze, [[self.layers[i].image for i in chunk] for chunk in chunks])):
+                results.update(zip(chunk, chunk_results))
+                self.logger.debug("analyzed %d/%d layers", len(results), len(indices))
+
+        if len(results) == len(self.layers):
+            try:
+                with cache_file.open("w") as f:
+                    json.dump({"key": cache_key, "layers": [results[i] for i in range(len(self.layers))]}, f)
+            except Exception:
+                self.logger.exception("Failed to save analysis results to '%s'", cache_file)
+        return results
+
+    def _content_key(self) -> Dict[str, Any]:
+        """
+        Identification of the project file content for the analysis results and the layer cache
+        """
+        self.data_open()
+        return {
+            "size": os.path.getsize(self.path),
+            "crc": [self._zf.getinfo(layer.image).CRC for layer in self.layers],
+        }
+
     @property
     def name(self) -> str:
         """
@@ -397,7 +610,7 @@ class Project:
 
     @property
     def total_layers(self) -> int:
-        total_layers = len(self.layers)
+        total_layers = len(self._layer_images)
         if total_layers != self._layers_slow + self._layers_fast:
             self.logger.warning("total_layers (%d) not match layers_slow (%d) + layers_fast (%d)",
                     total_layers, self._layers_slow, self._layers_fast)
@@ -413,10 +626,27 @@ class Project:
     def first_slow_layers(self) -> int:
         return self._config.fadeLayers + defines.exposure_time_first_extra_layers + 1
 
-    def copy_and_check(self):
+    def copy_and_check(self, progress: Optional[Callable[[float], None]] = None, background: bool = False):
+        """
+        Copy the project to the internal storage (if possible) and check its integrity
+
+        The copy and the CRC check are done in a single pass over the project file. In the background mode only the
+        files needed at the print start and the first defines.project_verify_foreground_layers layers are checked
+        here, the remaining layers are checked in a thread while printing, see check_layer().
+
+        :param progress: called with the fraction (0-1) of the project file processed
+        :param background: check later layers in the background
+        """
         origin_path = os.path.normpath(self.path)
         (dummy, filename) = os.path.split(origin_path)
         new_source = os.path.join(defines.previousPrints, filename)
+        layer_indices = {layer.image: index for index, layer in enumerate(self.layers)}
+
+        def foreground(name: str) -> bool:
+            return not background or layer_indices.get(name, 0) < defines.project_verify_foreground_layers
+
+        badfile = None
+        verified = False
         if origin_path == new_source:
             self.logger.debug("Reprint of project '%s'", origin_path)
         elif origin_path.startswith(defines.internalProjectPath):
@@ -439,33 +669,75 @@ class Project:
                 self.warnings.add(PrintingDirectlyFromMedia())
             else:
                 try:
-                    self.logger.debug("Copying project to internal storage '%s' -> '%s'", origin_path, new_source)
-                    shutil.copyfile(origin_path, new_source + "~")
-                    shutil.move(new_source + "~", new_source)
-                    self.logger.debug("Done copying project")
-                    self.path = new_source
-                    self.path_changed.emit(self.path)
+                    self.logger.debug("Copying and testing project '%s' -> '%s'", origin_path, new_source)
+                    badfile = copy_and_verify(origin_path, new_source + "~", foreground, progress)
+                    verified = True
+                    if badfile is None:
+                        shutil.move(new_source + "~", new_source)
+                        self.logger.debug("Done copying project")
+                        self.path = new_source
+                        self.path_changed.emit(self.path)
+                except BadZipFile as e:
+                    self.logger.exception("zip read exception: %s", str(e))
+                    raise ProjectErrorCantRead from e
                 except Exception as e:
                     self.logger.exception("copyfile exception: %s", str(e))
                     self.logger.warning("Can't copy the project, printing directly from USB.")
                     self.warnings.add(PrintingDirectlyFromMedia())
-        try:
-            self.logger.debug("Testing project file integrity")
-            zf = ZipFile(self.path, "r")
-            badfile = zf.testzip()
-            zf.close()
-            self.logger.debug("Done testing integrity")
-        except Exception as e:
-            self.logger.exception("zip read exception: %s", str(e))
-            raise ProjectErrorCantRead from e
+                finally:
+                    if os.path.exists(new_source + "~"):
+                        os.remove(new_source + "~")
+        if not verified:
+            try:
+                self.logger.debug("Testing project file integrity")
+                badfile = copy_and_verify(self.path, verify=foreground, progress=progress)
+                self.logger.debug("Done testing integrity")
+            except Exception as e:
+                self.logger.exception("zip read exception: %s", str(e))
+                raise ProjectErrorCantRead from e
         if badfile is not None:
             self.logger.error("Corrupted file: %s", badfile)
             raise ProjectErrorCorrupted
+        if background and len(self.layers) > defines.project_verify_foreground_layers:
+            self._verifier = Thread(target=self._verify_layers, args=(self.path, layer_indices), daemon=True)
+            self._verifier.start()
         # TODO verify layers[]['image'] in zip files
 
+    def _verify_layers(self, path: str, layer_indices: Dict[str, int]) -> None:
+        self.logger.debug("Testing integrity of layers in the background")
+        try:
+            badfile = copy_and_verify(
+                path, verify=lambda name: layer_indices.get(name, 0) >= defines.project_verify_foreground_layers)
+        except Exception:
+            self.logger.exception("Background integrity test failed")
+            return
+        if badfile is not None:
+            self.logger.error("Corrupted layer: %s", badfile)
+            self._corrupted_layer = layer_indices[badfile]
+        else:
+            self.logger.debug("Done testing integrity of layers")
+
+    def check_layer(self, index: int) -> None:
+        """
+        Fail the print if the background check found the layer or any of the following ones corrupted
+
+        Layers which are already printed do not matter anymore.
+
+        :raises ProjectErrorCorrupted: corrupted layer is yet to be printed
+        """
+        if self._corrupted_layer is not None and self._corrupted_layer >= index:
+            raise ProjectErrorCorrupted
+
     def read_image(self, filename: str):
         ''' may raise ZipFile exception '''
         self.data_open()
+        layer_cache = self._get_layer_cache()
+        if layer_cache and filename not in layer_cache:
+            layer_cache = None  # mask and other images are not cached
+        if layer_cache:
+            img = layer_cache.get(filename)
+            if img:
+                return img
         self.logger.debug("loading '%s' from '%s'", filename, self.path)
         img = Image.open(BytesIO(self._zf.read(filename)))
         if img.mode != "L":
@@ -475,8 +747,30 @@ class Project:
                                     filename, img.mode)
                 self._mode_warn = False
             img = img.convert("L")
+        if layer_cache:
+            try:
+                img.load()  # decoded here, the cache writer thread must not read the image file concurrently
+                layer_cache.put(filename, img)
+            except Exception:
+                self.logger.exception("Failed to store layer in cache")
+                layer_cache.drop()
         return img
 
+    def _get_layer_cache(self) -> Optional[LayerCache]:
+        """
+        Layer cache is used only for projects printed from the internal storage (previous prints)
+        """
+        if self._layer_cache or self._layer_cache_failed:
+            return self._layer_cache
+        if not defines.layer_cache_enabled or not str(self.path).startswith(defines.previousPrints):
+            return None
+        try:
+            self._layer_cache = LayerCache(self.path, self._content_key(), [layer.image for layer in self.layers])
+        except Exception:
+            self.logger.exception("Failed to open layer cache")
+            self._layer_cache_failed = True
+        return self._layer_cache
+
     def data_open(self):
         ''' may raise ZipFile exception '''
         if not self._zf:
@@ -485,15 +779,23 @@ class Project:
     def data_close(self):
         if self._zf:
             self._zf.close()
+        if self._layer_cache:
+            self._layer_cache.close()
+            self._layer_cache = None
 
     @functools.lru_cache(maxsize=2)
     def count_remain_time(self, layers_done: int = 0, slow_layers_done: int = 0) -> int:
-        time_remain_ms = sum(sum(x.times_ms) for x in self.layers[layers_done:])
-        total_layers = len(self.layers)
+        total_layers = len(self._layer_images)
+        if self._layers is None:
+            # Do not build the layer table for the estimate on project selection
+            time_remain_ms = int(self._layers_times_ms()[layers_done:].sum())
+        else:
+            time_remain_ms = self._layers.remain_time_ms(layers_done)
         # TODO count forced slow layers at the beginning and forced slow layers after slow layer
-        slow_layers = self._layers_slow - slow_layers_done
-        if slow_layers < 0:
-            slow_layers = 0
+        if self._layers is not None and self._layers.analyzed:
+            slow_layers = self._layers.remain_slow_layers(layers_done)
+        else:
+            slow_layers = max(0, self._layers_slow - slow_layers_done)
         fast_layers = total_layers - layers_done - slow_layers
 
         # Fast and slow tilt times
@@ -520,6 +822,15 @@ class Project:
         self.logger.debug("time_remain_ms: %f", time_remain_ms)
         return int(time_remain_ms)
 
+    def count_remain_resin_nl(self, layers_done: int = 0) -> int:
+        """
+        Resin consumed by the layers not printed yet
+        """
+        if self._layers is not None and self._layers.analyzed:
+            return self._layers.remain_resin_nl(layers_done)
+        total_layers = len(self._layer_images)
+        return self.used_material_nl * max(0, total_layers - layers_done) // max(1, total_layers)
+
     def set_timings_reference(self, project: Project):
         """
         Set times from existing project without range checks
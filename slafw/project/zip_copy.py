@@ -0,0 +1,126 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import struct
+import zlib
+from contextlib import nullcontext
+from typing import Optional, Callable, BinaryIO
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED, BadZipFile
+
+CHUNK_SIZE = 1024 * 1024
+LOCAL_HEADER_SIZE = 30
+
+
+class _Pump:
+    """
+    Sequential reader of the source file which copies everything it reads to the destination
+    """
+
+    def __init__(self, source: BinaryIO, destination: Optional[BinaryIO], total: int,
+                 progress: Optional[Callable[[float], None]]):
+        self._source = source
+        self._destination = destination
+        self._total = total
+        self._progress = progress
+        self.position = 0
+        self._reported = 0.0
+
+    def read(self, size: int) -> bytes:
+        data = self._source.read(size)
+        if len(data) != size:
+            raise BadZipFile("Unexpected end of file")
+        if self._destination:
+            self._destination.write(data)
+        self.position += size
+        if self._progress and self._total:
+            fraction = self.position / self._total
+            # report by whole percents, headers of small members would flood the receiver otherwise
+            if fraction - self._reported >= 0.01 or fraction == 1:
+                self._reported = fraction
+                self._progress(fraction)
+        return data
+
+    def skip_to(self, position: int) -> None:
+        while self.position < position:
+            self.read(min(CHUNK_SIZE, position - self.position))
+        if self.position != position:
+            raise BadZipFile("Overlapping members")
+
+    def member(self, info: ZipInfo, verify: bool) -> bool:
+        """
+        Pass member data, optionally inflating it to check its CRC
+
+        :return: False if the member is corrupted
+        """
+        decompressor = zlib.decompressobj(-15) if verify and info.compress_type == ZIP_DEFLATED else None
+        crc = 0
+        remaining = info.compress_size
+        while remaining:
+            data = self.read(min(CHUNK_SIZE, remaining))
+            remaining -= len(data)
+            if not verify:
+                continue
+            try:
+                if decompressor:
+                    data = decompressor.decompress(data)
+            except zlib.error:
+                return False
+            crc = zlib.crc32(data, crc)
+        if not verify:
+            return True
+        if decompressor:
+            crc = zlib.crc32(decompressor.flush(), crc)
+            if not decompressor.eof:
+                return False
+        return crc == info.CRC
+
+
+def copy_and_verify(source: str, destination: Optional[str] = None,
+                    verify: Optional[Callable[[str], bool]] = None,
+                    progress: Optional[Callable[[float], None]] = None) -> Optional[str]:
+    """
+    Copy zip file and check CRCs of its members in a single sequential pass over the source
+
+    Members are inflated chunk by chunk as they are copied, so the archive is never read twice. Members compressed
+    by other methods than stored/deflated are checked by zipfile afterwards.
+
+    :param source: zip file to read
+    :param destination: where to write the copy, None to only verify
+    :param verify: predicate selecting members to check, all members by default
+    :param progress: called with the fraction (0-1) of the source processed
+    :raises BadZipFile: source is not a readable zip file
+    :raises OSError: source cannot be read or destination written
+    :return: name of the first corrupted member or None if all checked members are fine
+    """
+    with ZipFile(source, "r") as zf:
+        infos = sorted(zf.infolist(), key=lambda info: info.header_offset)
+    total = os.path.getsize(source)
+    others = []
+    with open(source, "rb") as src, open(destination, "wb") if destination else nullcontext() as dst:
+        pump = _Pump(src, dst, total, progress)
+        for info in infos:
+            checked = verify is None or verify(info.filename)
+            # gap before the member (data descriptor of the previous one, if any) and its local header
+            pump.skip_to(info.header_offset)
+            header = pump.read(LOCAL_HEADER_SIZE)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            pump.read(name_length + extra_length)
+            if checked and info.compress_type not in (ZIP_STORED, ZIP_DEFLATED):
+                others.append(info.filename)
+                checked = False
+            if not pump.member(info, checked):
+                return info.filename
+        # central directory
+        pump.skip_to(total)
+    if others:
+        with ZipFile(destination or source, "r") as zf:
+            for name in others:
+                try:
+                    with zf.open(name) as member:
+                        while member.read(CHUNK_SIZE):
+                            pass
+                except BadZipFile:
+                    return name
+    return None
@@ -11,11 +11,19 @@ else
         exit 1
 fi;
 
-echo "${LOG_PATH}"
+# "-" writes the log to the standard output
+if [ "${LOG_PATH}" != "-" ]; then
+        echo "${LOG_PATH}"
+        exec > "${LOG_PATH}"
+fi;
+
 (
         for i in $(journalctl --list-boots | awk '{print $1}'); do
                 echo "########## REBOOT: ${i} ##########";
                 journalctl --output=short-precise --no-pager --boot "${i}";
         done;
-) > "${LOG_PATH}"
-sync "${LOG_PATH}"
+)
+
+if [ "${LOG_PATH}" != "-" ]; then
+        sync "${LOG_PATH}"
+fi;
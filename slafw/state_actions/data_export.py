@@ -6,20 +6,26 @@ import asyncio
 import errno
 import json
 import logging
+import os
 import re
 import shutil
+import tarfile
 import tempfile
 from abc import ABC, abstractmethod
 from asyncio import CancelledError
-from asyncio.subprocess import Process
-from io import BufferedReader
+from asyncio.subprocess import Process, PIPE
+from contextlib import suppress
+from io import BytesIO
 from pathlib import Path
 from threading import Thread
-from typing import Optional, Callable
+from time import time, monotonic
+from uuid import uuid4
+from typing import Optional, Callable, AsyncIterator, List, Tuple, BinaryIO, Dict, Any, Union
 
 import aiohttp
 from PySignal import Signal
 from aiohttp.client_exceptions import ClientConnectorError
+from aiohttp.payload import AsyncIterablePayload, Payload
 
 from slafw.errors.errors import NotConnected, ConnectionFailed, NotEnoughInternalSpace, NoExternalStorage
 from slafw.functions.files import get_save_path, usb_remount
@@ -27,8 +33,167 @@ from slafw.hardware.base.hardware import BaseHardware
 from slafw.states.data_export import ExportState, StoreType
 
 
+class ExportData(ABC):
+    """
+    Exported data read in chunks by the store method
+
+    :param name: file name the data are stored as
+    """
+
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, name: str):
+        self.name = name
+        self.progress: float = 0  # part of the data read so far
+
+    @property
+    def size(self) -> Optional[int]:
+        """
+        Size of the data in bytes, None if it is not known before the data are read
+        """
+        return None
+
+    @abstractmethod
+    def chunks(self) -> AsyncIterator[bytes]:
+        ...
+
+
+class FileData(ExportData):
+    """
+    Data of an exported file
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path.name)
+        self._path = path
+
+    @property
+    def size(self) -> Optional[int]:
+        return self._path.stat().st_size
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        total_size = self._path.stat().st_size
+        with self._path.open("rb") as file:
+            while True:
+                data = file.read(self.BLOCK_SIZE)
+                if not data:
+                    break
+                self.progress = file.tell() / total_size
+                yield data
+                await asyncio.sleep(0)
+
+
+class TarXzStream(ExportData):
+    """
+    Tar archive compressed while it is read, nothing is staged on the disk
+
+    A worker thread writes the tar stream to the stdin of xz, the compressed archive is read from its stdout.
+    Progress is estimated from the size of the added members.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._members: List[Tuple[Callable[[tarfile.TarFile], None], int]] = []
+        self._total_size = 0
+        self._written = 0
+
+    def add_path(self, path: Path, arcname: str) -> None:
+        """
+        Add file or directory tree
+        """
+        if path.is_dir():
+            size = sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+        else:
+            size = path.stat().st_size
+        self._add(lambda tar: tar.add(path, arcname), size)
+
+    def add_file(self, file: BinaryIO, size: int, arcname: str) -> None:
+        """
+        Add content of the file object, the file is closed once added to the archive
+        """
+
+        def add(tar: tarfile.TarFile):
+            with file:
+                info = tarfile.TarInfo(arcname)
+                info.size = size
+                info.mtime = int(time())
+                file.seek(0)
+                tar.addfile(info, file)
+
+        self._add(add, size)
+
+    def add_bytes(self, data: bytes, arcname: str) -> None:
+        self.add_file(BytesIO(data), len(data), arcname)
+
+    def _add(self, add: Callable[[tarfile.TarFile], None], size: int) -> None:
+        self._members.append((add, size))
+        self._total_size += size
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        read_fd, write_fd = os.pipe()
+        try:
+            proc = await asyncio.create_subprocess_exec("xz", "-T0", "-0", stdin=read_fd, stdout=PIPE)
+        except Exception:
+            os.close(write_fd)
+            raise
+        finally:
+            os.close(read_fd)
+        writer = asyncio.get_running_loop().run_in_executor(None, self._write_tar, write_fd)
+        try:
+            while True:
+                data = await proc.stdout.read(self.BLOCK_SIZE)
+                if not data:
+                    break
+                yield data
+            await writer
+            if await proc.wait() != 0:
+                raise RuntimeError(f"Archive compression failed with code {proc.returncode}")
+        finally:
+            if proc.returncode is None:
+                # Canceled, the writer fails on the broken pipe
+                proc.kill()
+                await proc.wait()
+            with suppress(Exception):
+                await writer
+
+    def _write_tar(self, fd: int) -> None:
+        with os.fdopen(fd, "wb", buffering=self.BLOCK_SIZE) as pipe:
+            with tarfile.open(fileobj=_CountingWriter(pipe, self._count), mode="w|", bufsize=self.BLOCK_SIZE,
+                              copybufsize=self.BLOCK_SIZE) as tar:
+                for add, _ in self._members:
+                    add(tar)
+
+    def _count(self, size: int) -> None:
+        self._written += size
+        self.progress = min(1.0, self._written / self._total_size) if self._total_size else 0
+
+
+class _CountingWriter:
+    def __init__(self, file: BinaryIO, callback: Callable[[int], None]):
+        self._file = file
+        self._callback = callback
+
+    def write(self, data: bytes) -> int:
+        written = self._file.write(data)
+        self._callback(len(data))
+        return written
+
+
+class _SizedChunksPayload(AsyncIterablePayload):
+    """
+    Chunks of data of a known size, posted with Content-Length instead of the chunked transfer encoding
+    """
+
+    def __init__(self, value: AsyncIterator[bytes], size: int, *args, **kwargs):
+        super().__init__(value, *args, **kwargs)
+        self._size = size
+
+
 class DataExport(ABC, Thread):
     # pylint: disable=too-many-instance-attributes
+    PROGRESS_STEP = 0.01  # store progress granularity
+    PROGRESS_INTERVAL_S = 0.5  # minimal store progress update period
+
     def __init__(self, hw: BaseHardware, last_token_path: Path, do_export):
         super().__init__()
         self.logger = logging.getLogger(__name__)
@@ -37,6 +202,7 @@ class DataExport(ABC, Thread):
         self._export_progress: float = 0
         self.export_progress_changed = Signal()
         self._store_progress: float = 0
+        self._store_progress_time = 0.0
         self.store_progress_changed = Signal()
         self._task: Optional[asyncio.Task] = None
         self._exception: Optional[Exception] = None
@@ -85,6 +251,19 @@ class DataExport(ABC, Thread):
             self._store_progress = value
             self.store_progress_changed.emit(value)
 
+    def _update_store_progress(self, value: float) -> None:
+        """
+        Set store progress in PROGRESS_STEP steps at most once per PROGRESS_INTERVAL_S, every change is emitted over
+        D-Bus
+        """
+        now = monotonic()
+        if value - self._store_progress < self.PROGRESS_STEP:
+            return
+        if now - self._store_progress_time < self.PROGRESS_INTERVAL_S:
+            return
+        self._store_progress_time = now
+        self.store_progress = value
+
     @property
     def data_upload_identifier(self) -> str:
         return self._uploaded_data_identifier
@@ -166,7 +345,9 @@ class DataExport(ABC, Thread):
             self.logger.debug("Exporting data data to a temporary file")
             self.export_progress = 0
             try:
-                data_tar_file = await self.do_export(self, tmpdir_path)
+                data = await self.do_export(self, tmpdir_path)
+                if isinstance(data, Path):
+                    data = FileData(data)
                 self.export_progress = 1
             except shutil.Error as exception:
                 # shutil.Error concatenates the OSError errors like [(src, dst, str(why),]
@@ -189,113 +370,187 @@ class DataExport(ABC, Thread):
             self.logger.debug("Running store data method")
             self.state = ExportState.SAVING
             self.store_progress = 0
-            await self.store_data(data_tar_file)
+            await self.store_data(data)
             self.store_progress = 1
 
     @abstractmethod
-    async def store_data(self, src: Path):
+    async def store_data(self, data: ExportData):
         ...
 
 
 class UsbExport(DataExport):
-    async def store_data(self, src: Path):
+    async def store_data(self, data: ExportData):
         self.state = ExportState.SAVING
         save_path = get_save_path()
         if save_path is None or not save_path.parent.exists():
             raise NoExternalStorage()
 
-        self.logger.debug("Copying temporary data file to usb")
-        await self._copy_with_progress(src, save_path / src.name)
-
-    async def _copy_with_progress(self, src: Path, dst: Path):
+        self.logger.debug("Writing data file to usb")
+        dst = save_path / data.name
         usb_remount(str(dst))
-
-        with src.open("rb") as src_file, dst.open("wb") as dst_file:
-            block_size = 4096
-            total_size = src.stat().st_size
-            while True:
-                data = src_file.read(block_size)
-                if not data:
-                    break
-                dst_file.write(data)
-                self.store_progress = dst_file.tell() / total_size
-                await asyncio.sleep(0)
+        try:
+            with dst.open("wb", buffering=ExportData.BLOCK_SIZE) as dst_file:
+                async for chunk in data.chunks():
+                    dst_file.write(chunk)
+                    self._update_store_progress(data.progress)
+        except BaseException:
+            # Do not leave a truncated file on the USB drive
+            dst.unlink(missing_ok=True)
+            raise
 
     @property
     def type(self) -> StoreType:
         return StoreType.USB
 
 
-class FileReader(BufferedReader):
+class ServerUpload(DataExport):
     """
-    This mimics file object and wraps read access while providing callback for current file position
-
-    CHUNK_SIZE constant is used for file upload granularity control
+    Upload the data to the server
+
+    The data are posted as a multipart form in a single request by default, sent in chunks sized to take about
+    CHUNK_TARGET_S each. The request has Content-Length if the size of the data is known (exported file), only
+    streamed data (log archive) are sent with the chunked transfer encoding. With part_size set the data are posted
+    in parts of that size, each one in its own request retried on failure, so a broken connection does not restart
+    the whole upload. The server has to support it: parts come with upload_id, offset and final fields, the server
+    answers an accepted part with the JSON {"offset": <bytes received so far>} and the final part with the usual
+    {"id": ..., "url": ...}.
     """
 
-    CHUNK_SIZE = 8192
-
-    def __init__(self, file, callback: Callable[[int, int], None] = None):
-        self._total_size = Path(file.name).stat().st_size
-        super().__init__(file, self._total_size)
-        self._file = file
-        self._callback = callback
-
-    def read(self, size=-1):
-        data = self._file.read(min(self.CHUNK_SIZE, size))
-        if self._callback:
-            self._callback(self._file.tell(), self._total_size)
-        return data
-
-
-class ServerUpload(DataExport):
     DATA_UPLOAD_TOKEN = "84U83mUQ"
+    CHUNK_MIN = 64 * 1024
+    CHUNK_MAX = 4 * 1024 * 1024
+    CHUNK_TARGET_S = 0.25
+    PART_RETRIES = 3
+    PART_RETRY_DELAY_S = 1.0  # doubled with every retry
 
     # pylint: disable=too-many-arguments
-    def __init__(self, hw: BaseHardware, last_token_path: Path, do_export, url: str, file_keyword: str):
+    def __init__(
+        self,
+        hw: BaseHardware,
+        last_token_path: Path,
+        do_export,
+        url: str,
+        file_keyword: str,
+        part_size: Optional[int] = None,
+    ):
         super().__init__(hw, last_token_path, do_export)
         self._url = url
         self._file_keyword = file_keyword
+        self._part_size = part_size
 
-    async def store_data(self, src: Path):
+    async def store_data(self, data: ExportData):
 
-        self.logger.info("Uploading temporary data file to the server")
+        self.logger.info("Uploading data file to the server")
 
         async with aiohttp.ClientSession(headers={"user-agent": "OriginalPrusa3DPrinter"}) as session:
             self.logger.debug("Opening aiohttp client session")
-
-            with src.open("rb") as file:
-                data = aiohttp.FormData()
-                data.add_field(
-                    self._file_keyword,
-                    FileReader(file, callback=self._callback),
-                    filename=src.name,
-                    content_type="application/x-xz",
-                )
-                data.add_field("token", self.DATA_UPLOAD_TOKEN)
-                data.add_field("serial", self.hw.cpuSerialNo)
-
-                try:
-                    async with session.post(url=self._url, data=data) as response:
-                        if response.status == 200:
-                            self.logger.debug("aiohttp post done")
-                            response_text = await response.text()
-                            self.logger.debug("Data upload response: %s", response_text)
-                            response_data = json.loads(response_text)
-                            self.data_upload_identifier = response_data["id"] if "id" in response_data else response_data["url"]
-                            self.data_upload_url = response_data["url"]
-                        else:
-                            strerror = f"Cannot connect to host {self._url} [status code: {response.status}]"
-                            self.logger.error(strerror)
-                            raise ConnectionFailed(strerror)
-                except ClientConnectorError as exception:
-                    self.logger.error(exception.strerror)
-                    raise NotConnected(exception.strerror) from exception
+            try:
+                if self._part_size:
+                    response_data = await self._upload_parts(session, data)
+                else:
+                    response_data = await self._post(session, self._upload_payload(data), data.name)
+            except ClientConnectorError as exception:
+                self.logger.error(exception.strerror)
+                raise NotConnected(exception.strerror) from exception
+            self.data_upload_identifier = response_data["id"] if "id" in response_data else response_data["url"]
+            self.data_upload_url = response_data["url"]
+
+    async def _post(
+        self,
+        session: aiohttp.ClientSession,
+        payload: Union[bytes, AsyncIterator[bytes], Payload],
+        filename: str,
+        fields: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        form = aiohttp.FormData()
+        form.add_field(self._file_keyword, payload, filename=filename, content_type="application/x-xz")
+        form.add_field("token", self.DATA_UPLOAD_TOKEN)
+        form.add_field("serial", self.hw.cpuSerialNo)
+        for name, value in (fields or {}).items():
+            form.add_field(name, value)
+
+        async with session.post(url=self._url, data=form) as response:
+            if response.status != 200:
+                strerror = f"Cannot connect to host {self._url} [status code: {response.status}]"
+                self.logger.error(strerror)
+                raise ConnectionFailed(strerror)
+            self.logger.debug("aiohttp post done")
+            response_text = await response.text()
+            self.logger.debug("Data upload response: %s", response_text)
+            return json.loads(response_text)
+
+    def _upload_payload(self, data: ExportData) -> Union[AsyncIterator[bytes], Payload]:
+        total_size = data.size
+        if total_size is None:
+            return self._upload_chunks(data)
+        return _SizedChunksPayload(self._upload_chunks(data, total_size), total_size, content_type="application/x-xz")
+
+    async def _upload_chunks(self, data: ExportData, total_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        size = self.CHUNK_MIN
+        sent = 0
+        buffer = bytearray()
+        async for chunk in data.chunks():
+            buffer += chunk
+            while len(buffer) >= size:
+                start = monotonic()
+                yield bytes(buffer[:size])  # resumed once the chunk is sent
+                sent += size
+                del buffer[:size]
+                size = self._chunk_size(size, monotonic() - start)
+                self._update_store_progress(data.progress)
+        if buffer:
+            yield bytes(buffer)
+            sent += len(buffer)
+        if total_size is not None and sent != total_size:
+            # The request Content-Length no longer matches, do not let the server store a broken file
+            raise ConnectionFailed(f"{data.name} changed during the upload, {sent} bytes sent of {total_size}")
+
+    def _chunk_size(self, size: int, elapsed_s: float) -> int:
+        rate = size / max(elapsed_s, 0.001)
+        return int(min(self.CHUNK_MAX, max(self.CHUNK_MIN, rate * self.CHUNK_TARGET_S)))
+
+    async def _upload_parts(self, session: aiohttp.ClientSession, data: ExportData) -> Dict[str, Any]:
+        upload_id = uuid4().hex
+        offset = 0
+        part = bytearray()
+        async for chunk in data.chunks():
+            part += chunk
+            # keep data for the final part
+            while len(part) > self._part_size:
+                await self._post_part(session, data.name, upload_id, offset, bytes(part[: self._part_size]), False)
+                offset += self._part_size
+                del part[: self._part_size]
+                self._update_store_progress(data.progress)
+        return await self._post_part(session, data.name, upload_id, offset, bytes(part), True)
+
+    async def _post_part(
+        self,
+        session: aiohttp.ClientSession,
+        filename: str,
+        upload_id: str,
+        offset: int,
+        part: bytes,
+        final: bool,
+    ) -> Dict[str, Any]:
+        fields = {"upload_id": upload_id, "offset": str(offset), "final": str(int(final))}
+        delay_s = self.PART_RETRY_DELAY_S
+        for retry in range(self.PART_RETRIES + 1):
+            try:
+                response_data = await self._post(session, part, filename, fields)
+                break
+            except (ConnectionFailed, aiohttp.ClientError, asyncio.TimeoutError) as exception:
+                if retry == self.PART_RETRIES:
+                    raise
+                self.logger.warning("Upload of part at %d failed, retrying in %.1f s: %s", offset, delay_s, exception)
+                await asyncio.sleep(delay_s)
+                delay_s *= 2
+        self.logger.debug("Uploaded part at %d, %d bytes", offset, len(part))
+        if not final and response_data.get("offset") != offset + len(part):
+            strerror = f"Upload part at {offset} not accepted by {self._url}: {response_data}"
+            self.logger.error(strerror)
+            raise ConnectionFailed(strerror)
+        return response_data
 
     @property
     def type(self) -> StoreType:
         return StoreType.UPLOAD
-
-    def _callback(self, position: int, total_size: int):
-        self.logger.debug("Current upload position: %s / %s bytes", position, total_size)
-        self.store_progress = position / total_size
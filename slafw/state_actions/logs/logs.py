@@ -3,50 +3,75 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import asyncio
-import shutil
+import json
 from asyncio.subprocess import Process
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
 
 from slafw import defines
 from slafw.errors.errors import DisplayUsageError
 from slafw.functions.generate import display_usage_heatmap
 from slafw.functions.files import get_export_file_name
 from slafw.hardware.base.hardware import BaseHardware
-from slafw.state_actions.data_export import DataExport, UsbExport, ServerUpload
+from slafw.state_actions.data_export import DataExport, UsbExport, ServerUpload, TarXzStream
 from slafw.state_actions.logs.summary import create_summary
+from slafw.utils.span_recorder import print_trace
 
 
-def export_configs(temp_dir: Path):
+def export_configs(archive: TarXzStream):
     if defines.wizardHistoryPath.is_dir():
-        shutil.copytree(defines.wizardHistoryPath, temp_dir / defines.wizardHistoryPath.name)
+        archive.add_path(defines.wizardHistoryPath, f"logs/{defines.wizardHistoryPath.name}")
     if defines.wizardHistoryPathFactory.is_dir():
-        shutil.copytree(defines.wizardHistoryPathFactory, temp_dir / defines.wizardHistoryPathFactory.name)
+        archive.add_path(defines.wizardHistoryPathFactory, f"logs/{defines.wizardHistoryPathFactory.name}")
     if defines.configDir.exists():
-        shutil.copytree(defines.configDir, temp_dir / defines.configDir.name)
+        archive.add_path(defines.configDir, f"logs/{defines.configDir.name}")
     if defines.factoryMountPoint.exists():
-        shutil.copytree(defines.factoryMountPoint, temp_dir / defines.factoryMountPoint.name)
-        shutil.copyfile(defines.expoPanelLogPath, temp_dir / defines.expoPanelLogFileName)
+        archive.add_path(defines.factoryMountPoint, f"logs/{defines.factoryMountPoint.name}")
+        archive.add_path(defines.expoPanelLogPath, f"logs/{defines.expoPanelLogFileName}")
 
-async def run_log_export_process(data_file: Path) -> Process:
+async def run_log_export_process() -> Process:
     return await asyncio.create_subprocess_shell(
-        str(defines.script_dir / f"export_logs.sh '{data_file}'"),
+        str(defines.script_dir / "export_logs.sh -"),
+        stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE
     )
 
-async def do_export(parent: DataExport, tmpdir_path: Path) -> Path:
-    logs_dir = tmpdir_path / "logs"
-    logs_dir.mkdir()
-    log_file = logs_dir / "log.txt"
-    summary_file = logs_dir / "summary.json"
-    display_usage_file = logs_dir / "display_usage.png"
+async def export_journal(parent: DataExport, archive: TarXzStream, tmpdir_path: Path):
+    # pylint: disable = consider-using-with
+    log = SpooledTemporaryFile(max_size=defines.log_export_spool_size, dir=tmpdir_path)
+    parent.proc = await run_log_export_process()
+    stderr = asyncio.create_task(parent.proc.stderr.read())
+    while True:
+        data = await parent.proc.stdout.read(TarXzStream.BLOCK_SIZE)
+        if not data:
+            break
+        log.write(data)
+    if await parent.proc.wait() != 0:
+        error = "Log export jounalctl failed to create"
+        if await stderr:
+            error += f" - {stderr.result().decode()}"
+        parent.logger.error(error)
+    archive.add_file(log, log.tell(), "logs/log.txt")
+
+async def do_export(parent: DataExport, tmpdir_path: Path) -> TarXzStream:
+    archive = TarXzStream(f"logs.{get_export_file_name(parent.hw)}.tar.xz")
+    summary_file = tmpdir_path / "summary.json"
+    display_usage_file = tmpdir_path / "display_usage.png"
 
     parent.logger.info("Creating log export summary")
     summary = create_summary(parent.hw, parent.logger, summary_path = summary_file)
     if summary:
         parent.logger.debug("Log export summary created")
+        archive.add_path(summary_file, "logs/summary.json")
     else:
         parent.logger.error("Log export summary failed to create")
 
+    parent.logger.info("Exporting print trace")
+    try:
+        archive.add_bytes(json.dumps(print_trace.chrome_trace()).encode(), "logs/print_trace.json")
+    except Exception:
+        parent.logger.exception("Print trace export exception")
+
     parent.logger.info("Creating display usage heatmap")
     try:
         display_usage_heatmap(
@@ -54,45 +79,24 @@ async def do_export(parent: DataExport, tmpdir_path: Path) -> Path:
                 defines.displayUsageData,
                 defines.displayUsagePalette,
                 display_usage_file)
+        archive.add_path(display_usage_file, "logs/display_usage.png")
     except DisplayUsageError as e:
         parent.logger.warning("Display usage heatmap not exported: %s", e.reason)
     except Exception:
         parent.logger.exception("Create display usage exception")
 
-    parent.logger.debug("Running log export script")
-    parent.proc = await run_log_export_process(log_file)
-
-    parent.logger.debug("Waiting for log export to finish")
-    _, stderr = await parent.proc.communicate()
-    if parent.proc.returncode != 0:
-        error = "Log export jounalctl failed to create"
-        if stderr:
-            error += f" - {stderr.decode()}"
-        parent.logger.error(error)
+    parent.logger.debug("Exporting journal")
+    await export_journal(parent, archive, tmpdir_path)
+    parent.proc = None
 
-    parent.logger.debug("Waiting for configs export to finish")
+    parent.logger.debug("Adding configs to the export")
     try:
-        export_configs(logs_dir)
+        export_configs(archive)
     except Exception:
         parent.logger.exception("Config export exception")
 
-    log_tar_file = tmpdir_path / f"logs.{get_export_file_name(parent.hw)}.tar.xz"
-    parent.proc = await asyncio.create_subprocess_shell(
-        f"tar -cf - -C '{tmpdir_path}' '{logs_dir.name}' | xz -T0 -0 > '{log_tar_file}'",
-        stderr=asyncio.subprocess.PIPE
-    )
-    _, stderr = await parent.proc.communicate()
-    if parent.proc.returncode != 0:
-        error = "Log compression failed"
-        if stderr:
-            error += f" - {stderr.decode()}"
-        parent.logger.error(error)
-
-    parent.proc = None
-
-    if not log_tar_file.is_file():
-        raise RuntimeError("Output file not exist")
-    return log_tar_file
+    # The archive is compressed and written by the store method
+    return archive
 
 
 class UsbExportLogs(UsbExport):
@@ -102,4 +106,4 @@ class UsbExportLogs(UsbExport):
 
 class ServerUploadLogs(ServerUpload):
     def __init__(self, hw: BaseHardware, url: str):
-        super().__init__(hw, defines.last_log_token, do_export, url, "logfile")
+        super().__init__(hw, defines.last_log_token, do_export, url, "logfile", defines.log_upload_part_size)
@@ -108,6 +108,7 @@ class SlafwTestCase(TestCase):
             patch("slafw.hardware.hardware_sl1.Booster", slafw.tests.mocks.sl1s_uvled_booster.BoosterMock),
             patch("slafw.defines.ramdiskPath", str(self.TEMP_DIR)),
             patch("slafw.defines.previousPrints", str(self.TEMP_DIR)),
+            patch("slafw.defines.projectIndexFile", self.TEMP_DIR / "project_index.json"),
             patch("slafw.defines.emmc_serial_path", self.SAMPLES_DIR / "cid"),
             patch("slafw.defines.wizardHistoryPath", wizard_history_path),
             patch("slafw.defines.wizardHistoryPathFactory", self.TEMP_DIR / "wizard_history" / "factory_data"),
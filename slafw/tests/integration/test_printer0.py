@@ -13,6 +13,7 @@ from unittest.mock import patch, Mock
 
 import pydbus
 
+from slafw import defines
 from slafw.api.exposure0 import Exposure0
 from slafw.api.printer0 import Printer0State, Printer0
 from slafw.errors.errors import UnknownPrinterModel
@@ -145,13 +146,26 @@ class TestIntegrationPrinter0(SlaFwIntegrationTestCaseBase):
 
         # self.printer0.print()
 
+    def _refresh_project_index(self):
+        # listing is served from the index refreshed in the background
+        self.printer.project_index.refresh([Path(defines.internalProjectPath), Path(defines.mediaRootPath)])
+
     def test_project_list_raw(self):
+        self._refresh_project_index()
         project_list = self.printer0.list_projects_raw()
         self.assertTrue(project_list)
         for project in project_list:
             self.assertTrue(Path(project).is_file())
             self.assertRegex(Path(project).name, r".*\." + printer_model_regex())
 
+    def test_project_list(self):
+        self._refresh_project_index()
+        projects = self.printer0.list_projects()
+        self.assertEqual(sorted(projects), self.printer0.list_projects_raw())
+        numbers = projects[str(self.SAMPLES_DIR / ("numbers" + self.printer.model.extension))]
+        self.assertTrue(numbers["valid"])
+        self.assertEqual(2, numbers["layers"])
+
     def test_print_start(self):
         # Fake calibration
         self.printer.hw.config.calibrated = True
@@ -4,17 +4,22 @@
 # Copyright (C) 2020 Prusa Research a.s. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from contextlib import contextmanager
 from datetime import datetime
 from queue import Queue
+from threading import Timer
 from time import sleep
 
 from slafw import test_runtime
 
 
 class Serial:
-    def __init__(self):
+    def __init__(self, response_delay_s: float = 0):
         self._data = Queue()
+        self._response_delay_s = response_delay_s
         self._error_cnt = 0
+        self._users = 0
+        self.concurrent_access = False  # port used by more threads at once
         self._connect()
 
     def _connect(self):
@@ -30,7 +35,21 @@ class Serial:
     def close(self):
         pass
 
+    @contextmanager
+    def _use(self):
+        self._users += 1
+        if self._users > 1:
+            self.concurrent_access = True
+        try:
+            yield
+        finally:
+            self._users -= 1
+
     def write(self, data):
+        with self._use():
+            self._write(data)
+
+    def _write(self, data):
         if data == b">all\n":
             self._data.put(data)
             if (
@@ -42,15 +61,19 @@ class Serial:
             else:
                 intensity = 0
             response = "<" + ",".join([str(intensity) for _ in range(60)]) + ",347"
-            self._data.put(response.encode())
+            if self._response_delay_s:
+                Timer(self._response_delay_s, self._data.put, [response.encode()]).start()
+            else:
+                self._data.put(response.encode())
 
     def read(self):
         raise NotImplementedError()
 
     def readline(self):
-        self._simulate_error()
-        sleep(0.1)
-        return self._data.get()
+        with self._use():
+            self._simulate_error()
+            sleep(0.1)
+            return self._data.get()
 
     def _simulate_error(self):
         if not test_runtime.uv_error_each:
@@ -62,6 +85,11 @@ class Serial:
             self._data.put("<done".encode())
             raise IOError("Injected error")
 
+    def reset_input_buffer(self):
+        with self._use():
+            while not self._data.empty():
+                self._data.get()
+
     def inWaiting(self):
         return self._data.qsize()
 
@@ -19,6 +19,8 @@ class MockExposureScreen(ExposureScreen):
         self.start = Mock()
         self.exit = Mock()
         self.show = Mock()
+        self.set_shared_buffers = Mock()
+        self.show_shared = Mock()
         self.blank_screen = Mock()
         self.create_areas = Mock()
         self.blank_area = Mock()
@@ -3,9 +3,13 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
-from http.server import SimpleHTTPRequestHandler, HTTPServer
+import json
+from email.parser import BytesParser
+from email.policy import default
+from http.server import SimpleHTTPRequestHandler, HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
 from threading import Thread
+from typing import Dict, Tuple, Optional, Set, List
 
 from slafw.tests import samples
 
@@ -26,3 +30,79 @@ class MockServer(HTTPServer, Thread):
     def stop(self):
         self.shutdown()
         self.join()
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    """
+    Data upload stand-in, accepts uploads in a single request or in parts (see ServerUpload)
+    """
+
+    def do_POST(self):  # pylint: disable = invalid-name
+        server: MockUploadServer = self.server  # type: ignore[assignment]
+        form = self._parse_form(self._read_body())
+        server.requests += 1
+        server.chunked.append(self.headers.get("Transfer-Encoding") == "chunked")
+        if server.requests in server.fail_requests:
+            self._respond(503, {})
+            return
+
+        filename, data = form[server.file_keyword]
+        if "upload_id" in form:
+            upload = server.parts.setdefault(form["upload_id"][1].decode(), bytearray())
+            if int(form["offset"][1]) == len(upload):
+                upload += data
+            if form["final"][1] != b"1":
+                self._respond(200, {"offset": len(upload)})
+                return
+            data = bytes(upload)
+        server.files[filename] = data
+        self._respond(200, {"id": str(len(server.files)), "url": f"{server.url}/{filename}"})
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding") != "chunked":
+            return self.rfile.read(int(self.headers["Content-Length"]))
+        body = bytearray()
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if not size:
+                self.rfile.readline()
+                return bytes(body)
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    def _parse_form(self, body: bytes) -> Dict[str, Tuple[Optional[str], bytes]]:
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        message = BytesParser(policy=default).parsebytes(header + body)
+        return {
+            part.get_param("name", header="content-disposition"): (part.get_filename(), part.get_payload(decode=True))
+            for part in message.iter_parts()
+        }
+
+    def _respond(self, status: int, data: Dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockUploadServer(HTTPServer, Thread):
+    def __init__(self, file_keyword: str):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), UploadHandler)
+        Thread.__init__(self)
+        self.url = f"http://127.0.0.1:{self.server_port}/upload"
+        self.file_keyword = file_keyword
+        self.files: Dict[str, bytes] = {}
+        self.parts: Dict[str, bytearray] = {}
+        self.requests = 0
+        self.chunked: List[bool] = []  # request sent with the chunked transfer encoding, per request
+        self.fail_requests: Set[int] = set()  # numbers of requests answered by 503
+
+    def run(self):
+        self.serve_forever()
+
+    def stop(self):
+        self.shutdown()
+        self.join()
+        self.server_close()
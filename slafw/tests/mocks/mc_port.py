@@ -99,10 +99,12 @@ class Serial:
             except (IndexError, UnicodeDecodeError, ValueError):
                 self.logger.exception("Failed to decode UV LED state from MC data")
 
-    def read(self):
+    def read(self, size: int = 1):  # pylint: disable=unused-argument
         """
         Read line from simulated serial port
 
+        The simulator output is line buffered, so a whole line is returned regardless of the requested size.
+
         TODO: This pretends MC communication start has no weak places. In reality the MC "usually" starts before
               the libHardware. In such case the "start" is never actually read from MC. Therefore this also throws
               "start" away. In fact is may happen that the MC is initializing in paralel with the libHardware (resets)
@@ -127,6 +129,10 @@ class Serial:
             sleep(0.001)
         raise SerialTimeoutException("Nothing to read from serial port")
 
+    @property
+    def in_waiting(self) -> int:
+        return 0
+
     def inWaiting(self):
         raise NotImplementedError()
 
@@ -2,10 +2,12 @@
 # Copyright (C) 2021 Prusa Research a.s. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import asyncio
 import random
 from datetime import datetime
-from typing import List
-from unittest.mock import Mock
+from time import sleep
+from typing import List, Optional
+from unittest.mock import Mock, AsyncMock
 
 import numpy
 
@@ -14,19 +16,34 @@ from slafw.tests.mocks.hardware import HardwareMock
 
 
 class UVMeterMock:
+    CORNERS = (0, 4, 10, 14)  # of the 3 x 5 sensor grid
+
     def __init__(self, hw: HardwareMock):
         self.check_place = Mock(return_value=None)
+        self.async_check_place = AsyncMock(return_value=None)
         self.present = Mock(return_value=True)
         self.connect = Mock()
         self._hw = hw
         self.multiplier = 1
         self.noise = 0
         self.sixty_points = False
+        # Simulated meter: corner points get edge_factor of the intensity, response is (pwm / 200) ** exponent,
+        # every reading takes read_time_s and its PWM is recorded in reads
+        self.edge_factor = 1.0
+        self.exponent = 1.0
+        self.read_time_s = 0.0
+        self.reads: List[int] = []
 
     def __call__(self, *args, **kwargs):
         return self
 
     def read_data(self):
+        if self.read_time_s:
+            sleep(self.read_time_s)
+        return self._data()
+
+    def _data(self) -> UvCalibrationData:
+        self.reads.append(self._hw.uv_led.pwm)
         data = UvCalibrationData()
         data.uvSensorType = 0
         data.uvSensorData = self.get_intensity_data()
@@ -41,13 +58,28 @@ class UVMeterMock:
         data.uvFoundPwm = -1
         return data
 
-    def get_intensity_data(self) -> List[float]:
-        # Linear response
+    async def async_read_data(self, timeout_s: Optional[float] = None):
+        # pylint: disable = unused-argument
+        if self.read_time_s:
+            await asyncio.sleep(self.read_time_s)
+        return self._data()
+
+    def intensity(self, pwm: int) -> float:
+        # Linear response by default
         # 140 intensity at 200 PWM
-        intensity = 140 * self.multiplier * self._hw.uv_led.pwm / 200
+        return 140 * self.multiplier * (pwm / 200) ** self.exponent
+
+    def edge_intensity(self, pwm: int) -> float:
+        return self.intensity(pwm) * min(1.0, self.edge_factor)
+
+    def get_intensity_data(self) -> List[float]:
+        intensity = self.intensity(self._hw.uv_led.pwm)
         print(f"UV intensity mock: pwm: {self._hw.uv_led.pwm}, intensity: {intensity}")
         random.seed(0)
-        return [intensity + random.random() * 2 * self.noise - self.noise for _ in range(15)]
+        data = [intensity + random.random() * 2 * self.noise - self.noise for _ in range(15)]
+        for corner in self.CORNERS:
+            data[corner] *= self.edge_factor
+        return data
 
     def close(self):
         pass
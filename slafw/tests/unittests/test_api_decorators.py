@@ -5,6 +5,7 @@
 import unittest
 from typing import List, Dict, Any, Tuple
 from unittest import TestCase
+from unittest.mock import Mock, patch, PropertyMock
 from gi.repository.GLib import Variant
 
 from slafw.api.decorators import (
@@ -13,6 +14,7 @@ from slafw.api.decorators import (
     auto_dbus,
     gen_method_dbus_args_spec,
     auto_dbus_signal,
+    PropertiesChangedBatcher,
 )
 
 
@@ -166,5 +168,68 @@ class TestAutoDBusSignal(TestCase):
         )
 
 
+
+class TestPropertiesChangedBatcher(TestCase):
+    class Api:
+        INTERFACE = "cz.prusa3d.test0"
+
+        def __init__(self):
+            self.PropertiesChanged = Mock()  # pylint: disable = invalid-name
+
+        @property
+        def current_layer(self) -> int:
+            return 10
+
+        @property
+        def broken(self) -> int:
+            raise ValueError("Not available")
+
+    def setUp(self) -> None:
+        patcher = patch("slafw.api.decorators.GLib")
+        self.glib = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.api = self.Api()
+
+    def test_coalesced(self):
+        batcher = PropertiesChangedBatcher(self.api, self.Api.INTERFACE, window_ms=0)
+        with patch.object(self.Api, "current_layer", new_callable=PropertyMock, return_value=10) as current_layer:
+            batcher.changed("current_layer")
+            batcher.changed("progress", 50)
+            batcher.changed("current_layer")
+            batcher.changed("progress", 60)
+            self.glib.idle_add.assert_called_once_with(batcher.flush)
+            self.api.PropertiesChanged.assert_not_called()
+            self.assertFalse(batcher.flush())
+            current_layer.assert_called_once_with()
+        self.api.PropertiesChanged.assert_called_once_with(
+            self.Api.INTERFACE, {"current_layer": 10, "progress": 60}, []
+        )
+        batcher.changed("progress", 70)
+        self.assertEqual(2, self.glib.idle_add.call_count, "Scheduled again after flush")
+
+    def test_window(self):
+        batcher = PropertiesChangedBatcher(self.api, self.Api.INTERFACE, window_ms=100)
+        batcher.changed("current_layer")
+        batcher.changed("current_layer")
+        self.glib.timeout_add.assert_called_once_with(100, batcher.flush)
+        self.glib.idle_add.assert_not_called()
+
+    def test_broken_property(self):
+        batcher = PropertiesChangedBatcher(self.api, self.Api.INTERFACE, window_ms=0)
+        batcher.changed("broken")
+        batcher.changed("current_layer")
+        with self.assertLogs("slafw.api.decorators", level="ERROR"):
+            batcher.flush()
+        self.api.PropertiesChanged.assert_called_once_with(self.Api.INTERFACE, {"current_layer": 10}, [])
+
+    def test_api_gone(self):
+        batcher = PropertiesChangedBatcher(self.api, self.Api.INTERFACE, window_ms=0)
+        batcher.changed("current_layer")
+        properties_changed = self.api.PropertiesChanged
+        self.api = None
+        self.assertFalse(batcher.flush())
+        properties_changed.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Optional
+from unittest.mock import Mock, patch
+
+from slafw.state_actions.data_export import ServerUpload, TarXzStream
+from slafw.states.data_export import ExportState
+from slafw.tests.mocks.http_server import MockUploadServer
+
+
+class TestServerUpload(unittest.TestCase):
+    DATA_SIZE = 3 * 1024 * 1024 + 1000
+
+    def setUp(self) -> None:
+        self.server = MockUploadServer("logfile")
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        temp_dir = TemporaryDirectory()  # pylint: disable = consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.token_path = Path(temp_dir.name) / "last_token"
+        self.data = os.urandom(self.DATA_SIZE)
+        self.hw = Mock()
+        self.hw.cpuSerialNo = "CZPX0819X009XC00151"
+
+    async def _do_export(self, _, tmpdir_path: Path) -> Path:
+        data_file = tmpdir_path / "logs.tar.xz"
+        data_file.write_bytes(self.data)
+        return data_file
+
+    def _upload(self, part_size: Optional[int] = None) -> ServerUpload:
+        upload = ServerUpload(self.hw, self.token_path, self._do_export, self.server.url, "logfile", part_size)
+        upload.start()
+        upload.join(timeout=60)
+        self.assertEqual(ExportState.FINISHED, upload.state, upload.format_exception())
+        return upload
+
+    def test_upload(self):
+        progress = []
+
+        def on_progress(value: float):
+            progress.append(value)
+
+        with patch("slafw.state_actions.data_export.ServerUpload.CHUNK_TARGET_S", 0):
+            upload = ServerUpload(self.hw, self.token_path, self._do_export, self.server.url, "logfile")
+            upload.store_progress_changed.connect(on_progress)
+            upload.start()
+            upload.join(timeout=60)
+        self.assertEqual(ExportState.FINISHED, upload.state, upload.format_exception())
+        self.assertEqual(self.data, self.server.files["logs.tar.xz"])
+        self.assertEqual(1, self.server.requests)
+        self.assertEqual([False], self.server.chunked, "File size is known, sent with Content-Length")
+        self.assertEqual(f"{self.server.url}/logs.tar.xz", upload.data_upload_url)
+        self.assertEqual("1", self.token_path.read_text())
+        # Progress is time throttled, not emitted per chunk
+        self.assertLessEqual(len(progress), 5)
+        self.assertEqual(1, progress[-1])
+
+    def test_upload_stream(self):
+        async def do_export(*_) -> TarXzStream:
+            archive = TarXzStream("logs.tar.xz")
+            archive.add_bytes(self.data, "data")
+            return archive
+
+        upload = ServerUpload(self.hw, self.token_path, do_export, self.server.url, "logfile")
+        upload.start()
+        upload.join(timeout=60)
+        self.assertEqual(ExportState.FINISHED, upload.state, upload.format_exception())
+        self.assertIn("logs.tar.xz", self.server.files)
+        self.assertEqual([True], self.server.chunked, "Streamed archive size is not known in advance")
+
+    def test_upload_parts(self):
+        self._upload(part_size=1024 * 1024)
+        self.assertEqual(self.data, self.server.files["logs.tar.xz"])
+        self.assertEqual(4, self.server.requests)
+
+    @patch("slafw.state_actions.data_export.ServerUpload.PART_RETRY_DELAY_S", 0.01)
+    def test_upload_parts_retry(self):
+        self.server.fail_requests = {2, 3}
+        self._upload(part_size=1024 * 1024)
+        self.assertEqual(self.data, self.server.files["logs.tar.xz"])
+        self.assertEqual(6, self.server.requests)
+
+    @patch("slafw.state_actions.data_export.ServerUpload.PART_RETRY_DELAY_S", 0.01)
+    def test_upload_parts_failed(self):
+        self.server.fail_requests = set(range(2, 2 + ServerUpload.PART_RETRIES + 1))
+        upload = ServerUpload(self.hw, self.token_path, self._do_export, self.server.url, "logfile", 1024 * 1024)
+        upload.start()
+        upload.join(timeout=60)
+        self.assertEqual(ExportState.FAILED, upload.state)
+        self.assertNotIn("logs.tar.xz", self.server.files)
+
+    def test_chunk_size(self):
+        # pylint: disable = protected-access
+        upload = ServerUpload(self.hw, self.token_path, self._do_export, self.server.url, "logfile")
+        self.assertEqual(ServerUpload.CHUNK_MIN, upload._chunk_size(1024, 10))
+        self.assertEqual(ServerUpload.CHUNK_MAX, upload._chunk_size(1024 * 1024, 0))
+        # 1 MB/s for CHUNK_TARGET_S
+        self.assertEqual(int(1024 * 1024 * ServerUpload.CHUNK_TARGET_S), upload._chunk_size(1024 * 1024, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
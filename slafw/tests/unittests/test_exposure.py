@@ -3,6 +3,7 @@
 # Copyright (C) 2018-2019 Prusa Research s.r.o. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import logging
 import unittest
 from pathlib import Path
 from time import sleep
@@ -26,6 +27,7 @@ from slafw.configs.runtime import RuntimeConfig
 from slafw.exposure.exposure import Exposure
 from slafw.states.exposure import ExposureState
 from slafw.tests.mocks.hardware import HardwareMock
+from slafw.utils.span_recorder import print_trace
 
 
 @patch("slafw.project.project.get_configured_printer_model", Mock(return_value=PrinterModel.SL1))
@@ -62,6 +64,7 @@ class TestExposure(SlafwTestCaseDBus, RefCheckTestCase):
         self.exposure_image.__class__ = ExposureImage
         self.exposure_image.__reduce__ = lambda x: (Mock, ())
         self.exposure_image.sync_preloader.return_value = 100
+        self.exposure_image.preload_wait_ms = 0
 
     @staticmethod
     def setupHw() -> HardwareMock:
@@ -88,6 +91,25 @@ class TestExposure(SlafwTestCaseDBus, RefCheckTestCase):
         exposure.read_project(TestExposure.PROJECT)
         exposure.startProject()
 
+    def test_exposure_load_old(self):
+        exposure = Exposure(0, self.hw, self.exposure_image, self.runtime_config)
+        exposure.read_project(TestExposure.PROJECT)
+        del exposure.project_copy_progress  # stored by an older version
+        exposure.save()
+        loaded = Exposure.load(exposure.logger, self.hw)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(0.0, loaded.project_copy_progress)
+
+    def test_cleanup_last_data(self):
+        project = Path(defines.previousPrints) / "old.sl1"
+        project.touch()
+        cache = Path(defines.previousPrints) / ("old.sl1" + defines.layerCacheSuffix)
+        cache.mkdir()
+        (cache / "index.json").touch()
+        Exposure.cleanup_last_data(logging.getLogger(__name__), clear_all=True)
+        self.assertFalse(project.exists())
+        self.assertFalse(cache.exists(), "Layer cache removed together with its project")
+
     def test_exposure_start_stop(self):
         exposure = self._run_exposure(self.hw)
         self.assertNotEqual(exposure.state, ExposureState.FAILURE)
@@ -270,6 +292,36 @@ class TestExposure(SlafwTestCaseDBus, RefCheckTestCase):
                           * 1000  # pylint: disable = protected-access
         self.assertEqual(201040 + delay_time + force_slow_time, exposure.estimate_total_time_ms())
 
+    def test_print_trace(self):
+        print_trace.clear()
+        exposure = self._run_exposure(self.hw)
+        self.assertEqual(exposure.state, ExposureState.FINISHED)
+        spans = print_trace.spans
+        layers = [span.layer for span in spans if span.name == "layer"]
+        self.assertEqual(list(range(exposure.project.total_layers)), layers)
+        phases = {span.name for span in spans if span.layer == 0}
+        self.assertTrue({"layer up", "preload wait", "blit", "exposure", "tilt down"} <= phases)
+        self.assertEqual(-1, print_trace.layer)
+
+    def test_preload_after_uv_on(self):
+        calls = []
+        pulse = self.hw.uv_led.pulse
+
+        def uv_pulse(time_ms):
+            calls.append("uv")
+            pulse(time_ms)
+
+        self.exposure_image.blit_image.side_effect = lambda *_: calls.append("blit")
+        self.exposure_image.preload_image.side_effect = lambda *_: calls.append("preload")
+        with patch.object(self.hw.uv_led, "pulse", uv_pulse):
+            exposure = self._run_exposure(self.hw)
+        self.assertEqual(exposure.state, ExposureState.FINISHED)
+        # blit and UV on are not delayed by reading the next layers
+        self.assertIn("preload", calls)
+        for index, call in enumerate(calls):
+            if call == "blit":
+                self.assertEqual("uv", calls[index + 1])
+
     def _start_exposure(self, hw, project = None, expo_img = None) -> Exposure:
         if project is None:
             project = TestExposure.PROJECT
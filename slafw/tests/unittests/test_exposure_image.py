@@ -16,6 +16,7 @@ from slafw.tests.base import SlafwTestCase, RefCheckTestCase
 from slafw.configs.hw import HwConfig
 from slafw.image.exposure_image import ExposureImage
 from slafw.project.project import Project
+from slafw.project.functions import get_usage_and_white_pixels, get_white_pixels
 from slafw import defines, test_runtime
 from slafw.tests.mocks.hardware import HardwareMock
 
@@ -77,6 +78,61 @@ class TestScreen(SlafwTestCase, RefCheckTestCase):
         self.exposure_image.blit_image()
         self.assertSameImage(self.exposure_image.buffer, Image.open(self.SAMPLES_DIR / "fbdev" / "mask.png"))
 
+    def test_preload_lookahead(self):
+        project = Project(self.hw, self.NUMBERS)
+        self.exposure_image.new_project(project)
+        self.exposure_image.preload_image(0)
+        white_pixels = []
+        for layer in range(project.total_layers):
+            white_pixels.append(self.exposure_image.sync_preloader())
+            self.exposure_image.blit_image()
+            self.exposure_image.preload_image(layer + 1)
+        self.assertEqual(233600, white_pixels[0])
+        self.assertEqual(project.total_layers, len(white_pixels))
+        for layer in range(project.total_layers):
+            self.exposure_image.preload_image(layer)
+            self.assertEqual(white_pixels[layer], self.exposure_image.sync_preloader())
+
+    def test_preload_slot_reuse(self):
+        project = Project(self.hw, self.NUMBERS)
+        self.exposure_image.new_project(project)
+        size = self.hw.exposure_screen.parameters.live_preview_size_px
+        self.exposure_image.preload_image(0)
+        for layer in range(project.total_layers):
+            self.exposure_image.sync_preloader()
+            self.exposure_image.screenshot_rename()
+            self.exposure_image.blit_image()
+            self.exposure_image.preload_image(layer + 1)
+            # nothing is left from the previous layers of the slot
+            bbox = project.read_image(project.layers[layer].image).getbbox()
+            content = self.exposure_image.buffer.getbbox()
+            self.assertTrue(content is None or bbox[:2] <= content[:2] and content[2:] <= bbox[2:], layer)
+            # the preview resized around the content is the same as the whole frame resized
+            self.assertSameImage(
+                self.exposure_image.buffer.resize(size, Image.BICUBIC), Image.open(defines.livePreviewImage)
+            )
+
+    def test_preload_out_of_sequence(self):
+        project = Project(self.hw, self.NUMBERS)
+        self.exposure_image.new_project(project)
+        self.exposure_image.preload_image(2)
+        self.exposure_image.preload_image(0)
+        white_pixels = self.exposure_image.sync_preloader()
+        self.assertEqual(233600, white_pixels)
+        self.exposure_image.blit_image()
+        self.assertSameImage(self.exposure_image.buffer, Image.open(self.SAMPLES_DIR / "fbdev" / "mask.png"))
+
+    def test_blit_zero_copy(self):
+        project = Project(self.hw, self.NUMBERS)
+        self.exposure_image.new_project(project)
+        self.hw.exposure_screen.set_shared_buffers.assert_called_once()
+        self.exposure_image.preload_image(0)
+        self.exposure_image.sync_preloader()
+        self.exposure_image.blit_image()
+        self.hw.exposure_screen.show_shared.assert_called_once_with(0)
+        self.hw.exposure_screen.show.assert_not_called()
+        self.assertSameImage(self.exposure_image.buffer, Image.open(self.SAMPLES_DIR / "fbdev" / "mask.png"))
+
     def test_display_usage(self):
         project = Project(self.hw, self.NUMBERS)
         self.exposure_image.new_project(project)
@@ -89,7 +145,22 @@ class TestScreen(SlafwTestCase, RefCheckTestCase):
             saved_data = npzfile['display_usage']
         with numpy.load(self.SAMPLES_DIR / "display_usage.npz") as npzfile:
             example_data = npzfile['display_usage']
-        self.assertTrue(numpy.array_equal(saved_data, example_data))
+        # usage is accumulated as integer block sums, allow float rounding differences
+        self.assertTrue(numpy.allclose(saved_data, example_data, rtol=1e-12, atol=0))
+
+    def test_usage_and_white_pixels(self):
+        image = Image.open(self.ZABA).convert("L")
+        pixels = numpy.array(image)
+        pixels[:100] = 0
+        pixels[100:200] = 255
+        factor = 5
+        height = pixels.shape[0] - pixels.shape[0] % factor
+        width = pixels.shape[1] - pixels.shape[1] % factor
+        pixels = pixels[:height, :width]
+        block_sums, white_pixels = get_usage_and_white_pixels(pixels, factor)
+        self.assertEqual(get_white_pixels(Image.fromarray(pixels)), white_pixels)
+        reference = pixels.reshape(height // factor, factor, width // factor, factor).astype(numpy.uint32).sum(axis=3).sum(axis=1)
+        self.assertTrue(numpy.array_equal(reference, block_sums))
 
     def test_per_partes(self):
         project = Project(self.hw, self.NUMBERS)
@@ -0,0 +1,105 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import logging
+import unittest
+from pathlib import Path
+from queue import SimpleQueue
+from tempfile import TemporaryDirectory
+from threading import get_ident
+from unittest.mock import Mock, patch
+
+from slafw import logger_config
+from slafw.logger_config import RateLimitFilter, LazyQueueHandler, LazyValue, configure_log
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(self.format(record))
+        self.threads.append(get_ident())
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    @staticmethod
+    def _record(level: int = logging.DEBUG, lineno: int = 1) -> logging.LogRecord:
+        return logging.LogRecord("test", level, "test.py", lineno, "message %d", (1,), None)
+
+    def test_burst(self):
+        log_filter = RateLimitFilter(10, 3)
+        self.assertEqual([True, True, True, False, False], [log_filter.filter(self._record()) for _ in range(5)])
+        self.assertTrue(log_filter.filter(self._record(lineno=2)))
+        self.assertTrue(log_filter.filter(self._record(logging.WARNING)))
+
+    def test_suppressed_count(self):
+        log_filter = RateLimitFilter(10, 1)
+        with patch("slafw.logger_config.monotonic", return_value=0):
+            for _ in range(4):
+                log_filter.filter(self._record())
+        record = self._record()
+        with patch("slafw.logger_config.monotonic", return_value=11):
+            self.assertTrue(log_filter.filter(record))
+        self.assertEqual("message 1 (3 similar messages suppressed)", record.getMessage())
+
+
+class TestLazyQueueHandler(unittest.TestCase):
+    def test_lazy(self):
+        queue = SimpleQueue()
+        function = Mock(return_value=12.5)
+        logger = logging.getLogger("test_lazy")
+        logger.propagate = False
+        logger.addHandler(LazyQueueHandler(queue))
+        self.addCleanup(logger.handlers.clear)
+
+        logger.warning("RAM %.1f%%, layer %d, list %s", LazyValue(function), 1, [1])
+        record = queue.get_nowait()
+        self.assertEqual("RAM 12.5%, layer 1, list [1]", record.msg)
+        logger.warning("RAM %.1f%%", LazyValue(function))
+        function.reset_mock()
+        record = queue.get_nowait()
+        function.assert_not_called()
+        self.assertEqual("RAM 12.5%", record.getMessage())
+
+
+class TestConfigureLog(unittest.TestCase):
+    def setUp(self) -> None:
+        root = logging.getLogger()
+        self._level = root.level
+        self._handlers = list(root.handlers)
+        self.addCleanup(self._restore)
+
+    def _restore(self):
+        logger_config._stop_listener()  # pylint: disable = protected-access
+        root = logging.getLogger()
+        root.handlers = self._handlers
+        root.setLevel(self._level)
+
+    def test_queued(self):
+        with TemporaryDirectory() as temp:
+            config = Path(temp) / "loggerConfig.json"
+            config.write_text(json.dumps({
+                "version": 1,
+                "handlers": {"list": {"()": f"{__name__}.ListHandler"}},
+                "root": {"level": "INFO", "handlers": ["list"]},
+            }))
+            with patch("slafw.defines.loggingConfig", config):
+                self.assertTrue(configure_log())
+        root = logging.getLogger()
+        self.assertEqual(1, len(root.handlers))
+        self.assertIsInstance(root.handlers[0], LazyQueueHandler)
+        handler = logger_config._listener.handlers[0]  # pylint: disable = protected-access
+        logging.getLogger("test").info("queued %d", 1)
+        logging.getLogger("test").debug("filtered")
+        logger_config._stop_listener()  # pylint: disable = protected-access
+        self.assertEqual(["queued 1"], handler.messages)
+        self.assertNotEqual(get_ident(), handler.threads[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
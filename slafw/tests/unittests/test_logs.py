@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 import asyncio
 import os
+import tarfile
 import unittest
 from functools import partial
 from pathlib import Path
@@ -18,12 +19,14 @@ from slafw import defines
 from slafw.tests import mocks
 from slafw.tests.base import SlafwTestCaseDBus, RefCheckTestCase
 from slafw.api.logs0 import Logs0
+from slafw.functions.files import get_save_path
 from slafw.states.data_export import ExportState, StoreType
 
 
-async def fake_log_export_process(log_file: Path):
+async def fake_log_export_process():
     return await asyncio.create_subprocess_shell(
-        '(sleep 1; date) > "{0}"'.format(str(log_file)),
+        '(sleep 1; date)',
+        stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE
     )
 
@@ -81,6 +84,13 @@ class TestLogs0(SlafwTestCaseDBus, RefCheckTestCase):
         self.assertEqual(ExportState.FINISHED.value, self.logs0.state)
         self.assertEqual(1, self.logs0.export_progress)
         self.assertEqual(1, self.logs0.store_progress)
+        archives = list(get_save_path().glob("logs.CZPX0819X009XC00151.*.tar.xz"))
+        self.assertEqual(1, len(archives))
+        self.addCleanup(archives[0].unlink)
+        with tarfile.open(archives[0]) as tar:
+            self.assertIn("logs/log.txt", tar.getnames())
+            self.assertIn("logs/print_trace.json", tar.getnames())
+            self.assertTrue(tar.extractfile("logs/log.txt").read())
 
     @staticmethod
     def _get_serial(waiter, _):
@@ -0,0 +1,55 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import unittest
+from threading import current_thread
+
+from slafw.utils.loop_thread import LoopThread
+
+
+class TestLoopThread(unittest.TestCase):
+    def setUp(self) -> None:
+        self.loop_thread = LoopThread("test")
+
+    def tearDown(self) -> None:
+        self.loop_thread.stop()
+
+    def test_run(self):
+        async def body():
+            await asyncio.sleep(0)
+            return current_thread()
+
+        first = self.loop_thread.run(body())
+        self.assertIsNot(current_thread(), first)
+        self.assertIs(first, self.loop_thread.run(body()), "Loop thread is reused")
+
+    def test_exception(self):
+        async def body():
+            raise ValueError("test")
+
+        with self.assertRaises(ValueError):
+            self.loop_thread.run(body())
+
+    def test_cancel(self):
+        async def body():
+            asyncio.current_task().cancel()
+            await asyncio.sleep(1)
+
+        with self.assertRaises(asyncio.CancelledError):
+            self.loop_thread.run(body())
+
+    def test_run_from_loop(self):
+        async def nested():
+            pass
+
+        async def body():
+            self.loop_thread.run(nested())
+
+        with self.assertRaises(RuntimeError):
+            self.loop_thread.run(body())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+from threading import Thread
+from unittest.mock import Mock, patch, call
+
+from slafw.utils.main_loop_signal import MainLoopSignal
+
+
+class TestMainLoopSignal(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch("slafw.utils.main_loop_signal.GLib")
+        self.glib = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.signal = MainLoopSignal(events=("warning",))
+        self.slot = Mock(__name__="slot")
+        self.signal.connect(self.slot)
+
+    def test_deferred(self):
+        self.signal.emit("state", 1)
+        self.slot.assert_not_called()
+        self.glib.idle_add.assert_called_once_with(self.signal.dispatch)
+        self.assertFalse(self.signal.dispatch())
+        self.slot.assert_called_once_with("state", 1)
+
+    def test_coalesced(self):
+        self.signal.emit("actual_layer", 1)
+        self.signal.emit("warning", "first")
+        self.signal.emit("state", 2)
+        self.signal.emit("actual_layer", 2)
+        self.signal.emit("warning", None)
+        self.glib.idle_add.assert_called_once()
+        self.signal.dispatch()
+        self.assertEqual(
+            [call("warning", "first"), call("state", 2), call("actual_layer", 2), call("warning", None)],
+            self.slot.call_args_list,
+        )
+
+    def test_rescheduled(self):
+        self.signal.emit("state", 1)
+        self.signal.dispatch()
+        self.signal.emit("state", 2)
+        self.assertEqual(2, self.glib.idle_add.call_count)
+        self.signal.dispatch()
+        self.assertEqual([call("state", 1), call("state", 2)], self.slot.call_args_list)
+
+    def test_emit_from_threads(self):
+        def body(thread: int):
+            for i in range(1000):
+                self.signal.emit(f"key{thread}", i)
+
+        threads = [Thread(target=body, args=(thread,)) for thread in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.signal.dispatch()
+        self.assertEqual({(f"key{thread}", 999) for thread in range(4)}, {c.args for c in self.slot.call_args_list})
+
+    def test_handlers_time(self):
+        self.signal.emit("state", 1)
+        self.signal.dispatch()
+        self.assertGreater(self.signal.handlers_ns, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
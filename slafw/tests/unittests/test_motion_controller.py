@@ -2,12 +2,13 @@
 # Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import asyncio
 import os
 from unittest.mock import patch, Mock
 
 from slafw import defines
 from slafw.errors.errors import MotionControllerWrongFw, MotionControllerException, MotionControllerWrongRevision
-from slafw.motion_controller.controller import MotionController
+from slafw.motion_controller.controller import MotionController, Command
 from slafw.tests.base import SlafwTestCase
 
 
@@ -46,3 +47,109 @@ class TestMotionController(SlafwTestCase):
         ):  # fw rev 5, board rev 6c
             with self.assertRaises(MotionControllerWrongFw):
                 self.mcc.connect(mc_version_check=False)
+
+    def test_wait_motion_end(self) -> None:
+        with patch.object(self.mcc, "doGetInt", Mock(side_effect=[3, 1, 2, 0])) as get_int:
+            self.mcc.wait_motion_end(1)
+            self.assertEqual(3, get_int.call_count)
+
+    def test_wait_motion_end_async(self) -> None:
+        with patch.object(self.mcc, "doGetInt", Mock(side_effect=[2, 2, 0])) as get_int:
+            asyncio.run(self.mcc.wait_motion_end_async(2))
+            self.assertEqual(3, get_int.call_count)
+
+    def test_wait_motion_end_fail(self) -> None:
+        with patch.object(self.mcc, "doGetInt", Mock(side_effect=MotionControllerException("test", None))):
+            with self.assertRaises(MotionControllerException):
+                self.mcc.wait_motion_end(3)
+
+    def test_wait_motion_end_async_cancel(self) -> None:
+        async def wait_canceled():
+            task = asyncio.create_task(self.mcc.wait_motion_end_async(1))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch.object(self.mcc, "doGetInt", Mock(return_value=1)):
+            asyncio.run(wait_canceled())
+            self.assertEqual([], self.mcc._motion_waiters)  # pylint: disable=protected-access
+
+    def test_wait_motion_end_closed_loop(self) -> None:
+        # a waiter of a closed loop does not kill the poller for the others
+        loop = asyncio.new_event_loop()
+        loop.close()
+        add_waiter = self.mcc._add_motion_waiter  # pylint: disable=protected-access
+        with patch.object(self.mcc, "doGetInt", Mock(side_effect=[1, 1, 0])):
+            add_waiter(1, lambda error: loop.call_soon_threadsafe(print))
+            self.mcc.wait_motion_end(1)
+
+    def test_wait_motion_end_poller_lost(self) -> None:
+        self.mcc.MOTION_POLLER_CHECK_S = 0.05
+        with patch.object(self.mcc, "_motion_poller_body", Mock()):
+            with self.assertRaises(MotionControllerException):
+                self.mcc.wait_motion_end(1)
+        self.assertEqual([], self.mcc._motion_waiters)  # pylint: disable=protected-access
+
+    def _fake_port(self, responses):
+        """
+        Answer written commands from the responses dict, record writes and reads of responses
+        """
+        events = []
+        read_port = self.mcc._read_port  # pylint: disable=protected-access
+
+        def write_port(data: bytes) -> int:
+            events.append(("write", data))
+            self.mcc._read_stream.put(responses[data.decode().strip()].encode() + b"\n")  # pylint: disable=protected-access
+            return len(data)
+
+        def read(garbage=False):
+            line = read_port(garbage)
+            events.append(("read", line))
+            return line
+
+        return events, patch.multiple(self.mcc, write_port=Mock(side_effect=write_port), _read_port=read)
+
+    def test_do_batch(self) -> None:
+        responses = {"?temp": "250 260 270 280 ok", "?frpm": "1000 2000 3000 ok", "?rsst": "1 ok", "?": "512 ok"}
+        commands = [
+            Command.get_int_list("?temp", multiply=0.1),
+            Command.get_int_list("?frpm"),
+            Command.get_bool("?rsst"),
+            Command.get_bool_list("?", bit_count=16),
+        ] * 4
+        events, fake_port = self._fake_port(responses)
+        with fake_port:
+            results = self.mcc.do_batch(commands)
+        self.assertEqual([25, 26, 27, 28], results[0])
+        self.assertEqual([1000, 2000, 3000], results[1])
+        self.assertTrue(results[2])
+        self.assertTrue(results[3][9])
+        self.assertEqual(results[:4] * 4, results)
+
+        outstanding = 0
+        max_outstanding = 0
+        sizes = []
+        for kind, data in events:
+            if kind == "write":
+                sizes.append(len(data))
+                outstanding += len(data)
+                max_outstanding = max(max_outstanding, outstanding)
+            else:
+                outstanding -= sizes.pop(0)
+        self.assertLessEqual(max_outstanding, MotionController.PIPELINE_WINDOW_BYTES)
+        self.assertGreater(max_outstanding, len(b"?temp\n"), "Commands are pipelined")
+        self.assertEqual(len(commands), self.mcc.link_statistics.commands)
+        self.assertEqual(1, self.mcc.link_statistics.exchanges)
+
+    def test_do_batch_fail(self) -> None:
+        responses = {"?temp": "250 260 270 280 ok", "?rsst": "e2", "?frpm": "1000 2000 3000 ok"}
+        events, fake_port = self._fake_port(responses)
+        with fake_port:
+            with self.assertRaises(MotionControllerException):
+                self.mcc.do_batch([Command.get_int_list("?temp"), Command.get_bool("?rsst"), Command.get_int_list("?frpm")])
+            # responses of the commands written before the failure were consumed, port is in sync
+            self.assertEqual([1000, 2000, 3000], self.mcc.doGetIntList("?frpm"))
+        writes = [data for kind, data in events if kind == "write"]
+        reads = [data for kind, data in events if kind == "read"]
+        self.assertEqual(len(writes), len(reads))
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import os
+import shutil
 import unittest
 from pathlib import Path
 from unittest.mock import patch, Mock
@@ -16,6 +17,7 @@ from slafw.errors.errors import ProjectErrorNotFound, ProjectErrorNotEnoughLayer
 from slafw.errors.warnings import PrintingDirectlyFromMedia
 from slafw.hardware.hardware_sl1 import HardwareSL1
 from slafw.project.project import Project, ProjectLayer, LayerCalibrationType, ExposureUserProfile
+from slafw.project.layer_cache import LayerCache
 from slafw.tests.base import SlafwTestCase
 from slafw.utils.bounding_box import BBox
 from slafw.hardware.printer_model import PrinterModel
@@ -71,10 +73,24 @@ class TestProject(SlafwTestCase):
         with self.assertRaises(ProjectErrorCorrupted):
             project.copy_and_check()
 
+    def test_corrupted_background(self):
+        with patch("slafw.defines.project_verify_foreground_layers", 1):
+            project = Project(self.hw, str(self.SAMPLES_DIR / "test_corrupted.sl1"))
+            project.copy_and_check(background=True)
+            project._verifier.join()  # pylint: disable = protected-access
+        project.check_layer(2)
+        with self.assertRaises(ProjectErrorCorrupted):
+            project.check_layer(1)
+
     def test_copy_and_check(self):
+        progress = []
         project = Project(self.hw, str(self.file2copy))
-        project.copy_and_check()
+        project.copy_and_check(progress.append)
         self.assertFalse(PrintingDirectlyFromMedia() in project.warnings, "Printed directly warning issued")
+        self.assertEqual(self.file2copy.read_bytes(), self.destfile.read_bytes(), "Copy is identical")
+        self.assertEqual(1, progress[-1], "Progress reported")
+        self.assertEqual(sorted(progress), progress, "Progress is monotonic")
+        self.assertFalse(Path(str(self.destfile) + "~").exists(), "Temporary file removed")
         self.destfile.unlink()
 
     def test_avaiable_space_check_usb(self):
@@ -126,6 +142,126 @@ class TestProject(SlafwTestCase):
         # FIXME project usedMaterial is wrong (modified project)
         #self.assertAlmostEqual(consumed_resin_slicer, project.used_material_nl / 1e6, delta=0.1, msg="Resin count")
 
+    def test_layer_table(self):
+        project = Project(self.hw, str(self.SAMPLES_DIR / "Resin_calibration_linear_object.sl1"))
+        remain_time_ms = project.count_remain_time(5)
+        self.assertIsNone(project._layers, "Layers built for project selection")  # pylint: disable = protected-access
+        self.assertEqual(len(project.layers), project.total_layers)
+        project.count_remain_time.cache_clear()
+        self.assertEqual(remain_time_ms, project.count_remain_time(5), "Estimate differs with built layers")
+        self.assertEqual(sum(layer.height_nm for layer in project.layers), project.total_height_nm)
+        self.assertEqual(sum(sum(layer.times_ms) for layer in project.layers[5:]), project.layers.remain_time_ms(5))
+        project.exposure_time_ms = 3000
+        self.assertEqual(3000, project.layers[-1].times_ms[0], "Times of built layers updated")
+        self.assertEqual(sum(sum(layer.times_ms) for layer in project.layers), project.layers.remain_time_ms(0))
+
+    def test_layer_table_analyzed(self):
+        project = Project(self.hw, str(self.SAMPLES_DIR / "numbers.sl1"))
+        self.assertFalse(project.layers.analyzed)
+        project.analyze()
+        self.assertTrue(project.layers.analyzed)
+        consumed = [layer.consumed_resin_nl for layer in project.layers]
+        self.assertEqual(sum(consumed[2:]), project.layers.remain_resin_nl(2))
+        self.assertEqual(project.used_material_nl, project.layers.remain_resin_nl(0))
+        self.assertEqual(sum(consumed[2:]), project.count_remain_resin_nl(2))
+        self.assertEqual(project._layers_slow, project.layers.remain_slow_layers(0))  # pylint: disable = protected-access
+        self.assertEqual(int(sum(project.layers.slow[2:])), project.layers.remain_slow_layers(2))
+
+        # slow layers of the remaining part come from the table, not from the count of slow layers done
+        with patch.object(project.layers, "remain_slow_layers", Mock(return_value=0)) as remain_slow_layers:
+            project.count_remain_time.cache_clear()
+            project.count_remain_time(2, 0)
+            remain_slow_layers.assert_called_once_with(2)
+        project.count_remain_time.cache_clear()
+        if project.layers.remain_slow_layers(2):
+            self.assertGreater(project.count_remain_time(2, 0), fast_only_ms)
+
+    def test_analyze_cache(self):
+        project = Project(self.hw, str(self.SAMPLES_DIR / "numbers.sl1"))
+        project.analyze()
+        self.assertTrue((Path(defines.previousPrints) / ("numbers.sl1" + defines.projectAnalysisSuffix)).exists())
+        reprint = Project(self.hw, str(self.SAMPLES_DIR / "numbers.sl1"))
+        with patch("slafw.project.project.get_context", Mock(side_effect=AssertionError("analysis not cached"))):
+            reprint.analyze()
+        self.assertEqual(project.layers, reprint.layers)
+        self.assertEqual(project.bbox, reprint.bbox)
+        self.assertEqual(project.used_material_nl, reprint.used_material_nl)
+
+    @patch("slafw.defines.layer_cache_enabled", True)
+    def test_layer_cache(self):
+        project = Project(self.hw, str(self.SAMPLES_DIR / "numbers.sl1"))
+        project.copy_and_check()
+        mask = project.read_image(defines.maskFilename)  # read by ExposureImage.new_project before the layers
+        put = LayerCache.put
+
+        def put_loaded(cache, filename, image):
+            # the writer thread must not decode the image the caller is decoding
+            self.assertIsNotNone(image.im, "image not loaded")
+            put(cache, filename, image)
+
+        with patch.object(LayerCache, "put", put_loaded):
+            images = [project.read_image(layer.image) for layer in project.layers]
+        project.data_close()
+        reprint = Project(self.hw, project.path)
+        self.assertSameImage(mask, reprint.read_image(defines.maskFilename))
+        with patch("slafw.project.project.Image.open", Mock(side_effect=AssertionError("layer not cached"))):
+            for layer, image in zip(reprint.layers, images):
+                self.assertSameImage(image, reprint.read_image(layer.image))
+        reprint.data_close()
+
+    @patch("slafw.defines.layer_cache_enabled", True)
+    def test_layer_cache_eviction(self):
+        cache = Path(defines.previousPrints) / ("numbers.sl1" + defines.layerCacheSuffix)
+        full = Mock(f_frsize=1, f_bavail=defines.internalReservedSpace)
+        free = Mock(f_frsize=1, f_bavail=2 * defines.internalReservedSpace)
+        project = Project(self.hw, str(self.SAMPLES_DIR / "numbers.sl1"))
+        project.copy_and_check()
+        with patch("slafw.project.layer_cache.os.statvfs", Mock(return_value=full)):
+            project.read_image(project.layers[0].image)
+            project.data_close()  # waits for the writer thread
+        self.assertFalse(cache.exists(), "Cache dropped when there is no space")
+
+        old_cache = Path(defines.previousPrints) / ("old.sl1" + defines.layerCacheSuffix)
+        old_cache.mkdir()
+        project = Project(self.hw, project.path)
+        with patch("slafw.project.layer_cache.os.statvfs", Mock(side_effect=[full, free, free])):
+            for layer in project.layers:
+                project.read_image(layer.image)
+            project.data_close()
+        self.assertFalse(old_cache.exists(), "Other cache evicted")
+        self.assertTrue((cache / "index.json").exists(), "Cache complete")
+
+    @patch("slafw.defines.layer_cache_enabled", True)
+    @patch("slafw.defines.layer_cache_max_size", 16 * 1024 * 1024)
+    def test_layer_cache_max_size(self):
+        cache = Path(defines.previousPrints) / ("numbers.sl1" + defines.layerCacheSuffix)
+        old_cache = Path(defines.previousPrints) / ("old.sl1" + defines.layerCacheSuffix)
+        old_cache.mkdir()
+        with (old_cache / LayerCache.FRAMES).open("wb") as frames:
+            frames.truncate(defines.layer_cache_max_size)
+        project = Project(self.hw, str(self.SAMPLES_DIR / "numbers.sl1"))
+        project.copy_and_check()
+        for layer in project.layers:
+            project.read_image(layer.image)
+        project.data_close()
+        self.assertFalse(old_cache.exists(), "Other cache evicted to stay within the limit")
+        self.assertTrue((cache / "index.json").exists(), "Cache complete")
+
+        shutil.rmtree(cache)
+        project = Project(self.hw, project.path)
+        with patch("slafw.defines.layer_cache_max_size", 1000):
+            for layer in project.layers:
+                project.read_image(layer.image)
+            project.data_close()
+        self.assertFalse(cache.exists(), "Cache over the limit dropped")
+
+    def test_layer_cache_disabled(self):
+        project = Project(self.hw, str(self.SAMPLES_DIR / "numbers.sl1"))
+        project.copy_and_check()
+        project.read_image(project.layers[0].image)
+        project.data_close()
+        self.assertFalse((Path(defines.previousPrints) / ("numbers.sl1" + defines.layerCacheSuffix)).exists())
+
     def test_read_calibration(self):
         project = Project(self.hw, str(self.SAMPLES_DIR / "Resin_calibration_linear_object.sl1"))
         print(project)
@@ -0,0 +1,89 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import shutil
+import unittest
+from time import sleep, monotonic
+from unittest.mock import patch
+
+from slafw import defines
+from slafw.project.index import ProjectIndex
+from slafw.tests.base import SlafwTestCase
+
+
+class TestProjectIndex(SlafwTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.TEMP_DIR / "projects"
+        (self.root / "sub").mkdir(parents=True)
+        shutil.copyfile(self.SAMPLES_DIR / "numbers.sl1", self.root / "numbers.sl1")
+        shutil.copyfile(self.SAMPLES_DIR / "test_nolayer.sl1", self.root / "sub" / "nolayer.sl1")
+        (self.root / "sub" / "readme.txt").write_text("not a project")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        super().tearDown()
+
+    def _index(self) -> ProjectIndex:
+        index = ProjectIndex(defines.projectIndexFile)
+        index.refresh([self.root])
+        return index
+
+    def test_query(self):
+        projects = self._index().query([self.root])
+        self.assertEqual({str(self.root / "numbers.sl1"), str(self.root / "sub" / "nolayer.sl1")}, set(projects))
+        summary = projects[str(self.root / "numbers.sl1")]
+        self.assertTrue(summary["valid"])
+        self.assertEqual("numbers", summary["name"])
+        self.assertEqual(2, summary["layers"])
+        self.assertEqual(os.path.getsize(self.root / "numbers.sl1"), summary["size"])
+        self.assertEqual([], self._index().paths([self.root], {".sl1s"}))
+
+    def test_incremental(self):
+        index = self._index()
+        with patch.object(ProjectIndex, "_summary", side_effect=AssertionError("project parsed again")), \
+                patch("slafw.project.index.os.scandir", side_effect=AssertionError("directory listed again")):
+            index.refresh([self.root])
+            self.assertEqual(2, len(index.query([self.root])))
+            self.assertEqual(2, len(ProjectIndex(defines.projectIndexFile).query([self.root])), "Index persisted")
+            self._wait_idle(index)
+
+        shutil.copyfile(self.SAMPLES_DIR / "numbers.sl1", self.root / "sub" / "copy.sl1")
+        (self.root / "numbers.sl1").unlink()
+        index.refresh([self.root])
+        self.assertEqual(
+            [self.root / "sub" / "copy.sl1", self.root / "sub" / "nolayer.sl1"], index.paths([self.root]))
+
+        index.drop(self.root / "sub")
+        self.assertEqual([], index.paths([self.root]), "Dropped projects hidden right away")
+        shutil.rmtree(self.root / "sub")
+        self._wait_idle(index)
+        self.assertEqual([], index.paths([self.root]))
+
+    def test_query_background(self):
+        index = self._index()
+        shutil.copyfile(self.SAMPLES_DIR / "numbers.sl1", self.root / "copy.sl1")
+        with patch.object(ProjectIndex, "_scan", side_effect=lambda _: sleep(0.5)):
+            index.refresh_async([self.root])
+            sleep(0.1)
+            start = monotonic()
+            self.assertEqual(2, len(index.query([self.root])), "Served from the index")
+            self.assertLess(monotonic() - start, 0.1, "Query does not wait for the refresh")
+            self._wait_idle(index)
+        index.query([self.root])
+        self._wait_idle(index)
+        self.assertIn(str(self.root / "copy.sl1"), index.query([self.root]), "Refreshed in the background")
+
+    def _wait_idle(self, index: ProjectIndex):
+        # pylint: disable = protected-access
+        for _ in range(100):
+            if not index._worker:
+                return
+            sleep(0.05)
+        self.fail("Project index refresh did not finish")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+from queue import Empty
+
+from slafw.motion_controller.queue_stream import QueueStream
+
+
+class TestQueueStream(unittest.TestCase):
+    def setUp(self) -> None:
+        self.stream = QueueStream(0.1)
+
+    def test_lines_in_one_chunk(self):
+        self.stream.put(b"0 ok\n# comment\n12 ok\n")
+        self.assertEqual(b"0 ok\n", self.stream.readline())
+        self.assertEqual(b"# comment\n", self.stream.readline())
+        self.assertEqual(b"12 ok\n", self.stream.readline())
+        self.assertFalse(self.stream.waiting())
+
+    def test_line_split_across_chunks(self):
+        self.stream.put(b"50")
+        self.assertTrue(self.stream.waiting())
+        with self.assertRaises(Empty):
+            self.stream.readline()
+        self.stream.put(b"00 o")
+        self.stream.put(b"k\n1")
+        self.assertEqual(b"5000 ok\n", self.stream.readline())
+        self.assertTrue(self.stream.waiting())
+        self.stream.put(b" ok\n")
+        self.assertEqual(b"1 ok\n", self.stream.readline())
+        self.assertFalse(self.stream.waiting())
+
+
+if __name__ == "__main__":
+    unittest.main()
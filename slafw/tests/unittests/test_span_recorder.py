@@ -0,0 +1,52 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import unittest
+from time import sleep, monotonic_ns
+
+from slafw.utils.span_recorder import SpanRecorder
+
+
+class TestSpanRecorder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.recorder = SpanRecorder(4)
+
+    def test_span(self):
+        self.recorder.layer = 3
+        with self.recorder.span("exposure"):
+            sleep(0.01)
+        span = self.recorder.spans[0]
+        self.assertEqual("exposure", span.name)
+        self.assertEqual(3, span.layer)
+        self.assertGreaterEqual(span.duration_ns, 10_000_000)
+
+    def test_span_exception(self):
+        with self.assertRaises(ValueError):
+            with self.recorder.span("tilt down"):
+                raise ValueError("Tilt failed")
+        self.assertEqual(["tilt down"], [span.name for span in self.recorder.spans])
+
+    def test_ring_buffer(self):
+        start_ns = monotonic_ns()
+        for i in range(6):
+            self.recorder.record(f"span{i}", start_ns)
+        self.assertEqual(["span2", "span3", "span4", "span5"], [span.name for span in self.recorder.spans])
+        self.recorder.clear()
+        self.assertEqual([], self.recorder.spans)
+
+    def test_chrome_trace(self):
+        self.recorder.layer = 1
+        self.recorder.record("blit", 2_000_000, 5_000_000)
+        trace = json.loads(json.dumps(self.recorder.chrome_trace()))
+        event = trace["traceEvents"][0]
+        self.assertEqual("blit", event["name"])
+        self.assertEqual("X", event["ph"])
+        self.assertEqual(2000, event["ts"])
+        self.assertEqual(3000, event["dur"])
+        self.assertEqual({"layer": 1}, event["args"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+from time import sleep
+from unittest.mock import Mock, patch
+
+from slafw.motion_controller.controller import Command
+from slafw.motion_controller.telemetry import TelemetryPoller, TelemetryItem, TelemetrySnapshot
+
+
+class TestTelemetryPoller(unittest.TestCase):
+    def setUp(self) -> None:
+        self.values = {"?temp": [25.0, 26.0, 27.0, 28.0], "?frpm": [1000, 2000, 3000], "?twpo": 100}
+        self.batches = []
+
+        def do_batch(commands):
+            self.batches.append([command.cmd for command in commands])
+            return [self.values[command.cmd] for command in commands]
+
+        self.mcc = Mock()
+        self.mcc.do_batch = Mock(side_effect=do_batch)
+        self.poller = TelemetryPoller(self.mcc)
+        self.temps_changed = Mock()
+        self.tower_changed = Mock()
+        self.poller.add(TelemetryItem("temperatures", Command.get_int_list("?temp"), 0.2, self.temps_changed))
+        self.poller.add(TelemetryItem("fans_rpm", Command.get_int_list("?frpm"), 0.2))
+        self.poller.add(TelemetryItem(
+            "tower_position", Command.get_int("?twpo"), 0.6, self.tower_changed, pass_value=False,
+            rapid_interval_s=0.05
+        ))
+
+    def tearDown(self) -> None:
+        self.poller.stop()
+
+    def test_coalesced_snapshot(self):
+        self.poller.start()
+        sleep(0.5)
+        self.poller.stop()
+        self.assertEqual(["?temp", "?frpm", "?twpo"], self.batches[0], "First poll reads everything at once")
+        self.assertTrue(all(batch[:2] == ["?temp", "?frpm"] for batch in self.batches), "Same interval coalesced")
+        self.assertLessEqual(len(self.batches), 4)
+        snapshot = self.poller.snapshot
+        self.assertEqual([25.0, 26.0, 27.0, 28.0], snapshot.temperatures)
+        self.assertEqual(100, snapshot.tower_position)
+        self.assertIsNone(snapshot.statistics)
+        self.temps_changed.emit.assert_called_once_with([25.0, 26.0, 27.0, 28.0])
+        self.tower_changed.emit.assert_called_once_with()
+
+    def test_rapid_update(self):
+        self.poller.start()
+        sleep(0.1)
+        self.poller.set_rapid_update("tower_position", True)
+        self.values["?twpo"] = 200
+        sleep(0.3)
+        self.poller.set_rapid_update("tower_position", False)
+        self.poller.stop()
+        self.assertGreaterEqual(sum("?twpo" in batch for batch in self.batches), 4)
+        self.assertEqual(200, self.poller.snapshot.tower_position)
+        self.assertEqual(2, self.tower_changed.emit.call_count)
+
+    def test_critical_backoff(self):
+        self.poller.start()
+        sleep(0.1)
+        polls = self.poller.polls
+        with self.poller.critical():
+            sleep(0.5)
+            self.assertEqual(polls, self.poller.polls, "No polls in critical window")
+        sleep(0.1)
+        self.assertGreater(self.poller.polls, polls, "Deferred polls run after the window")
+
+    def test_critical_max_deferral(self):
+        self.poller.CRITICAL_MAX_DEFERRAL_S = 0.3
+        self.poller.start()
+        sleep(0.1)
+        polls = self.poller.polls
+        with self.poller.critical():
+            sleep(0.6)
+            self.assertGreater(self.poller.polls, polls, "Polls deferred at most CRITICAL_MAX_DEFERRAL_S")
+
+    def test_recent(self):
+        self.assertIsNone(self.poller.recent("tower_position", 10), "Nothing polled yet")
+        self.poller.start()
+        sleep(0.1)
+        self.poller.stop()
+        self.assertEqual(100, self.poller.recent("tower_position", 10))
+        polled = self.poller.snapshot.polled_at("tower_position")
+        with patch("slafw.motion_controller.telemetry.monotonic", return_value=polled + 20):
+            self.assertIsNone(self.poller.recent("tower_position", 10), "Value too old")
+        self.assertIsNone(self.poller.recent("statistics", 10), "Never polled")
+
+    def test_recent_per_field(self):
+        self.poller.start()
+        sleep(0.1)
+        self.poller.stop()
+        # tower position is polled every 0.6 s, it is not outdated before its next poll is due
+        polled = self.poller.snapshot.polled_at("tower_position")
+        with patch("slafw.motion_controller.telemetry.monotonic", return_value=polled + 0.9):
+            self.assertEqual(100, self.poller.recent("tower_position", 0.3))
+            self.assertIsNone(self.poller.recent("temperatures", 0.3), "Polled every 0.2 s")
+        with patch("slafw.motion_controller.telemetry.monotonic", return_value=polled + 1.2):
+            self.assertIsNone(self.poller.recent("tower_position", 0.3))
+
+    def test_recent_critical(self):
+        self.poller.CRITICAL_MAX_DEFERRAL_S = 100
+        self.poller.start()
+        sleep(0.1)
+        polled = self.poller.snapshot.polled_at("tower_position")
+        with self.poller.critical():
+            with patch("slafw.motion_controller.telemetry.monotonic", return_value=polled + 20):
+                self.assertEqual(100, self.poller.recent("tower_position", 1), "Polls are deferred, no port reads")
+
+    def test_invalidate(self):
+        self.poller.start()
+        sleep(0.1)
+        self.values["?twpo"] = 200
+        self.poller.invalidate("tower_position")
+        self.assertIsNone(self.poller.recent("tower_position", 10), "Outdated by the position command")
+        sleep(0.1)
+        self.assertEqual(200, self.poller.recent("tower_position", 10), "Polled right away")
+
+    def test_state_bits_recent(self):
+        poller = TelemetryPoller(self.mcc)
+        self.values["?stat"] = {"COVER": True, "BUTTON": False}
+        poller.add(TelemetryItem("state_bits", Command.get_int("?stat"), 0.1))
+        poller.start()
+        self.addCleanup(poller.stop)
+        sleep(0.05)
+        self.assertTrue(poller.recent("cover_closed", 10))
+        self.assertFalse(poller.recent("power_switch", 10))
+
+    def test_state_bits(self):
+        self.assertIsNone(TelemetrySnapshot().cover_closed)
+        snapshot = TelemetrySnapshot(state_bits={"COVER": True, "BUTTON": False})
+        self.assertTrue(snapshot.cover_closed)
+        self.assertFalse(snapshot.power_switch)
+
+    def test_failure(self):
+        failed = Mock()
+        poller = TelemetryPoller(self.mcc, failed)
+        poller.add(TelemetryItem("statistics", Command.get_int_list("?usta"), 0.1))
+        poller.start()
+        sleep(0.2)
+        poller.stop()
+        failed.emit.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
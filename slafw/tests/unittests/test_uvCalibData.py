@@ -3,13 +3,17 @@
 # Copyright (C) 2018-2019 Prusa Research s.r.o. - www.prusa3d.com
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import asyncio
 from dataclasses import asdict
+from time import monotonic
+from unittest.mock import patch
 
 import toml
 from PIL import Image
 
 from slafw.tests.base import SlafwTestCase
 from slafw.libUvLedMeterMulti import UvCalibrationData, UvLedMeterMulti
+from slafw.tests.mocks import calibrator_port
 
 
 class TestUvCalibData(SlafwTestCase):
@@ -56,4 +60,73 @@ class TestUvMeterMulti60(SlafwTestCase):
         self.assertSameImage(Image.open(self.out), Image.open(self.PNG), 32, "Generated PNG")
 
 
+class TestUvMeterAsync(SlafwTestCase):
+    RESPONSE_DELAY_S = 0.5
+
+    def setUp(self):
+        super().setUp()
+        self.port = calibrator_port.Serial(response_delay_s=self.RESPONSE_DELAY_S)
+        self.patcher = patch("slafw.libUvLedMeterMulti.serial.Serial", return_value=self.port)
+        self.patcher.start()
+        self.uvmeter = UvLedMeterMulti()
+        self.assertTrue(self.uvmeter.connect())
+
+    def tearDown(self):
+        self.uvmeter.close()
+        self.patcher.stop()
+        super().tearDown()
+
+    def test_read_does_not_block(self):
+        async def run():
+            ticks = 0
+            read = asyncio.create_task(self.uvmeter.async_read_data())
+            while not read.done():
+                ticks += 1
+                await asyncio.sleep(0.05)
+            return ticks, read.result()
+
+        ticks, data = asyncio.run(run())
+        self.assertEqual(60, len(data.uvSensorData))
+        self.assertEqual(34.7, data.uvTemperature)
+        self.assertGreaterEqual(ticks, self.RESPONSE_DELAY_S / 0.05 / 2, "Event loop kept running while reading")
+
+    def test_timeout(self):
+        start = monotonic()
+        self.assertIsNone(asyncio.run(self.uvmeter.async_read_data(timeout_s=0.2)))
+        self.assertLess(monotonic() - start, self.RESPONSE_DELAY_S)
+
+    def test_cancel(self):
+        async def run():
+            read = asyncio.create_task(self.uvmeter.async_read_data())
+            await asyncio.sleep(0.2)
+            read.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await read
+
+        start = monotonic()
+        asyncio.run(run())
+        self.assertLess(monotonic() - start, self.RESPONSE_DELAY_S)
+
+        # stale reply of the cancelled request does not get mixed into the next one
+        asyncio.run(asyncio.sleep(self.RESPONSE_DELAY_S))
+        self.assertIsNotNone(asyncio.run(self.uvmeter.async_read_data()))
+
+    def test_cancel_port_busy(self):
+        async def run():
+            read = asyncio.create_task(self.uvmeter.async_read_data())
+            await asyncio.sleep(0.05)  # command reply readline running in the executor
+            read.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await read
+            return await self.uvmeter.async_read_data()
+
+        self.assertIsNotNone(asyncio.run(run()))
+        self.assertFalse(self.port.concurrent_access, "Next read waits for the port operation of the cancelled one")
+
+    def test_read_sync(self):
+        data = self.uvmeter.read_data()
+        self.assertEqual(60, len(data.uvSensorData))
+        self.assertEqual(34.7, data.uvTemperature)
+
+
 # TODO TestUvMeterMulti15
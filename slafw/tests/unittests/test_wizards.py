@@ -24,11 +24,13 @@ from slafw.configs.runtime import RuntimeConfig
 from slafw.errors.errors import UVTooDimm, UVTooBright, UVDeviationTooHigh, TowerHomeFailed, TowerEndstopNotReached
 from slafw.functions.system import get_configured_printer_model, set_configured_printer_model
 from slafw.hardware.printer_model import PrinterModel
+from slafw.libUvLedMeterMulti import UVCalibrationResult
 from slafw.states.wizard import WizardState, WizardId
 from slafw.tests.base import SlafwTestCaseDBus
 from slafw.tests.mocks.uv_meter import UVMeterMock
 from slafw.wizard.actions import UserActionBroker
 from slafw.wizard.checks.base import Check, WizardCheckType, WizardCheckState
+from slafw.wizard.checks.uv_calibration import UVCalibrateEdge
 from slafw.wizard.group import CheckGroup
 from slafw.wizard.setup import Configuration, PlatformSetup, TankSetup
 from slafw.wizard.wizard import Wizard
@@ -774,6 +776,35 @@ class TestUVCalibration(TestWizardsBase):
         wizard.state_changed.connect(on_state_changed)
         self._run_wizard(wizard, limit_s=15, expected_state=expected_state)
 
+    def test_uv_calibrate_edge_search(self):
+        max_pwm = self.hw.uv_led.parameters.max_pwm
+        target = self.hw.config.uvCalibMinIntEdge
+        for edge_factor, exponent in ((0.7, 1.0), (0.75, 1.3), (0.8, 0.8)):
+            for start_pwm in (30, 150, 200):
+                with self.subTest(edge_factor=edge_factor, exponent=exponent, start_pwm=start_pwm):
+                    self.uv_meter.edge_factor = edge_factor
+                    self.uv_meter.exponent = exponent
+                    self.uv_meter.reads = []
+                    expected = next(
+                        pwm for pwm in range(start_pwm, max_pwm + 1)
+                        if self.uv_meter.edge_intensity(pwm) >= target
+                    )
+                    self.hw.uv_led.pwm = start_pwm
+                    check = UVCalibrateEdge(self.hw, self.exposure_image, self.uv_meter, False, UVCalibrationResult())
+                    asyncio.run(check.calibrate())
+                    self.assertEqual(expected, check.pwm)
+                    self.assertEqual(expected, self.hw.uv_led.pwm)
+                    self.assertEqual(expected, check._result.data.uvFoundPwm)  # pylint: disable=protected-access
+                    self.assertLessEqual(len(self.uv_meter.reads), 6, f"PWMs read: {self.uv_meter.reads}")
+
+    def test_uv_calibrate_edge_too_dim(self):
+        self.uv_meter.edge_factor = 0.1
+        self.hw.uv_led.pwm = 150
+        check = UVCalibrateEdge(self.hw, self.exposure_image, self.uv_meter, False, UVCalibrationResult())
+        with self.assertRaises(UVTooDimm):
+            asyncio.run(check.calibrate())
+        self.assertLessEqual(len(self.uv_meter.reads), 3, f"PWMs read: {self.uv_meter.reads}")
+
     def _assert_final_uv_pwm(self, expected_value: int):
         conf = HwConfig(self.hw_config_file)
         conf.read_file()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+# pylint: disable=protected-access
+
+"""
+Measure D-Bus property get throughput and the motion controller traffic it causes
+
+Properties are read directly from the API objects (no bus) of a hardware talking to the simulated motion controller
+of benchmark_mc_pipeline. Telemetry is polled in all runs. The live runs read every get from the motion controller as
+it did before the properties were served from the telemetry snapshot. The printing runs repeat an exposure like
+cycle: tower move (positions invalidated), 1 s pause and EXPOSURE_S of critical window, when the polls are deferred.
+"""
+
+import sys
+from pathlib import Path
+from threading import Thread
+from time import monotonic, sleep
+from unittest.mock import Mock, patch
+
+sys.path.append("..")
+from benchmark_mc_pipeline import RESPONSES, SimulatedPort
+from slafw.api.printer0 import Printer0
+from slafw.api.standard0 import Standard0
+from slafw.configs.hw import HwConfig
+from slafw.hardware.hardware_sl1 import HardwareSL1
+from slafw.hardware.printer_model import PrinterModel
+
+DURATION_S = 5
+CLIENTS = 4
+EXPOSURE_S = 2
+PROPERTIES = (
+    (Printer0, "cover_state"),
+    (Printer0, "resin_sensor_state"),
+    (Printer0, "power_switch_state"),
+    (Printer0, "tower_position_nm"),
+    (Printer0, "tilt_position"),
+    (Standard0, "hw_telemetry"),
+)
+SAMPLES_DIR = Path(__file__).parent.parent / "tests" / "samples"
+
+
+def printing(hw: HardwareSL1, end: float) -> None:
+    while monotonic() < end:
+        hw.mcc.telemetry.invalidate("tower_position")
+        hw.mcc.telemetry.invalidate("tilt_position")
+        sleep(1)
+        with hw.mcc.telemetry.critical():
+            sleep(EXPOSURE_S)
+
+
+def run(live: bool, print_job: bool) -> None:
+    with patch("slafw.hardware.a64.temp_sensor.A64CPUTempSensor.CPU_TEMP_PATH", SAMPLES_DIR / "cputemp"):
+        hw = HardwareSL1(HwConfig(), PrinterModel.SL1)
+    if live:
+        hw.recent_value = lambda name, read: read()
+    hw.mcc._port = SimulatedPort(hw.mcc)
+    hw.mcc.u_input = Mock()
+    printer = Mock()
+    printer.hw = hw
+    printer.action_manager.exposure = None
+    apis = {Printer0: Printer0(printer), Standard0: Standard0(printer)}
+    hw.mcc.telemetry.start()
+    sleep(0.5)  # Let the first poll fill the snapshot
+
+    gets = []
+    end = monotonic() + DURATION_S
+
+    def client():
+        count = 0
+        while monotonic() < end:
+            for api, name in PROPERTIES:
+                getattr(apis[api], name)
+                count += 1
+        gets.append(count)
+
+    hw.mcc.link_statistics.reset()
+    threads = [Thread(target=client) for _ in range(CLIENTS)]
+    if print_job:
+        threads.append(Thread(target=printing, args=(hw, end)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = hw.mcc.link_statistics.summary()
+    hw.mcc.telemetry.stop()
+    print(f"{'live' if live else 'snapshot':8} {'printing' if print_job else 'idle':8}:"
+          f" {sum(gets) / DURATION_S:.0f} gets/s, MC commands {summary['commands']},"
+          f" MC busy {100 * summary['busy']:.1f} %")
+
+
+def main():
+    RESPONSES.update({"?": "128 ok", "?usta": "3600 7200 ok", "?fane": "0 ok"})
+    for print_job in (False, True):
+        run(True, print_job)
+        run(False, print_job)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+
+"""
+Compare per layer display usage accumulation and white pixels counting of the preloader
+
+The original way (PIL histogram + float64 means) against get_usage_and_white_pixels().
+Optional argument is a project file, its first layer is used instead of a generated one.
+"""
+
+import sys
+from io import BytesIO
+from timeit import timeit
+from zipfile import ZipFile
+
+import numpy
+from PIL import Image, ImageDraw
+
+sys.path.append("..")
+from slafw.project.functions import get_white_pixels, get_usage_and_white_pixels
+
+RESOLUTIONS = {"SL1": (1440, 2560), "SL1S": (1620, 2560)}
+FACTOR = 5
+REPEAT = 20
+
+
+def generated_layer(size) -> Image.Image:
+    image = Image.new("L", size)
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((size[0] // 4, size[1] // 4, size[0] // 2, size[1] // 2), fill=255)
+    draw.rectangle((size[0] // 2, size[1] // 2, size[0] * 3 // 4, size[1] * 3 // 4), fill=255)
+    return image
+
+
+def project_layer(project: str, size) -> Image.Image:
+    with ZipFile(project, "r") as zf:
+        name = sorted(n for n in zf.namelist() if n.endswith(".png") and n != "mask.png")[0]
+        layer = Image.open(BytesIO(zf.read(name))).convert("L")
+    image = Image.new("L", size)
+    image.paste(layer)
+    return image
+
+
+def original(image: Image.Image, pixels: numpy.ndarray, usage: numpy.ndarray):
+    shape = (usage.shape[0], FACTOR, usage.shape[1], FACTOR)
+    usage += numpy.reshape(pixels, shape).mean(axis=3).mean(axis=1) / 382500
+    return get_white_pixels(image)
+
+
+def fused(pixels: numpy.ndarray, usage: numpy.ndarray):
+    block_sums, white_pixels = get_usage_and_white_pixels(pixels, FACTOR)
+    usage += block_sums
+    return white_pixels
+
+
+def main():
+    for name, size in RESOLUTIONS.items():
+        image = project_layer(sys.argv[1], size) if len(sys.argv) > 1 else generated_layer(size)
+        pixels = numpy.array(image)
+        usage_shape = (size[1] // FACTOR, size[0] // FACTOR)
+        usage_float = numpy.zeros(usage_shape, dtype=numpy.float64)
+        usage_int = numpy.zeros(usage_shape, dtype=numpy.uint64)
+        if original(image, pixels, usage_float) != fused(pixels, usage_int):
+            print(f"{name}: white pixels count mismatch!")
+        time_original = timeit(lambda: original(image, pixels, usage_float), number=REPEAT) / REPEAT
+        time_fused = timeit(lambda: fused(pixels, usage_int), number=REPEAT) / REPEAT
+        print(f"{name} {size[0]}x{size[1]}: original {1e3 * time_original:.2f} ms, fused {1e3 * time_fused:.2f} ms,"
+              f" speedup {time_original / time_fused:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+
+"""
+Compare the staged log export with the streaming one
+
+The journal is simulated by LOG_MB of journal-like text. The staged export writes the log to a temporary directory,
+syncs it, compresses it by tar | xz to a temporary archive and copies the archive in 4 KB blocks with a progress signal
+per block (as before). The streaming export spools the log in RAM and streams the tar | xz output to the destination
+in 1 MB writes with throttled progress. Bytes written counts all files written to the disk.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from time import monotonic
+
+from PySignal import Signal
+
+sys.path.append("..")
+from slafw import defines
+from slafw.state_actions.data_export import TarXzStream, DataExport
+
+LOG_MB = 50
+LINE = b"Oct 17 07:49:06.123456 prusa64-sl1 slafw[1234]: DEBUG - slafw.exposure.exposure - Layer %d step %d\n"
+
+
+def journal():
+    block = []
+    for number in range(10000000):
+        block.append(LINE % (number // 30, number % 30))
+        if len(block) == 10000:
+            yield b"".join(block)
+            block = []
+
+
+def progress_signal() -> Signal:
+    signal = Signal()
+    signal.connect(lambda value: None)
+    return signal
+
+
+async def staged(tmp: Path, dst: Path) -> int:
+    logs_dir = tmp / "logs"
+    logs_dir.mkdir()
+    size = 0
+    with (logs_dir / "log.txt").open("wb") as log:
+        for data in journal():
+            log.write(data)
+            size += len(data)
+            if size >= LOG_MB * 1024 * 1024:
+                break
+        os.fsync(log.fileno())  # export_logs.sh syncs the log
+    archive = tmp / "logs.tar.xz"
+    proc = await asyncio.create_subprocess_shell(f"tar -cf - -C '{tmp}' logs | xz -T0 -0 > '{archive}'")
+    await proc.wait()
+    signal = progress_signal()
+    total_size = archive.stat().st_size
+    with archive.open("rb") as src_file, dst.open("wb") as dst_file:
+        while True:
+            data = src_file.read(4096)
+            if not data:
+                break
+            dst_file.write(data)
+            signal.emit(dst_file.tell() / total_size)
+            await asyncio.sleep(0)
+    return size + 2 * total_size
+
+
+async def streamed(tmp: Path, dst: Path) -> int:
+    log = SpooledTemporaryFile(max_size=defines.log_export_spool_size, dir=tmp)  # pylint: disable = consider-using-with
+    for data in journal():
+        log.write(data)
+        if log.tell() >= LOG_MB * 1024 * 1024:
+            break
+    spilled = log.tell() if log._rolled else 0  # pylint: disable = protected-access
+    archive = TarXzStream("logs.tar.xz")
+    archive.add_file(log, log.tell(), "logs/log.txt")
+    signal = progress_signal()
+    progress = 0.0
+    with dst.open("wb", buffering=TarXzStream.BLOCK_SIZE) as dst_file:
+        async for chunk in archive.chunks():
+            dst_file.write(chunk)
+            if archive.progress - progress >= DataExport.PROGRESS_STEP:
+                progress = archive.progress
+                signal.emit(progress)
+    return spilled + dst.stat().st_size
+
+
+async def run(name: str, export) -> None:
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as usb:
+        start = monotonic()
+        written = await export(Path(tmp), Path(usb) / "logs.tar.xz")
+        print(f"{name:9}: {monotonic() - start:5.2f} s, {written / 1024 / 1024:6.1f} MB written")
+
+
+def main():
+    asyncio.run(run("staged", staged))
+    asyncio.run(run("streaming", streamed))
+
+
+if __name__ == "__main__":
+    main()
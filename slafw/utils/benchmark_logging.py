@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+# pylint: disable=protected-access
+
+"""
+Measure the per-layer logging overhead of the printing thread at DEBUG and INFO level
+
+Every layer logs the "Layer started" line with psutil sampling and DEBUG_LINES debug lines as the exposure thread does.
+Journald is simulated by a handler which formats the record, writes it to /dev/null and takes JOURNAL_WRITE_S more
+(sendmsg to the journal socket). Handlers are either called synchronously (as before) or from the queue listener
+thread installed by configure_log.
+"""
+
+import logging
+import logging.config
+import os
+import sys
+from time import monotonic_ns, sleep
+from unittest.mock import patch
+
+import psutil
+
+sys.path.append("..")
+from slafw import defines, logger_config
+from slafw.logger_config import LazyValue, configure_log
+
+LAYERS = 200
+DEBUG_LINES = 30
+JOURNAL_WRITE_S = 0.0001
+
+
+class JournalHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self._file = open(os.devnull, "w", encoding="utf-8")  # pylint: disable = consider-using-with
+
+    def emit(self, record):
+        self._file.write(self.format(record))
+        sleep(JOURNAL_WRITE_S)
+
+
+CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"slafw": {"format": "%(levelname)s - %(name)s - %(message)s"}},
+    "handlers": {"journald": {"()": f"{__name__}.JournalHandler", "formatter": "slafw"}},
+    "root": {"level": "DEBUG", "handlers": ["journald"]},
+}
+
+
+def layer(logger: logging.Logger, number: int, lazy: bool) -> None:
+    logger.info(
+        "Layer started » { 'layer': '%04d/%04d', 'RAM': '%.1f%%', 'CPU': '%.1f%%' }",
+        number,
+        LAYERS,
+        LazyValue(lambda: psutil.virtual_memory().percent) if lazy else psutil.virtual_memory().percent,
+        LazyValue(psutil.cpu_percent) if lazy else psutil.cpu_percent(),
+    )
+    for line in range(DEBUG_LINES):
+        logger.debug("Layer %d step %d position %d nm", number, line, number * 50000)
+
+
+def run(level: str, queued: bool) -> None:
+    CONFIG["root"]["level"] = level
+    with patch("slafw.logger_config._get_config", return_value=CONFIG):
+        if queued:
+            configure_log()
+        else:
+            logger_config._stop_listener()
+            logging.config.dictConfig(CONFIG)
+    logger = logging.getLogger("slafw.exposure.exposure")
+    start = monotonic_ns()
+    for number in range(LAYERS):
+        layer(logger, number, queued)
+    layer_us = (monotonic_ns() - start) / LAYERS / 1000
+    logger_config._stop_listener()
+    print(f"{level:5} {'queued' if queued else 'sync':6}: {layer_us:8.1f} us per layer in the printing thread")
+
+
+def main():
+    # The debug lines come from a single source line here, unlike in the exposure thread, do not rate limit them
+    defines.log_rate_limit_burst = LAYERS * DEBUG_LINES
+    for level in ("DEBUG", "INFO"):
+        for queued in (False, True):
+            run(level, queued)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+
+"""
+Motion controller command throughput
+
+First compares the line framed QueueStream with the former per byte queue on typical responses, then measures
+polling commands per second against the MC serial simulator (SLA-control-01.elf has to be in PATH).
+"""
+
+import logging
+import sys
+from queue import Queue
+from shutil import which
+from time import monotonic
+from unittest.mock import patch, Mock
+
+sys.path.append("..")
+from slafw import defines
+import slafw.tests.mocks.mc_port
+from slafw.motion_controller.controller import MotionController
+from slafw.motion_controller.queue_stream import QueueStream
+
+RESPONSES = [b"0 ok\n", b"5000 ok\n", b"# tilt home done\n", b"1 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 ok\n"]
+LINES = 100000
+COMMANDS = 1000
+
+
+class ByteQueueStream:
+    """
+    Former implementation, every byte is a queue item
+    """
+
+    def __init__(self):
+        self._queue = Queue()
+
+    def readline(self) -> bytes:
+        ret = b""
+        while not ret.endswith(b"\n"):
+            ret += self._queue.get()
+        return ret
+
+    def put(self, data: bytes) -> None:
+        for b in data:
+            self._queue.put(bytes([b]))
+
+
+def stream_benchmark(stream) -> float:
+    start = monotonic()
+    for i in range(LINES):
+        stream.put(RESPONSES[i % len(RESPONSES)])
+        stream.readline()
+    return LINES / (monotonic() - start)
+
+
+def simulator_benchmark():
+    with patch("slafw.motion_controller.controller.serial", slafw.tests.mocks.mc_port), \
+            patch("slafw.motion_controller.controller.UInput", Mock()), \
+            patch("slafw.motion_controller.controller.chip", Mock()), \
+            patch("slafw.motion_controller.controller.find_line", Mock()), \
+            patch("slafw.motion_controller.controller.line_request", Mock()):
+        mcc = MotionController(defines.motionControlDevice)
+        mcc.connect(mc_version_check=False)
+        try:
+            for cmd in ("?mot", "?twpo", "?tipo"):
+                start = monotonic()
+                for _ in range(COMMANDS):
+                    mcc.do(cmd)
+                print(f"{cmd}: {COMMANDS / (monotonic() - start):.0f} commands/s")
+        finally:
+            mcc.exit()
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    print(f"Per byte queue: {stream_benchmark(ByteQueueStream()):.0f} lines/s")
+    print(f"Line queue: {stream_benchmark(QueueStream()):.0f} lines/s")
+    if which("SLA-control-01.elf"):
+        simulator_benchmark()
+    else:
+        print("MC simulator not found, skipping commands benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+# pylint: disable=protected-access
+
+"""
+Measure motion controller serial utilization and command latency under a printing workload
+
+The motion controller is simulated: bytes take their time on the 115200 baud line in both directions and every
+command takes MC_PROCESSING_S to process. The printing workload polls "?mot" and sends per-layer commands while the
+status values are refreshed either by a command per value (as before) or by pipelined batches. Refresh intervals are
+shortened SPEEDUP times to get meaningful numbers in a short run.
+"""
+
+import sys
+from queue import Queue
+from threading import Thread, Event
+from time import monotonic, sleep
+
+sys.path.append("..")
+from slafw.motion_controller.controller import MotionController, Command
+from slafw.motion_controller.link_statistics import BITS_PER_BYTE
+
+DURATION_S = 10
+SPEEDUP = 10
+MC_PROCESSING_S = 0.0005
+RESPONSES = {
+    "?": "512 ok",
+    "?rsst": "1 ok",
+    "?temp": "250 260 270 280 ok",
+    "?frpm": "1000 2000 3000 ok",
+    "?twpo": "123456 ok",
+    "?tipo": "4321 ok",
+    "?mot": "0 ok",
+}
+LAYER_COMMANDS = ["!uled 1 2000", "!twma 1000", "!tima 0", "!uled 0 0", "!tima 5000", "!twma 0"]
+
+
+class SimulatedPort:
+    """
+    Serial line with a motion controller on the other end, responses are put directly to the read stream
+    """
+
+    is_open = False  # nothing to close on exit
+
+    def __init__(self, mcc: MotionController):
+        self._stream = mcc._read_stream
+        self._lines: Queue = Queue()
+        self._line_free = 0.0
+        Thread(target=self._mc_body, daemon=True).start()
+
+    def _transfer(self, size: int) -> float:
+        self._line_free = max(self._line_free, monotonic()) + size * BITS_PER_BYTE / MotionController.BAUD_RATE_NORMAL
+        return self._line_free
+
+    def write(self, data: bytes) -> int:
+        self._lines.put((self._transfer(len(data)), data))
+        return len(data)
+
+    def _mc_body(self):
+        while True:
+            received, data = self._lines.get()
+            sleep(max(0.0, received - monotonic()) + MC_PROCESSING_S)
+            cmd = data.decode().split(" ")[0].strip()
+            response = (RESPONSES.get(cmd, "ok") + "\n").encode()
+            sleep(max(0.0, self._transfer(len(response)) - monotonic()))
+            self._stream.put(response)
+
+
+def refresh_sequential(mcc: MotionController):
+    mcc.getStateBits(check_for_updates=False)
+    mcc.doGetBool("?rsst")
+    mcc.doGetIntList("?temp", multiply=0.1)
+    mcc.doGetIntList("?frpm")
+    mcc.doGetInt("?tipo")
+    mcc.doGetInt("?twpo")
+
+
+def refresh_batched(mcc: MotionController):
+    bits, _ = mcc.do_batch([Command.get_bool_list("?", bit_count=16), Command.get_bool("?rsst")])
+    mcc.state_bits(bits, check_for_updates=False)
+    mcc.do_batch([Command.get_int_list("?temp", multiply=0.1), Command.get_int_list("?frpm")])
+    mcc.do_batch([Command.get_int("?tipo"), Command.get_int("?twpo")])
+
+
+def run(refresh) -> None:
+    mcc = MotionController("/dev/null")
+    mcc._port = SimulatedPort(mcc)
+    stop = Event()
+
+    refresh_times = []
+
+    def refresher():
+        while not stop.is_set():
+            start = monotonic()
+            refresh(mcc)
+            refresh_times.append(monotonic() - start)
+            sleep(0.5 / SPEEDUP)
+
+    latencies = []
+    thread = Thread(target=refresher, daemon=True)
+    mcc.link_statistics.reset()
+    thread.start()
+    end = monotonic() + DURATION_S
+    while monotonic() < end:
+        for cmd in LAYER_COMMANDS:
+            start = monotonic()
+            mcc.do(*cmd.split(" "))
+            latencies.append(monotonic() - start)
+            for _ in range(5):
+                start = monotonic()
+                mcc.doGetInt("?mot")
+                latencies.append(monotonic() - start)
+                sleep(MotionController.MOTION_POLL_INTERVAL_S)
+    stop.set()
+    thread.join()
+    summary = mcc.link_statistics.summary()
+    latencies.sort()
+    print(f"{refresh.__name__}: utilization {100 * summary['utilization']:.1f} %, busy {100 * summary['busy']:.1f} %,"
+          f" exchanges {summary['exchanges']}, commands {summary['commands']},"
+          f" refresh avg {1e3 * sum(refresh_times) / len(refresh_times):.2f} ms,"
+          f" workload latency avg {1e3 * sum(latencies) / len(latencies):.2f} ms,"
+          f" p99 {1e3 * latencies[int(len(latencies) * 0.99)]:.2f} ms, max {1e3 * latencies[-1]:.2f} ms")
+
+
+def main():
+    run(refresh_sequential)
+    run(refresh_batched)
+
+
+if __name__ == "__main__":
+    main()
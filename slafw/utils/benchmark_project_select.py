@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+
+"""
+Measure latency of project selection (what cmd_select does before the confirmation screen)
+
+Project is opened and its print time estimated. The lazy way builds no layer descriptions, the eager way builds them
+as Project.__init__ used to. Memory taken by the layer table is compared to a list of standalone ProjectLayer
+objects. Optional argument is a project file, a project with LAYERS tiny layers is generated otherwise.
+"""
+
+import sys
+import tempfile
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from timeit import timeit
+from unittest.mock import Mock, patch
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from PIL import Image
+
+sys.path.append("..")
+from slafw.configs.hw import HwConfig
+from slafw.hardware.printer_model import PrinterModel
+from slafw.hardware.base.exposure_screen import ExposureScreenParameters
+from slafw.project.project import Project, ProjectLayer
+import slafw.hardware.sl1.printer_model  # pylint: disable=unused-import
+
+LAYERS = 10000
+REPEAT = 10
+
+
+def generated_project(directory: str) -> str:
+    path = str(Path(directory) / "large.sl1")
+    buffer = BytesIO()
+    Image.new("L", (16, 16)).save(buffer, format="PNG")
+    with ZipFile(path, "w", ZIP_DEFLATED) as zf:
+        zf.writestr("config.ini", f"jobDir = large\nexpTime = 2.0\nexpTimeFirst = 30.0\nnumFast = {LAYERS}\n"
+                                  "numSlow = 0\nlayerHeight = 0.05\nprinterModel = SL1\n")
+        for i in range(LAYERS):
+            zf.writestr(f"large{i:05d}.png", buffer.getvalue())
+    return path
+
+
+def select(hw, path: str, eager: bool) -> int:
+    project = Project(hw, path)
+    if eager:
+        _ = project.layers
+    return project.count_remain_time()
+
+
+def layers_memory(hw, path: str):
+    project = Project(hw, path)
+    tracemalloc.start()
+    _ = project.layers
+    table = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    objects = []
+    for layer in project.layers:
+        standalone = ProjectLayer(layer.image, layer.height_nm)
+        standalone.times_ms = layer.times_ms
+        standalone.calibration_type = layer.calibration_type
+        objects.append(standalone)
+    listed = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return table, listed
+
+
+def main():
+    hw = Mock()
+    hw.config = HwConfig()
+    hw.exposure_screen.parameters = ExposureScreenParameters(
+        size_px=(1440, 2560), thumbnail_factor=5, output_factor=1, pixel_size_nm=47250, refresh_delay_ms=0,
+        monochromatic=False, bgr_pixels=False)
+    with tempfile.TemporaryDirectory() as directory, \
+            patch("slafw.project.project.get_configured_printer_model", Mock(return_value=PrinterModel.SL1)):
+        path = sys.argv[1] if len(sys.argv) > 1 else generated_project(directory)
+        time_eager = timeit(lambda: select(hw, path, True), number=REPEAT) / REPEAT
+        time_lazy = timeit(lambda: select(hw, path, False), number=REPEAT) / REPEAT
+        print(f"{path}: eager {1e3 * time_eager:.1f} ms, lazy {1e3 * time_lazy:.1f} ms,"
+              f" speedup {time_eager / time_lazy:.1f}x")
+        table, listed = layers_memory(hw, path)
+        print(f"layers memory: table {table / 1024:.0f} KiB, objects {listed / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
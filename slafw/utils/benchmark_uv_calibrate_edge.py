@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# pylint: disable=wrong-import-position
+
+"""
+Measure meter readings and wall time of the UV edge calibration search
+
+Simulated meter answers after READ_TIME_S, the linear search (one reading per PWM step) is computed from the meter
+model. Optional arguments are edge factor and response exponent of the simulated meter.
+"""
+
+import asyncio
+import sys
+from time import monotonic
+from unittest.mock import Mock
+
+sys.path.append("..")
+from slafw.configs.hw import HwConfig
+from slafw.libUvLedMeterMulti import UVCalibrationResult
+from slafw.tests.mocks.hardware import HardwareMock
+from slafw.tests.mocks.uv_meter import UVMeterMock
+from slafw.wizard.checks.uv_calibration import UVCalibrateEdge
+
+READ_TIME_S = 0.05
+START_PWMS = (30, 100, 150, 200)
+
+
+def main():
+    hw = HardwareMock(HwConfig())
+    uv_meter = UVMeterMock(hw)
+    exposure_image = Mock()
+    uv_meter.edge_factor = float(sys.argv[1]) if len(sys.argv) > 1 else 0.7
+    uv_meter.exponent = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    uv_meter.read_time_s = READ_TIME_S
+    max_pwm = hw.uv_led.parameters.max_pwm
+    target = hw.config.uvCalibMinIntEdge
+    for start_pwm in START_PWMS:
+        linear = next(
+            (pwm for pwm in range(start_pwm, max_pwm + 1) if uv_meter.edge_intensity(pwm) >= target), max_pwm + 1
+        ) - start_pwm + 1
+        uv_meter.reads = []
+        hw.uv_led.pwm = start_pwm
+        check = UVCalibrateEdge(hw, exposure_image, uv_meter, False, UVCalibrationResult())
+        start = monotonic()
+        try:
+            asyncio.run(check.calibrate())
+        except Exception as exception:  # pylint: disable=broad-except
+            print(f"start {start_pwm}: {type(exception).__name__}")
+            continue
+        duration = monotonic() - start
+        print(f"start {start_pwm}: found {check.pwm}, readings linear {linear} ({linear * READ_TIME_S:.2f} s),"
+              f" adaptive {len(uv_meter.reads)} ({duration:.2f} s), PWMs {uv_meter.reads}")
+
+
+if __name__ == "__main__":
+    main()
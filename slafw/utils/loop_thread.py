@@ -0,0 +1,78 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import concurrent.futures
+import logging
+from threading import Thread, Lock, current_thread
+from typing import Any, Coroutine, Optional
+
+
+class LoopThread:
+    """
+    Long running asyncio event loop in a daemon thread with a synchronous facade
+
+    Synchronous code submits coroutines and waits for their results instead of creating and destroying a new loop
+    by asyncio.run for every call. The loop is started lazily on the first submit.
+    """
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(__name__)
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+
+    def _ensure_running(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if not self._loop:
+                self._loop = asyncio.new_event_loop()
+                self._thread = Thread(target=self._run, name=f"{self._name}-loop", daemon=True)
+                self._thread.start()
+                self._logger.info("Event loop %s started", self._name)
+            return self._loop
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit(self, coroutine: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule coroutine in the loop without waiting for it
+
+        :return: Future of the coroutine result
+        """
+        loop = self._ensure_running()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    def run(self, coroutine: Coroutine) -> Any:
+        """
+        Run coroutine in the loop and block until it is done
+
+        Cancellation of the coroutine is raised as asyncio.CancelledError, same as asyncio.run would do.
+
+        :raises RuntimeError: when called from the loop thread itself, waiting would never finish
+        :return: Coroutine result
+        """
+        if self._thread is current_thread():
+            coroutine.close()
+            raise RuntimeError(f"Cannot wait for {self._name} loop from its own thread")
+        try:
+            return self.submit(coroutine).result()
+        except concurrent.futures.CancelledError as exception:
+            raise asyncio.CancelledError() from exception
+
+    def stop(self) -> None:
+        with self._lock:
+            if not self._loop:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._logger.info("Event loop %s stopped", self._name)
+
+
+hw_loop = LoopThread("hardware")
@@ -0,0 +1,62 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from queue import SimpleQueue, Empty
+from time import monotonic_ns
+from typing import Any, Iterable, List, Tuple
+
+from gi.repository import GLib
+from PySignal import Signal
+
+
+class MainLoopSignal(Signal):
+    """
+    Key-value change signal delivered to the slots from the GLib main loop
+
+    Emitting only puts the change into a queue and makes sure the queue is drained by the main loop, so the emitting
+    thread does not wait for the slots and takes no lock. Changes of the same key queued before the drain are coalesced,
+    only the last value is delivered. Changes of event keys are delivered all.
+    """
+
+    def __init__(self, events: Iterable[str] = ()):
+        super().__init__()
+        self._events = frozenset(events)
+        self._queue: SimpleQueue = SimpleQueue()
+        self._scheduled = False
+        self.handlers_ns = 0  # time spent in the slots so far
+
+    def emit(self, key: str, value: Any):  # pylint: disable = arguments-differ
+        self._queue.put((key, value))
+        if not self._scheduled:
+            # Concurrent emits may schedule the drain twice, the second one finds the queue empty
+            self._scheduled = True
+            GLib.idle_add(self.dispatch)
+
+    def dispatch(self) -> bool:
+        """
+        Deliver the queued changes, GLib main loop idle callback
+
+        :return: False to be removed from the GLib main loop sources
+        """
+        # Reset before draining, a change queued during the drain schedules another one
+        self._scheduled = False
+        start = monotonic_ns()
+        for key, value in self._coalesce(self._drain()):
+            super().emit(key, value)
+        self.handlers_ns += monotonic_ns() - start
+        return False
+
+    def _drain(self) -> List[Tuple[str, Any]]:
+        changes = []
+        while True:
+            try:
+                changes.append(self._queue.get_nowait())
+            except Empty:
+                return changes
+
+    def _coalesce(self, changes: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+        last = {key: index for index, (key, _) in enumerate(changes)}
+        return [
+            (key, value) for index, (key, value) in enumerate(changes) if key in self._events or last[key] == index
+        ]
@@ -0,0 +1,81 @@
+# This file is part of the SLA firmware
+# Copyright (C) 2022 Prusa Research a.s. - www.prusa3d.com
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+from collections import deque
+from contextlib import contextmanager
+from threading import get_ident
+from time import monotonic_ns
+from typing import NamedTuple, Deque, List, Dict, Any, Optional
+
+from slafw import defines
+
+
+class Span(NamedTuple):
+    name: str
+    start_ns: int  # monotonic
+    duration_ns: int
+    layer: int  # -1 when recorded outside a print
+    thread: int
+
+
+class SpanRecorder:
+    """
+    Timed spans of the print loop phases kept in a fixed size ring buffer
+
+    Recording a span takes two monotonic clock reads and an append to a bounded deque, the oldest spans are dropped
+    once the capacity is reached. Spans can be exported in the Chrome trace event format (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, capacity: int):
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self.layer = -1  # layer the recorded spans belong to
+
+    @contextmanager
+    def span(self, name: str):
+        start_ns = monotonic_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start_ns)
+
+    def record(self, name: str, start_ns: int, end_ns: Optional[int] = None) -> None:
+        """
+        Record span started at start_ns, ending now if end_ns is not set
+        """
+        if end_ns is None:
+            end_ns = monotonic_ns()
+        self._spans.append(Span(name, start_ns, end_ns - start_ns, self.layer, get_ident()))
+
+    @property
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        :return: Recorded spans as Chrome trace complete events, JSON serializable
+        """
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": "print",
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": span.duration_ns / 1000,
+                    "pid": pid,
+                    "tid": span.thread,
+                    "args": {"layer": span.layer},
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+
+print_trace = SpanRecorder(defines.print_trace_spans)
@@ -7,7 +7,8 @@ from asyncio import sleep, Queue, AbstractEventLoop, CancelledError, get_running
 from dataclasses import asdict
 from datetime import datetime
 from functools import partial
-from typing import Dict, Any
+from math import ceil
+from typing import Dict, Any, Optional, Tuple
 import weakref
 
 import toml
@@ -32,7 +33,7 @@ from slafw.functions.files import save_wizard_history
 from slafw.functions.system import FactoryMountedRW
 from slafw.hardware.base.hardware import BaseHardware
 from slafw.image.exposure_image import ExposureImage
-from slafw.libUvLedMeterMulti import UvLedMeterMulti, UvMeterState, UVCalibrationResult
+from slafw.libUvLedMeterMulti import UvLedMeterMulti, UvMeterState, UVCalibrationResult, UvCalibrationData
 from slafw.states.wizard import WizardState
 from slafw.wizard.actions import UserActionBroker, PushState
 from slafw.wizard.checks.base import WizardCheckType, DangerousCheck, Check
@@ -61,7 +62,7 @@ class CheckUVMeter(DangerousCheck):
             raise FailedToDetectUVMeter()
         self._logger.info("UV meter device found")
 
-        if not self._uv_meter.connect():
+        if not await get_running_loop().run_in_executor(None, self._uv_meter.connect):
             # TODO: Move exception raise to connect
             raise UVMeterFailedToRespond()
 
@@ -109,7 +110,7 @@ class CheckUVMeterPlacement(DangerousCheck):
         await self.wait_cover_closed()
         try:
             # NOTE: Fans and UV already started by previous check
-            error = self._uv_meter.check_place(self._exposure_image.open_screen)
+            error = await self._uv_meter.async_check_place(self._exposure_image.open_screen)
             # TODO: Move raise to check_place ?
 
             if error == UvMeterState.ERROR_COMMUNICATION:
@@ -222,10 +223,9 @@ class UVCalibrateCenter(UVCalibrate):
         # Calibrate LED Power
         self._hw.start_fans()
         for iteration in range(0, self.TUNING_ITERATIONS):
-            await sleep(0)
             self._hw.uv_led.pwm = round(self.pwm)
             # Read new intensity value
-            data = self._uv_meter.read_data()
+            data = await self._uv_meter.async_read_data()
             if data is None:
                 raise UVMeterCommunicationFailed()
             self.intensity = data.uvMean if not self._result.boost else data.uvMean * self.BOOST_MULTIPLIER
@@ -307,37 +307,52 @@ class UVCalibrateEdge(UVCalibrate):
             self._exposure_image.blank_screen()
 
     async def calibrate(self):
+        """
+        Find the lowest PWM (not lower than the one from the previous step) reaching the minimal edge intensity
+
+        Edge intensity is expected to grow with PWM roughly linearly. Next PWM is interpolated from the readings
+        bracketing the target (extrapolated from the start PWM while there is no reading above the target), bisection
+        is used when the interpolation does not shrink the bracket fast enough. Every meter reading takes seconds, this
+        converges in a few readings instead of one per PWM step.
+        """
         self._exposure_image.open_screen()
         max_pwm = self._calibration_params.max_pwm
+        target = self._hw.config.uvCalibMinIntEdge
         # check PWM value from previous step
-        self.pwm = self._hw.uv_led.pwm
-        data = None
-        while self.pwm <= max_pwm:
-            await sleep(0)
-            self._hw.uv_led.pwm = self.pwm
-            # Read new intensity value
-            data = self._uv_meter.read_data()
-            if data is None:
-                raise UVMeterCommunicationFailed()
-
-            self.min_value = data.uvMinValue if not self._result.boost else data.uvMinValue * self.BOOST_MULTIPLIER
-            self.deviation = data.uvStdDev
-            data.uvFoundPwm = -1  # for debug log
-            self._logger.info("New UV sensor data %s", str(data))
-            self._logger.info("UV pwm tuning: pwm: %d, minValue: %f", self.pwm, self.min_value)
-
+        start_pwm = self._hw.uv_led.pwm
+        low: Optional[Tuple[int, float]] = None  # highest PWM known to be too dim and its reading
+        high: Optional[Tuple[int, float, UvCalibrationData]] = None  # lowest PWM known to be fine
+        pwm = start_pwm
+        iteration = 0
+        last_high = False
+        while True:
+            iteration += 1
+            min_value, data = await self._read_edge(pwm)
+            self._logger.info("UV pwm tuning: pwm: %d, minValue: %f, iteration: %d", pwm, min_value, iteration)
+            was_high = last_high
+            last_high = min_value >= target
+            if last_high:
+                high = (pwm, min_value, data)
+            else:
+                low = (pwm, min_value)
             # Compute progress based on threshold / value ratio
-            self.progress = min(1, self.min_value / self._hw.config.uvCalibMinIntEdge)
-
-            # Break cycle when minimal intensity (on the edge) is ok
-            if self.min_value >= self._hw.config.uvCalibMinIntEdge:
+            self.progress = 1 if high else min(1, low[1] / target)
+            if high and (high[0] == start_pwm or (low and high[0] - low[0] == 1)):
                 break
-            self.pwm += 1
+            if not high and low[0] >= max_pwm:
+                self.pwm = max_pwm + 1
+                self._logger.error("UV PWM %d > allowed PWM %d", self.pwm, max_pwm)
+                raise UVTooDimm(self.pwm, max_pwm)
+            # the same side of the bracket moved twice in a row, the response is far from linear
+            repeated_side = iteration > 2 and was_high == last_high
+            pwm = self._next_pwm(low, high, target, max_pwm, repeated_side)
+
+        self.pwm, self.min_value, data = high
+        self.deviation = data.uvStdDev
+        self._hw.uv_led.pwm = self.pwm
+        self._logger.info("UV edge PWM %d found in %d readings", self.pwm, iteration)
 
         # Report ranges
-        if self.pwm > max_pwm:
-            self._logger.error("UV PWM %d > allowed PWM %d", self.pwm, max_pwm)
-            raise UVTooDimm(self.pwm, max_pwm)
         if self.deviation > self.INTENSITY_DEVIATION_THRESHOLD:
             self._logger.error("UV deviation: %f", self.deviation)
             raise UVDeviationTooHigh(self.deviation, self.INTENSITY_DEVIATION_THRESHOLD)
@@ -345,6 +360,29 @@ class UVCalibrateEdge(UVCalibrate):
         data.uvFoundPwm = self._hw.uv_led.pwm
         self._result.data = data
 
+    async def _read_edge(self, pwm: int) -> Tuple[float, UvCalibrationData]:
+        self._hw.uv_led.pwm = pwm
+        # Read new intensity value
+        data = await self._uv_meter.async_read_data()
+        if data is None:
+            raise UVMeterCommunicationFailed()
+        data.uvFoundPwm = -1  # for debug log
+        self._logger.info("New UV sensor data %s", str(data))
+        return data.uvMinValue if not self._result.boost else data.uvMinValue * self.BOOST_MULTIPLIER, data
+
+    @staticmethod
+    def _next_pwm(low: Tuple[int, float], high: Optional[Tuple], target: float, max_pwm: int, bisect: bool) -> int:
+        if not high:
+            # intensity is (roughly) proportional to PWM, aim just above the target
+            if low[1] <= 0:
+                return max_pwm
+            return min(max_pwm, max(low[0] + 1, ceil(low[0] * target / low[1])))
+        if bisect:
+            return (low[0] + high[0]) // 2
+        span = high[1] - low[1]
+        guess = ceil(low[0] + (target - low[1]) * (high[0] - low[0]) / span) if span > 0 else high[0]
+        return max(low[0] + 1, min(high[0] - 1, guess))
+
     def get_result_data(self) -> Dict[str, Any]:
         return asdict(self._result.data)
 
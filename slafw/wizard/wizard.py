@@ -220,6 +220,8 @@ class Wizard(Thread, UserActionBroker):
 
     def __run_group(self, group: CheckGroup):
         self._logger.debug("Running check group %s", type(group).__name__)
+        # Own loop per group: asyncio.run cancels checks left running after a failure or cancel and the group
+        # executor shutdown does not block the shared hardware loop
         asyncio.run(group.run(self))
 
 # retry implementation